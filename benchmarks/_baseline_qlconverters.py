@@ -0,0 +1,172 @@
+# Copyright (C) 2016-2018 Lanx Capital Investimentos LTDA.
+#
+# This file is part of Time Series Finance (tsfin).
+#
+# Time Series Finance (tsfin) is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or (at your option)
+# any later version.
+#
+# Time Series Finance (tsfin) is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Time Series Finance (tsfin). If not, see <https://www.gnu.org/licenses/>.
+"""
+The string to QuantLib converters of tsfin.base.qlconverters as they were before the registries: if/elif chains that
+call .upper() and build a new object on every call. Kept as the baseline of qlconverters_benchmark.py.
+"""
+import QuantLib as ql
+
+
+def to_ql_frequency(arg):
+    """Converts string with a period representing a tenor to a QuantLib period.
+
+    :param arg: str
+        The frequency name
+    :return QuantLib.Frequency, QuantLib.Period
+
+    """
+
+    if arg.upper() == "ANNUAL":
+        return ql.Annual
+    elif arg.upper() == "SEMIANNUAL":
+        return ql.Semiannual
+    elif arg.upper() == "QUARTERLY":
+        return ql.Quarterly
+    elif arg.upper() == "EVERY_FOUR_MONTH":
+        return ql.EveryFourthMonth
+    elif arg.upper() == "BIMONTHLY":
+        return ql.Bimonthly
+    elif arg.upper() == "MONTHLY":
+        return ql.Monthly
+    elif arg.upper() == "AT_MATURITY":
+        return ql.Once
+    elif arg.upper() == "BIWEEKLY":
+        return ql.Biweekly
+    elif arg.upper() == "WEEKLY":
+        return ql.Weekly
+    elif arg.upper() == "DAILY":
+        return ql.Daily
+    elif arg.upper() in ['NOFREQUENCY', 'NO_FREQUENCY']:
+        return ql.NoFrequency
+    else:
+        raise ValueError("Unable to convert {} to a QuantLib frequency".format(arg))
+
+
+def to_ql_calendar(arg):
+    """Converts string with a calendar name to a calendar instance of QuantLib.
+
+    :param arg: str
+        The Calendar 2 letter code, exceptions being TARGET, NYSE and NULL
+    :return QuantLib.Calendar
+    """
+
+    if arg.upper() == "US":
+        return ql.UnitedStates(ql.UnitedStates.GovernmentBond)
+    elif arg.upper() in ["NYSE", "CE"]:
+        return ql.UnitedStates(ql.UnitedStates.NYSE)
+    elif arg.upper() == "FD":
+        return ql.UnitedStates(ql.UnitedStates.FederalReserve)
+    elif arg.upper() == "EX":
+        return ql.JointCalendar(ql.UnitedStates(ql.UnitedStates.NYSE),
+                                ql.UnitedStates(ql.UnitedStates.Settlement))
+    elif arg.upper() in ["GB", "UK"]:
+        return ql.UnitedKingdom()
+    elif arg.upper() == 'LS':
+        return ql.UnitedKingdom(ql.UnitedKingdom.Exchange)
+    elif arg.upper() == "BZ":
+        return ql.Brazil(ql.Brazil.Settlement)
+    elif arg.upper() == "B2":
+        bz_calendar = ql.Brazil(ql.Brazil.Exchange)
+        bz_calendar.removeHoliday(ql.Date(9, 7, 2020))
+        return bz_calendar
+    elif arg.upper() in ["TE", 'TARGET']:
+        return ql.TARGET()
+    elif arg.upper() in ['C%', 'C+']:
+        return ql.China()
+    elif arg.upper() == 'JN':
+        return ql.Japan()
+    elif arg.upper() == 'SZ':
+        return ql.Switzerland()
+    elif arg.upper() == 'AU':
+        return ql.Australia()
+    elif arg.upper() == 'SA':
+        return ql.SouthAfrica()
+    elif arg.upper() == 'TU':
+        return ql.Turkey()
+    elif arg.upper() == 'NULL':
+        return ql.NullCalendar()
+    else:
+        raise ValueError("Unable to convert {} to a QuantLib calendar".format(arg))
+
+
+def to_ql_business_convention(arg):
+    """Converts a string with business convention name to the corresponding QuantLib object.
+
+    :param arg: str
+        The business convention name
+    :return QuantLib.BusinessConvention
+
+    """
+
+    if arg.upper() == "FOLLOWING":
+        return ql.Following
+    elif arg.upper() == "MODIFIEDFOLLOWING":
+        return ql.ModifiedFollowing
+    elif arg.upper() == "PRECEDING":
+        return ql.Preceding
+    elif arg.upper() == "MODIFIEDPRECEDING":
+        return ql.ModifiedPreceding
+    elif arg.upper() == "UNADJUSTED":
+        return ql.Unadjusted
+    else:
+        raise ValueError("Unable to convert {} to a QuantLib business convention".format(arg))
+
+
+def to_ql_day_counter(arg):
+    """Converts a string with day_counter name to the corresponding QuantLib object.
+
+    :param arg: str
+        The day count name
+    :return QuantLib.DayCounter
+
+    """
+    if arg.upper() == "THIRTY360E":
+        return ql.Thirty360(ql.Thirty360.European)
+    elif arg.upper() == "THIRTY360":
+        return ql.Thirty360()
+    elif arg.upper() == "ACTUAL360":
+        return ql.Actual360()
+    elif arg.upper() == "ACTUAL365":
+        return ql.Actual365Fixed()
+    elif arg.upper() == "ACTUALACTUAL":
+        return ql.ActualActual(ql.ActualActual.ISMA)
+    elif arg.upper() == "ACTUALACTUALISMA":
+        return ql.ActualActual(ql.ActualActual.ISMA)
+    elif arg.upper() == "ACTUALACTUALISDA":
+        return ql.ActualActual(ql.ActualActual.ISDA)
+    elif arg.upper() == "BUSINESS252":
+        return ql.Business252()
+    else:
+        raise ValueError("Unable to convert {} to a QuantLib day counter".format(arg))
+
+
+def to_ql_compounding(arg):
+    """Converts a string with compounding convention name to the corresponding QuantLib object.
+
+    :param arg: str
+        The compounding type
+    :return QuantLib.Compounding
+
+    """
+    if arg.upper() == "COMPOUNDED":
+        return ql.Compounded
+    elif arg.upper() == "SIMPLE":
+        return ql.Simple
+    elif arg.upper() == "CONTINUOUS":
+        return ql.Continuous
+    else:
+        raise ValueError("Unable to convert {} to a QuantLib compounding specification".format(arg))
@@ -0,0 +1,49 @@
+# Copyright (C) 2016-2018 Lanx Capital Investimentos LTDA.
+#
+# This file is part of Time Series Finance (tsfin).
+#
+# Time Series Finance (tsfin) is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or (at your option)
+# any later version.
+#
+# Time Series Finance (tsfin) is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Time Series Finance (tsfin). If not, see <https://www.gnu.org/licenses/>.
+"""
+Microbenchmark of the string to QuantLib converters of tsfin.base.qlconverters.
+
+Prints the cost per call of each converter, and of the same converter as it was before the registries (see
+_baseline_qlconverters.py). Run with ``python benchmarks/qlconverters_benchmark.py``.
+"""
+import timeit
+from tsfin.base import qlconverters
+import _baseline_qlconverters as baseline
+
+CASES = [
+    ('to_ql_calendar', ['US', 'B2', 'TARGET', 'null']),
+    ('to_ql_day_counter', ['ACTUAL360', 'Business252', 'ACTUALACTUALISDA']),
+    ('to_ql_business_convention', ['FOLLOWING', 'Unadjusted']),
+    ('to_ql_frequency', ['ANNUAL', 'daily', 'NO_FREQUENCY']),
+    ('to_ql_compounding', ['COMPOUNDED', 'continuous']),
+]
+
+
+def per_call(function, args, number):
+    return min(timeit.repeat(lambda: [function(arg) for arg in args], number=number, repeat=5)) / number / len(args)
+
+
+def main(number=20000):
+    print('{:<28}{:>16}{:>16}{:>10}'.format('converter', 'baseline (us)', 'registry (us)', 'speedup'))
+    for name, args in CASES:
+        before = per_call(getattr(baseline, name), args, number)
+        after = per_call(getattr(qlconverters, name), args, number)
+        print('{:<28}{:>16.3f}{:>16.3f}{:>9.1f}x'.format(name, 1e6 * before, 1e6 * after, before / after))
+
+
+if __name__ == '__main__':
+    main()
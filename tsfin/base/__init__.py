@@ -2,3 +2,5 @@ from tsfin.base.instrument import Instrument, default_arguments
 from tsfin.base.schedule import Schedule, to_bus_day_name, to_date_generation_name
 from tsfin.base.basetools import *
 from tsfin.base.qlconverters import *
+from tsfin.base.parallel import fork_map, split_positions, can_fork, evaluation_date, serialize_evaluation_date, \
+    switch_evaluation_date, DateShardedExecutor
@@ -18,6 +18,7 @@
 Basic independent tools that can be imported by any module in the package.
 """
 from functools import wraps
+from collections import OrderedDict
 from bisect import bisect_right
 import time
 from datetime import datetime
@@ -376,6 +377,168 @@ def conditional_vectorize(*args):
     return function_builder
 
 
+def to_object_array(arg):
+    """Convert a scalar or an iterable to a one-dimensional numpy array of objects.
+
+    Unlike numpy.asarray, the elements of `arg` are never unpacked or converted (e.g. QuantLib.Date objects and
+    pandas.Timestamp objects are kept as they are).
+
+    Parameters
+    ----------
+    arg: scalar or list-like
+
+    Returns
+    -------
+    numpy.ndarray
+
+    """
+    if isvectorizable(arg):
+        values = list(arg)
+    else:
+        values = [arg]
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def array_vectorize(*args):
+    """Create a function generator that calls a given function once with whole arrays of the passed arguments.
+
+    This is the batched counterpart of :py:func:`conditional_vectorize`. Instead of calling the input function once
+    per element, the input function receives all the elements of the arguments in `args` at once, as one-dimensional
+    numpy arrays of objects with the same length (scalars are broadcast), and must return a one-dimensional array with
+    one result per element. This allows the input function to share its setup (settlement dates, QuantLib evaluation
+    date switches, quote type branching, etc.) across elements and to write its results into a preallocated array.
+
+    Parameters
+    ----------
+    args: strings
+        The argument names of the input function ('f', that will be passed to the 'function_builder') that are passed
+        to 'f' as arrays.
+
+    Returns
+    -------
+    function
+
+    Examples
+    --------
+    # >>> @array_vectorize('argument1', 'argument2')
+    ... def calculation(argument1, argument2):
+    ...     result = np.empty(len(argument1), dtype=np.float64)
+    ...     result[:] = argument1.astype(np.float64) * argument2.astype(np.float64)
+    ...     return result
+    ...
+    ... print(calculation(argument1=1, argument2=2))
+    2.0
+    ...
+    ... print(calculation(argument1=[1, 2], argument2=3))
+    [3. 6.]
+
+    Warnings
+    --------
+    Every function decorated by array_vectorize must ALWAYS be called with keyword arguments. If none of the arguments
+    in 'args' is iterable, the decorated function returns the single element of the array returned by 'f'.
+
+    """
+    def function_builder(f):
+        @wraps(f)
+        def new_f(*fargs, **kwargs):
+            vectorized = any(isvectorizable(kwargs.get(arg, None)) for arg in args)
+            arg_names = [arg for arg in args if arg in kwargs.keys()]
+            arrays = [to_object_array(kwargs[arg]) for arg in arg_names]
+            if any(len(array) == 0 for array in arrays):
+                return np.nan
+            array_kwargs = kwargs.copy()
+            array_kwargs.update(zip(arg_names, np.broadcast_arrays(*arrays)))
+            result = f(*fargs, **array_kwargs)
+            if vectorized:
+                return ExtendedArray(result, meta=kwargs)
+            return result[0]
+        # Also flagged as conditional vectorized, so that code that redecorates methods (e.g. FloatingRateBond) keeps
+        # working with both decorators.
+        new_f._conditional_vectorized_ = True
+        new_f._conditional_vectorize_args_ = args
+        new_f._array_vectorized_ = True
+        return new_f
+    return function_builder
+
+
+def compound_factor(rate, time, compounding, frequency):
+    """Vectorized equivalent of QuantLib.InterestRate(rate, day_counter, compounding, frequency).compoundFactor(time).
+
+    Parameters
+    ----------
+    rate: scalar or numpy.ndarray
+        The interest rate(s).
+    time: scalar or numpy.ndarray
+        The time(s), in years. Broadcast against `rate`.
+    compounding: QuantLib.Compounding
+        The compounding convention of `rate`.
+    frequency: QuantLib.Frequency
+        The compounding frequency of `rate`.
+
+    Returns
+    -------
+    numpy.ndarray
+        The compound factors.
+    """
+    rate = np.asarray(rate, dtype=np.float64)
+    time = np.asarray(time, dtype=np.float64)
+    if compounding == ql.Simple:
+        return 1.0 + rate * time
+    elif compounding == ql.Continuous:
+        return np.exp(rate * time)
+    compounded = (1.0 + rate / frequency) ** (frequency * time)
+    if compounding == ql.Compounded:
+        return compounded
+    elif compounding == ql.SimpleThenCompounded:
+        return np.where(time <= 1.0 / frequency, 1.0 + rate * time, compounded)
+    elif compounding == ql.CompoundedThenSimple:
+        return np.where(time <= 1.0 / frequency, compounded, 1.0 + rate * time)
+    else:
+        raise ValueError("Unable to compute compound factors with compounding {}".format(compounding))
+
+
+def implied_rate(compound, time, compounding, frequency):
+    """Vectorized equivalent of QuantLib.InterestRate.impliedRate(compound, day_counter, compounding, frequency, time).
+
+    Parameters
+    ----------
+    compound: scalar or numpy.ndarray
+        The compound factor(s).
+    time: scalar or numpy.ndarray
+        The time(s), in years. Broadcast against `compound`. Times equal to zero return nan (unless the compound
+        factor is 1).
+    compounding: QuantLib.Compounding
+        The compounding convention of the implied rate.
+    frequency: QuantLib.Frequency
+        The compounding frequency of the implied rate.
+
+    Returns
+    -------
+    numpy.ndarray
+        The implied interest rates.
+    """
+    compound = np.asarray(compound, dtype=np.float64)
+    time = np.asarray(time, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if compounding == ql.Simple:
+            rate = (compound - 1.0) / time
+        elif compounding == ql.Continuous:
+            rate = np.log(compound) / time
+        else:
+            compounded = (compound ** (1.0 / (frequency * time)) - 1.0) * frequency
+            if compounding == ql.Compounded:
+                rate = compounded
+            elif compounding == ql.SimpleThenCompounded:
+                rate = np.where(time <= 1.0 / frequency, (compound - 1.0) / time, compounded)
+            elif compounding == ql.CompoundedThenSimple:
+                rate = np.where(time <= 1.0 / frequency, compounded, (compound - 1.0) / time)
+            else:
+                raise ValueError("Unable to compute implied rates with compounding {}".format(compounding))
+    return np.where(compound == 1.0, 0.0, rate)
+
+
 def timeit(loops=10):
     """Time function execution.
 
@@ -465,6 +628,88 @@ class ExtendedArray(np.ndarray):
         self.meta = getattr(obj, 'meta', None)
 
 
+class LRUCache:
+    """ Bounded mapping that discards the least recently used entries.
+
+    Parameters
+    ----------
+    maxsize: int, optional
+        Maximum number of entries. If None, the cache is unbounded.
+        Default: 128.
+
+    Attributes
+    ----------
+    hits: int
+        Number of lookups that found their key.
+    misses: int
+        Number of lookups that did not find their key.
+    evictions: int
+        Number of entries discarded to respect `maxsize`.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __getitem__(self, key):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self._data.keys()
+
+    def values(self):
+        return self._data.values()
+
+    def items(self):
+        return self._data.items()
+
+    def clear(self):
+        """Remove all the entries, keeping the counters."""
+        self._data.clear()
+
+    def stats(self):
+        """
+        Returns
+        -------
+        dict
+            The hits, misses, evictions, current size and maximum size of the cache.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self._data),
+                'maxsize': self.maxsize}
+
+
 def rate_if_available(c):
 
     c = ql.as_coupon(c)
@@ -498,3 +743,37 @@ def ql_holiday_list(start_date, end_date, *calendars):
             holiday_list.append(date)
         date = date + ql.Period(1, ql.Days)
     return holiday_list
+
+
+def year_fractions(day_counter, start_date, end_serials):
+    """Year fractions from a date to many dates.
+
+    Actual/365 (Fixed) and Actual/360 are computed directly from the date serial numbers, other day counters are
+    evaluated by QuantLib date by date.
+
+    Parameters
+    ----------
+    day_counter: QuantLib.DayCounter
+        The day counter.
+    start_date: QuantLib.Date or numpy.ndarray of int
+        The start date, or the serial numbers of the start dates, broadcast with `end_serials`.
+    end_serials: numpy.ndarray of int
+        Serial numbers of the end dates.
+
+    Returns
+    -------
+    numpy.ndarray of float64
+        The year fractions from `start_date` to each end date.
+    """
+    end_serials = np.asarray(end_serials)
+    start_serials = start_date.serialNumber() if isinstance(start_date, ql.Date) else np.asarray(start_date)
+    days = (end_serials - start_serials).astype(np.float64)
+    name = day_counter.name()
+    if name == 'Actual/365 (Fixed)':
+        return days / 365.0
+    elif name == 'Actual/360':
+        return days / 360.0
+    start_serials, end_serials = np.broadcast_arrays(start_serials, end_serials)
+    return np.array([day_counter.yearFraction(ql.Date(int(start)), ql.Date(int(end)))
+                     for start, end in zip(start_serials.ravel().tolist(), end_serials.ravel().tolist())],
+                    dtype=np.float64).reshape(end_serials.shape)
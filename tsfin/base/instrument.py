@@ -24,6 +24,7 @@ from tsio.tools import to_datetime, at_index
 from tsfin.constants import QUOTES, TENOR_PERIOD, MATURITY_DATE
 from tsfin.base.basetools import conditional_vectorize
 from tsfin.base.qlconverters import to_ql_date
+from tsfin.base.parallel import switch_evaluation_date
 
 
 def default_arguments(f):
@@ -127,7 +128,7 @@ class Instrument:
         The asset net present value
         """
         date = to_ql_date(date)
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         instrument = self.security(date=date, *args, **kwargs)
         return instrument.NPV()
 
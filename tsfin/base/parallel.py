@@ -0,0 +1,341 @@
+# Copyright (C) 2016-2018 Lanx Capital Investimentos LTDA.
+#
+# This file is part of Time Series Finance (tsfin).
+#
+# Time Series Finance (tsfin) is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or (at your option)
+# any later version.
+#
+# Time Series Finance (tsfin) is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Time Series Finance (tsfin). If not, see <https://www.gnu.org/licenses/>.
+"""
+Tools to run calculations in worker processes and threads.
+
+QuantLib keeps global state (e.g. the evaluation date and the fixings history), so calculations for different dates
+cannot share a process. The tools here fork worker processes, each with its own copy of the QuantLib state, and hand
+them the work through memory inherited at fork time. Only the chunk positions and the results are pickled, so the
+tasks may hold QuantLib objects, TimeSeries and closures.
+
+Threads of the same process share the QuantLib state, so calculations in threads are serialized by
+:py:func:`evaluation_date`, which holds a process-wide lock while the evaluation date is set. Every change of the
+evaluation date in tsfin goes through :py:func:`switch_evaluation_date`, which takes the same lock, so no thread can
+change the date under a calculation holding it.
+"""
+import os
+import itertools
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from functools import wraps
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+import QuantLib as ql
+
+# Held while a calculation depends on the QuantLib global evaluation date. Reentrant, so that nested calculations in
+# the same thread do not deadlock.
+EVALUATION_DATE_LOCK = threading.RLock()
+
+
+def _reset_evaluation_date_lock():
+    # A forked process has a single thread and its own QuantLib state, so it starts with a free lock even if another
+    # thread of the parent held it at fork time.
+    global EVALUATION_DATE_LOCK
+    EVALUATION_DATE_LOCK = threading.RLock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_evaluation_date_lock)
+
+# Tasks waiting to be run by forked workers, by task id. Workers inherit this dict when forked.
+_FORK_TASKS = dict()
+_FORK_TASK_IDS = itertools.count()
+
+
+def _run_fork_task(task_id, position):
+    function, chunks = _FORK_TASKS[task_id]
+    return function(chunks[position])
+
+
+def can_fork():
+    """
+    Returns
+    -------
+    bool
+        Whether worker processes can be started with the 'fork' method in this platform.
+    """
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def fork_map(function, chunks, processes=None):
+    """Apply `function` to each chunk in forked worker processes.
+
+    Falls back to a serial loop in the calling process when forking is not available, or when there is only one chunk
+    or one process.
+
+    Parameters
+    ----------
+    function: callable
+        A function of one argument. It is not pickled, so it may be a closure or a bound method.
+    chunks: iterable
+        The arguments of each call. They are not pickled either.
+    processes: int, optional
+        Maximum number of worker processes. Default: the number of CPUs.
+
+    Returns
+    -------
+    list
+        The results of `function` for each chunk, in the order of `chunks`. The results must be picklable.
+    """
+    chunks = list(chunks)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(int(processes), len(chunks))
+    if processes <= 1 or not can_fork():
+        return [function(chunk) for chunk in chunks]
+    task_id = next(_FORK_TASK_IDS)
+    _FORK_TASKS[task_id] = (function, chunks)
+    try:
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('fork')) as executor:
+            return list(executor.map(_run_fork_task, itertools.repeat(task_id, len(chunks)), range(len(chunks))))
+    finally:
+        del _FORK_TASKS[task_id]
+
+
+def split_positions(size, parts):
+    """Split the positions of an array into contiguous chunks.
+
+    Parameters
+    ----------
+    size: int
+        The length of the array.
+    parts: int
+        The maximum number of chunks.
+
+    Returns
+    -------
+    list of numpy.ndarray of int
+        The positions in each chunk. Empty chunks are dropped.
+    """
+    parts = max(1, min(int(parts), size))
+    return [positions for positions in np.array_split(np.arange(size), parts) if len(positions) > 0]
+
+
+def switch_evaluation_date(date):
+    """Set the QuantLib global evaluation date, skipping the assignment (and the notification of every observer of the
+    evaluation date) if it is already set to `date`.
+
+    The assignment is made under :py:data:`EVALUATION_DATE_LOCK`, so it waits for the calculations of other threads
+    holding the lock (see :py:func:`evaluation_date`).
+
+    Parameters
+    ----------
+    date: QuantLib.Date
+        The new evaluation date.
+    """
+    with EVALUATION_DATE_LOCK:
+        settings = ql.Settings.instance()
+        if settings.evaluationDate != date:
+            settings.evaluationDate = date
+
+
+@contextmanager
+def evaluation_date(date=None, restore=True):
+    """Context manager setting the QuantLib global evaluation date, serialized across threads.
+
+    The calling thread holds :py:data:`EVALUATION_DATE_LOCK` inside the context, so calculations of other threads
+    waiting for the lock cannot change the evaluation date under it.
+
+    Parameters
+    ----------
+    date: QuantLib.Date, optional
+        The evaluation date inside the context. Default: leave the evaluation date unchanged.
+    restore: bool, optional
+        Whether to restore the previous evaluation date when leaving the context. Default: True.
+
+    Examples
+    --------
+    # >>> with evaluation_date(ql.Date(4, 3, 2019)):
+    ...     value = bond.ytm(date=ql.Date(4, 3, 2019))
+    """
+    # The lock is looked up on each call, since it is replaced in forked processes.
+    with EVALUATION_DATE_LOCK:
+        previous_date = ql.Settings.instance().evaluationDate
+        if date is not None:
+            switch_evaluation_date(date)
+        try:
+            yield
+        finally:
+            if restore:
+                switch_evaluation_date(previous_date)
+
+
+def serialize_evaluation_date(f=None, restore=True):
+    """Decorator running a function that sets the QuantLib global evaluation date inside :py:func:`evaluation_date`,
+    i.e. under :py:data:`EVALUATION_DATE_LOCK`.
+
+    Parameters
+    ----------
+    f: function
+    restore: bool, optional
+        Whether to restore the evaluation date of the caller on return. Pass False for functions returning objects
+        that depend on the evaluation date they set, e.g. curves whose reference date follows the evaluation date.
+        Default: True.
+
+    Returns
+    -------
+    function
+
+    Examples
+    --------
+    # >>> @serialize_evaluation_date(restore=False)
+    ... def update_curves(self, dates):
+    ...     pass
+    """
+    if f is None:
+        return lambda function: serialize_evaluation_date(function, restore=restore)
+
+    @wraps(f)
+    def new_f(*args, **kwargs):
+        with evaluation_date(restore=restore):
+            return f(*args, **kwargs)
+    return new_f
+
+
+def _run_on_date(function, date, args, kwargs):
+    with evaluation_date(date):
+        return function(date, *args, **kwargs)
+
+
+class DateShardedExecutor:
+    """ Executor of calculations by date, each one run with the QuantLib evaluation date set to its date.
+
+    * :py:meth:`submit` runs single calculations in a pool of threads. The threads share the QuantLib state, so each
+      calculation holds :py:data:`EVALUATION_DATE_LOCK` while it runs: concurrent requests are serialized instead of
+      corrupting each other's evaluation date.
+    * :py:meth:`map` runs batches of calculations in forked worker processes, each with its own QuantLib state. The
+      dates are sorted and split in contiguous shards, one per process, so that each date is evaluated by a single
+      worker. The calculations submitted to the threads are drained before forking, and new ones wait until the
+      workers are started and done.
+
+    Parameters
+    ----------
+    processes: int, optional
+        Maximum number of worker processes of :py:meth:`map`. Default: the number of CPUs.
+    threads: int, optional
+        Number of threads of :py:meth:`submit`. Default: see :py:class:`concurrent.futures.ThreadPoolExecutor`.
+    """
+    def __init__(self, processes=None, threads=None):
+        self.processes = processes
+        self._threads = ThreadPoolExecutor(max_workers=threads)
+        # Futures of the running calculations of submit, and number of calls of map forking workers.
+        self._pending = set()
+        self._forking = 0
+        self._state = threading.Condition()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def submit(self, function, date, *args, **kwargs):
+        """Run ``function(date, *args, **kwargs)`` in a thread, with the evaluation date set to `date`.
+
+        Parameters
+        ----------
+        function: callable
+            The calculation.
+        date: QuantLib.Date
+            The evaluation date of the calculation.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            The future result of the calculation.
+        """
+        with self._state:
+            self._state.wait_for(lambda: self._forking == 0)
+            future = self._threads.submit(_run_on_date, function, date, args, kwargs)
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future):
+        with self._state:
+            self._pending.discard(future)
+            self._state.notify_all()
+
+    def map(self, function, dates, *iterables):
+        """Apply ``function(date, *items)`` to each date and items, sharding the dates over worker processes.
+
+        Runs in this process, serialized by :py:func:`evaluation_date`, where forking is not available or there is a
+        single shard.
+
+        Parameters
+        ----------
+        function: callable
+            The calculation. It is not pickled, so it may be a closure or a bound method.
+        dates: list of QuantLib.Date
+            The evaluation date of each calculation.
+        iterables: iterables
+            Further arguments of each calculation, aligned with `dates`.
+
+        Returns
+        -------
+        list
+            The results of the calculations, in the order of `dates`. The results must be picklable.
+        """
+        dates = list(dates)
+        items = list(zip(*iterables)) if iterables else [()] * len(dates)
+        # Calculations sorted by date, so that the shards are contiguous ranges of dates and each worker only changes
+        # the evaluation date when the date changes.
+        order = sorted(range(len(dates)), key=lambda i: dates[i].serialNumber())
+        serials = np.array([dates[i].serialNumber() for i in order], dtype=np.int64)
+        starts = np.flatnonzero(np.r_[True, serials[1:] != serials[:-1]]) if len(serials) > 0 else serials
+        ends = np.r_[starts[1:], len(serials)].astype(np.int64)
+        shards = [[order[k] for start, end in zip(starts[positions], ends[positions]) for k in range(start, end)]
+                  for positions in split_positions(len(starts), self.processes or os.cpu_count() or 1)]
+
+        def run(shard):
+            results = list()
+            for i in shard:
+                with evaluation_date(dates[i], restore=False):
+                    results.append(function(dates[i], *items[i]))
+            return results
+
+        values = [None] * len(dates)
+        if len(shards) <= 1 or not can_fork():
+            with evaluation_date():
+                results = [run(shard) for shard in shards]
+        else:
+            # Fork without any calculation of the threads running, so that the workers start from a consistent
+            # QuantLib state.
+            with self._state:
+                self._forking += 1
+                self._state.wait_for(lambda: not self._pending)
+            try:
+                results = fork_map(run, shards, processes=self.processes)
+            finally:
+                with self._state:
+                    self._forking -= 1
+                    self._state.notify_all()
+        for shard, shard_results in zip(shards, results):
+            for i, value in zip(shard, shard_results):
+                values[i] = value
+        return values
+
+    def shutdown(self, wait=True):
+        """Shut down the threads of :py:meth:`submit`.
+
+        Parameters
+        ----------
+        wait: bool, optional
+            Whether to wait for the pending calculations. Default: True.
+        """
+        self._threads.shutdown(wait=wait)
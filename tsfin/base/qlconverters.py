@@ -17,6 +17,7 @@
 """
 Functions for converting strings to QuantLib objects. Used to map attributes stored in the database to objects.
 """
+import numpy as np
 import pandas as pd
 import QuantLib as ql
 
@@ -35,6 +36,186 @@ def to_ql_date(arg):
         return ql.Date(arg.day, arg.month, arg.year)
 
 
+QL_SERIAL_EPOCH = pd.Timestamp(1899, 12, 30)
+
+
+def to_ql_date_serial(arg):
+    """Converts date-like object(s) to QuantLib date serial number(s), i.e. ``ql.Date.serialNumber()``.
+
+    Parameters
+    ----------
+    arg: date-like or list-like of date-like
+        The date(s) to be converted. QuantLib dates, strings, datetime.datetime and numpy.datetime64 are accepted.
+
+    Returns
+    -------
+    int or numpy.ndarray of int32
+        The serial number(s) of the date(s). The time of the day is ignored, as in :py:func:`to_ql_date`.
+    """
+    if isinstance(arg, ql.Date):
+        return arg.serialNumber()
+    if hasattr(arg, '__iter__') and not isinstance(arg, str):
+        values = arg if isinstance(arg, pd.DatetimeIndex) else list(arg)
+        if len(values) > 0 and all(isinstance(value, ql.Date) for value in values):
+            return np.array([value.serialNumber() for value in values], dtype=np.int32)
+        dates = pd.DatetimeIndex(pd.to_datetime(values)).normalize()
+        return np.asarray((dates - QL_SERIAL_EPOCH).days, dtype=np.int32)
+    return (pd.to_datetime(arg).normalize() - QL_SERIAL_EPOCH).days
+
+
+class _Registry:
+    """ Map of names to QuantLib objects, built on first use.
+
+    The objects are memoized both by their upper case name and by the argument as given, so that repeated
+    conversions are a single dict lookup.
+
+    Parameters
+    ----------
+    kind: str
+        What the objects are, for error messages.
+    factories: dict
+        Functions without arguments returning each object, by upper case name.
+    normalize: function, optional
+        Conversion of the arguments to upper case names. Default: ``arg.upper()``.
+    """
+    def __init__(self, kind, factories, normalize=None):
+        self.kind = kind
+        self.normalize = normalize if normalize is not None else (lambda arg: arg.upper())
+        self._factories = dict(factories)
+        self._values = dict()
+        self.memo = dict()
+
+    def register(self, name, factory):
+        name = str(name).upper()
+        self._factories[name] = factory
+        self._values.pop(name, None)
+        # The arguments memoized for the previous object may be spelled in any case.
+        self.memo.clear()
+
+    def convert(self, arg):
+        # The converters look up self.memo before calling this.
+        name = self.normalize(arg)
+        try:
+            value = self._values[name]
+        except KeyError:
+            try:
+                factory = self._factories[name]
+            except KeyError:
+                raise ValueError("Unable to convert {0} to a QuantLib {1}".format(arg, self.kind))
+            value = self._values[name] = factory()
+        try:
+            self.memo[arg] = value
+        except TypeError:
+            pass
+        return value
+
+
+def _constant(value):
+    return lambda: value
+
+
+def _brazil_exchange_calendar():
+    bz_calendar = ql.Brazil(ql.Brazil.Exchange)
+    bz_calendar.removeHoliday(ql.Date(9, 7, 2020))
+    return bz_calendar
+
+
+_FREQUENCIES = _Registry('frequency', {
+    'ANNUAL': _constant(ql.Annual),
+    'SEMIANNUAL': _constant(ql.Semiannual),
+    'QUARTERLY': _constant(ql.Quarterly),
+    'EVERY_FOUR_MONTH': _constant(ql.EveryFourthMonth),
+    'BIMONTHLY': _constant(ql.Bimonthly),
+    'MONTHLY': _constant(ql.Monthly),
+    'AT_MATURITY': _constant(ql.Once),
+    'BIWEEKLY': _constant(ql.Biweekly),
+    'WEEKLY': _constant(ql.Weekly),
+    'DAILY': _constant(ql.Daily),
+    'NOFREQUENCY': _constant(ql.NoFrequency),
+    'NO_FREQUENCY': _constant(ql.NoFrequency),
+})
+
+_WEEKDAYS = _Registry('weekday', {
+    'SUNDAY': _constant(ql.Sunday),
+    'MONDAY': _constant(ql.Monday),
+    'TUESDAY': _constant(ql.Tuesday),
+    'WEDNESDAY': _constant(ql.Wednesday),
+    'THURSDAY': _constant(ql.Thursday),
+    'FRIDAY': _constant(ql.Friday),
+    'SATURDAY': _constant(ql.Saturday),
+}, normalize=lambda arg: str(arg).upper())
+
+_CALENDARS = _Registry('calendar', {
+    'US': lambda: ql.UnitedStates(ql.UnitedStates.GovernmentBond),
+    'NYSE': lambda: ql.UnitedStates(ql.UnitedStates.NYSE),
+    'CE': lambda: ql.UnitedStates(ql.UnitedStates.NYSE),
+    'FD': lambda: ql.UnitedStates(ql.UnitedStates.FederalReserve),
+    'EX': lambda: ql.JointCalendar(ql.UnitedStates(ql.UnitedStates.NYSE), ql.UnitedStates(ql.UnitedStates.Settlement)),
+    'GB': lambda: ql.UnitedKingdom(),
+    'UK': lambda: ql.UnitedKingdom(),
+    'LS': lambda: ql.UnitedKingdom(ql.UnitedKingdom.Exchange),
+    'BZ': lambda: ql.Brazil(ql.Brazil.Settlement),
+    'B2': _brazil_exchange_calendar,
+    'TE': lambda: ql.TARGET(),
+    'TARGET': lambda: ql.TARGET(),
+    'C%': lambda: ql.China(),
+    'C+': lambda: ql.China(),
+    'JN': lambda: ql.Japan(),
+    'SZ': lambda: ql.Switzerland(),
+    'AU': lambda: ql.Australia(),
+    'SA': lambda: ql.SouthAfrica(),
+    'TU': lambda: ql.Turkey(),
+    'NULL': lambda: ql.NullCalendar(),
+})
+
+_CURRENCIES = _Registry('currency', {
+    'USD': lambda: ql.USDCurrency(),
+    'BRL': lambda: ql.BRLCurrency(),
+    'EUR': lambda: ql.EURCurrency(),
+    'GBP': lambda: ql.GBPCurrency(),
+    'AUD': lambda: ql.AUDCurrency(),
+    'JPY': lambda: ql.JPYCurrency(),
+    'TRY': lambda: ql.TRYCurrency(),
+    'ZAR': lambda: ql.ZARCurrency(),
+    'CHF': lambda: ql.CHFCurrency(),
+    'CNY': lambda: ql.CNYCurrency(),
+    'CNH': lambda: ql.CNYCurrency(),
+})
+
+_BUSINESS_CONVENTIONS = _Registry('business convention', {
+    'FOLLOWING': _constant(ql.Following),
+    'MODIFIEDFOLLOWING': _constant(ql.ModifiedFollowing),
+    'PRECEDING': _constant(ql.Preceding),
+    'MODIFIEDPRECEDING': _constant(ql.ModifiedPreceding),
+    'UNADJUSTED': _constant(ql.Unadjusted),
+})
+
+_DAY_COUNTERS = _Registry('day counter', {
+    'THIRTY360E': lambda: ql.Thirty360(ql.Thirty360.European),
+    'THIRTY360': lambda: ql.Thirty360(),
+    'ACTUAL360': lambda: ql.Actual360(),
+    'ACTUAL365': lambda: ql.Actual365Fixed(),
+    'ACTUALACTUAL': lambda: ql.ActualActual(ql.ActualActual.ISMA),
+    'ACTUALACTUALISMA': lambda: ql.ActualActual(ql.ActualActual.ISMA),
+    'ACTUALACTUALISDA': lambda: ql.ActualActual(ql.ActualActual.ISDA),
+    'BUSINESS252': lambda: ql.Business252(),
+})
+
+_DATE_GENERATIONS = _Registry('date generation specification', {
+    'FORWARD': _constant(ql.DateGeneration.Forward),
+    'BACKWARD': _constant(ql.DateGeneration.Backward),
+    'CDS20IMM': _constant(ql.DateGeneration.TwentiethIMM),
+    'CDS2015': _constant(ql.DateGeneration.CDS2015),
+    'CDS': _constant(ql.DateGeneration.CDS),
+})
+
+_COMPOUNDINGS = _Registry('compounding specification', {
+    'COMPOUNDED': _constant(ql.Compounded),
+    'SIMPLE': _constant(ql.Simple),
+    'CONTINUOUS': _constant(ql.Continuous),
+})
+
+
 def to_ql_frequency(arg):
     """Converts string with a period representing a tenor to a QuantLib period.
 
@@ -43,31 +224,10 @@ def to_ql_frequency(arg):
     :return QuantLib.Frequency, QuantLib.Period
 
     """
-
-    if arg.upper() == "ANNUAL":
-        return ql.Annual
-    elif arg.upper() == "SEMIANNUAL":
-        return ql.Semiannual
-    elif arg.upper() == "QUARTERLY":
-        return ql.Quarterly
-    elif arg.upper() == "EVERY_FOUR_MONTH":
-        return ql.EveryFourthMonth
-    elif arg.upper() == "BIMONTHLY":
-        return ql.Bimonthly
-    elif arg.upper() == "MONTHLY":
-        return ql.Monthly
-    elif arg.upper() == "AT_MATURITY":
-        return ql.Once
-    elif arg.upper() == "BIWEEKLY":
-        return ql.Biweekly
-    elif arg.upper() == "WEEKLY":
-        return ql.Weekly
-    elif arg.upper() == "DAILY":
-        return ql.Daily
-    elif arg.upper() in ['NOFREQUENCY', 'NO_FREQUENCY']:
-        return ql.NoFrequency
-    else:
-        raise ValueError("Unable to convert {} to a QuantLib frequency".format(arg))
+    try:
+        return _FREQUENCIES.memo[arg]
+    except (KeyError, TypeError):
+        return _FREQUENCIES.convert(arg)
 
 
 def to_ql_weekday(arg):
@@ -78,70 +238,37 @@ def to_ql_weekday(arg):
     :return QuantLib.Weekday
 
     """
-    arg = str(arg).upper()
-    if arg == 'SUNDAY':
-        return ql.Sunday
-    elif arg == 'MONDAY':
-        return ql.Monday
-    elif arg == 'TUESDAY':
-        return ql.Tuesday
-    elif arg == 'WEDNESDAY':
-        return ql.Wednesday
-    elif arg == 'THURSDAY':
-        return ql.Thursday
-    elif arg == 'FRIDAY':
-        return ql.Friday
-    elif arg == 'SATURDAY':
-        return ql.Saturday
-    else:
-        raise ValueError("Unable to convert {} to a QuantLib weekday".format(arg))
+    try:
+        return _WEEKDAYS.memo[arg]
+    except (KeyError, TypeError):
+        return _WEEKDAYS.convert(arg)
 
 
 def to_ql_calendar(arg):
     """Converts string with a calendar name to a calendar instance of QuantLib.
 
+    The calendars are built once and shared by all the callers. Custom calendars can be added with
+    :py:func:`register_calendar`.
+
     :param arg: str
         The Calendar 2 letter code, exceptions being TARGET, NYSE and NULL
     :return QuantLib.Calendar
     """
+    try:
+        return _CALENDARS.memo[arg]
+    except (KeyError, TypeError):
+        return _CALENDARS.convert(arg)
 
-    if arg.upper() == "US":
-        return ql.UnitedStates(ql.UnitedStates.GovernmentBond)
-    elif arg.upper() in ["NYSE", "CE"]:
-        return ql.UnitedStates(ql.UnitedStates.NYSE)
-    elif arg.upper() == "FD":
-        return ql.UnitedStates(ql.UnitedStates.FederalReserve)
-    elif arg.upper() == "EX":
-        return ql.JointCalendar(ql.UnitedStates(ql.UnitedStates.NYSE),
-                                ql.UnitedStates(ql.UnitedStates.Settlement))
-    elif arg.upper() in ["GB", "UK"]:
-        return ql.UnitedKingdom()
-    elif arg.upper() == 'LS':
-        return ql.UnitedKingdom(ql.UnitedKingdom.Exchange)
-    elif arg.upper() == "BZ":
-        return ql.Brazil(ql.Brazil.Settlement)
-    elif arg.upper() == "B2":
-        bz_calendar = ql.Brazil(ql.Brazil.Exchange)
-        bz_calendar.removeHoliday(ql.Date(9, 7, 2020))
-        return bz_calendar
-    elif arg.upper() in ["TE", 'TARGET']:
-        return ql.TARGET()
-    elif arg.upper() in ['C%', 'C+']:
-        return ql.China()
-    elif arg.upper() == 'JN':
-        return ql.Japan()
-    elif arg.upper() == 'SZ':
-        return ql.Switzerland()
-    elif arg.upper() == 'AU':
-        return ql.Australia()
-    elif arg.upper() == 'SA':
-        return ql.SouthAfrica()
-    elif arg.upper() == 'TU':
-        return ql.Turkey()
-    elif arg.upper() == 'NULL':
-        return ql.NullCalendar()
-    else:
-        raise ValueError("Unable to convert {} to a QuantLib calendar".format(arg))
+
+def register_calendar(code, calendar):
+    """Add a calendar code to :py:func:`to_ql_calendar`, or replace an existing one.
+
+    :param code: str
+        The calendar code, case insensitive.
+    :param calendar: QuantLib.Calendar or function
+        The calendar, or a function without arguments returning it, called on the first use of `code`.
+    """
+    _CALENDARS.register(code, calendar if callable(calendar) else _constant(calendar))
 
 
 def to_ql_currency(arg):
@@ -151,29 +278,10 @@ def to_ql_currency(arg):
         The currency 3 letter identifier
     :return QuantLib.Currency
     """
-
-    if arg.upper() == "USD":
-        return ql.USDCurrency()
-    elif arg.upper() == "BRL":
-        return ql.BRLCurrency()
-    elif arg.upper() == "EUR":
-        return ql.EURCurrency()
-    elif arg.upper() == "GBP":
-        return ql.GBPCurrency()
-    elif arg.upper() == "AUD":
-        return ql.AUDCurrency()
-    elif arg.upper() == "JPY":
-        return ql.JPYCurrency()
-    elif arg.upper() == "TRY":
-        return ql.TRYCurrency()
-    elif arg.upper() == "ZAR":
-        return ql.ZARCurrency()
-    elif arg.upper() == "CHF":
-        return ql.CHFCurrency()
-    elif arg.upper() in ["CNY", "CNH"]:
-        return ql.CNYCurrency()
-    else:
-        raise ValueError("Unable to convert {} to a QuantLib currency".format(arg))
+    try:
+        return _CURRENCIES.memo[arg]
+    except (KeyError, TypeError):
+        return _CURRENCIES.convert(arg)
 
 
 def to_ql_business_convention(arg):
@@ -184,47 +292,26 @@ def to_ql_business_convention(arg):
     :return QuantLib.BusinessConvention
 
     """
-
-    if arg.upper() == "FOLLOWING":
-        return ql.Following
-    elif arg.upper() == "MODIFIEDFOLLOWING":
-        return ql.ModifiedFollowing
-    elif arg.upper() == "PRECEDING":
-        return ql.Preceding
-    elif arg.upper() == "MODIFIEDPRECEDING":
-        return ql.ModifiedPreceding
-    elif arg.upper() == "UNADJUSTED":
-        return ql.Unadjusted
-    else:
-        raise ValueError("Unable to convert {} to a QuantLib business convention".format(arg))
+    try:
+        return _BUSINESS_CONVENTIONS.memo[arg]
+    except (KeyError, TypeError):
+        return _BUSINESS_CONVENTIONS.convert(arg)
 
 
 def to_ql_day_counter(arg):
     """Converts a string with day_counter name to the corresponding QuantLib object.
 
+    The day counters are built once and shared by all the callers.
+
     :param arg: str
         The day count name
     :return QuantLib.DayCounter
 
     """
-    if arg.upper() == "THIRTY360E":
-        return ql.Thirty360(ql.Thirty360.European)
-    elif arg.upper() == "THIRTY360":
-        return ql.Thirty360()
-    elif arg.upper() == "ACTUAL360":
-        return ql.Actual360()
-    elif arg.upper() == "ACTUAL365":
-        return ql.Actual365Fixed()
-    elif arg.upper() == "ACTUALACTUAL":
-        return ql.ActualActual(ql.ActualActual.ISMA)
-    elif arg.upper() == "ACTUALACTUALISMA":
-        return ql.ActualActual(ql.ActualActual.ISMA)
-    elif arg.upper() == "ACTUALACTUALISDA":
-        return ql.ActualActual(ql.ActualActual.ISDA)
-    elif arg.upper() == "BUSINESS252":
-        return ql.Business252()
-    else:
-        raise ValueError("Unable to convert {} to a QuantLib day counter".format(arg))
+    try:
+        return _DAY_COUNTERS.memo[arg]
+    except (KeyError, TypeError):
+        return _DAY_COUNTERS.convert(arg)
 
 
 def to_ql_date_generation(arg):
@@ -235,18 +322,10 @@ def to_ql_date_generation(arg):
     :return QuantLib.DateGeneration
 
     """
-    if arg.upper() == "FORWARD":
-        return ql.DateGeneration.Forward
-    elif arg.upper() == "BACKWARD":
-        return ql.DateGeneration.Backward
-    elif arg.upper() == "CDS20IMM":
-        return ql.DateGeneration.TwentiethIMM
-    elif arg.upper() == "CDS2015":
-        return ql.DateGeneration.CDS2015
-    elif arg.upper() == "CDS":
-        return ql.DateGeneration.CDS
-    else:
-        raise ValueError("Unable to convert {} to a QuantLib date generation specification".format(arg))
+    try:
+        return _DATE_GENERATIONS.memo[arg]
+    except (KeyError, TypeError):
+        return _DATE_GENERATIONS.convert(arg)
 
 
 def to_ql_compounding(arg):
@@ -257,14 +336,10 @@ def to_ql_compounding(arg):
     :return QuantLib.Compounding
 
     """
-    if arg.upper() == "COMPOUNDED":
-        return ql.Compounded
-    elif arg.upper() == "SIMPLE":
-        return ql.Simple
-    elif arg.upper() == "CONTINUOUS":
-        return ql.Continuous
-    else:
-        raise ValueError("Unable to convert {} to a QuantLib compounding specification".format(arg))
+    try:
+        return _COMPOUNDINGS.memo[arg]
+    except (KeyError, TypeError):
+        return _COMPOUNDINGS.convert(arg)
 
 
 def to_ql_duration(arg):
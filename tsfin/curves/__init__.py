@@ -1,3 +1,6 @@
+from tsfin.curves.curvestore import CurveStore, FrozenCurveStore
+from tsfin.curves.nodecurve import NodeCurve
+from tsfin.curves.curvesurface import CurveSurface
 from tsfin.curves.yieldcurve import YieldCurveTimeSeries
 from tsfin.curves.hybridyieldcurve import HybridYieldCurveTimeSeries
 from tsfin.curves.currencycurve import CurrencyCurveTimeSeries
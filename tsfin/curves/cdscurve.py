@@ -22,8 +22,10 @@ from collections import namedtuple, Counter
 from operator import attrgetter
 import QuantLib as ql
 import numpy as np
-from tsfin.base import to_ql_date, to_list, conditional_vectorize, find_le, find_gt
+from tsfin.base import to_ql_date, to_list, conditional_vectorize, find_le, find_gt, to_ql_date_serial, \
+    year_fractions, fork_map, split_positions, switch_evaluation_date
 from tsfin.constants import RECOVERY_RATE
+from tsfin.curves.yieldcurve import YieldCurveTimeSeries
 
 
 # ExtRateHelpers are a named tuples containing QuantLib RateHelpers objects and other meta-information.
@@ -63,6 +65,8 @@ class CDSCurveTimeSeries:
         self.day_counter = day_counter
         self.keep_only_on_the_run_month = keep_only_on_the_run_month
         self.hazard_curves = dict()
+        # Node date serials and hazard rates of each curve, by date.
+        self.hazard_nodes = dict()
         self.ignore_errors = ignore_errors
         self.other_rate_helper_args = other_rate_helper_args
 
@@ -105,40 +109,87 @@ class CDSCurveTimeSeries:
 
         return helpers
 
-    def update_curves(self, dates):
-        """ Update ``self.yield_curves`` with the yield curves of each date in `dates`.
+    def _bootstrap_nodes(self, date):
+        """
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the hazard curve.
+
+        Returns
+        -------
+        tuple (numpy.ndarray of int64, numpy.ndarray of float64)
+            The serial numbers of the node dates and the flat hazard rates of the curve bootstrapped at `date`.
+        """
+        switch_evaluation_date(date)
+
+        helpers_dict = self._get_helpers(date)
+
+        # Instantiate the curve
+        helpers = [ndhelper.helper for ndhelper in helpers_dict.values()]
+        # Just bootstrapping the nodes
+        hazard_curve = ql.PiecewiseFlatHazardRate(date, helpers, self.day_counter)
+        hazard_dates = hazard_curve.dates()
+        hazard_rates = [hazard_curve.hazardRate(h_date) for h_date in hazard_dates]
+        return np.array([h_date.serialNumber() for h_date in hazard_dates], dtype=np.int64), \
+            np.array(hazard_rates, dtype=np.float64)
+
+    def _curve_from_nodes(self, node_serials, hazard_rates):
+        hazard_curve = ql.HazardRateCurve([ql.Date(int(serial)) for serial in node_serials],
+                                          [float(rate) for rate in hazard_rates], self.day_counter, self.calendar)
+        hazard_curve.enableExtrapolation()
+        return hazard_curve
+
+    def update_curves(self, dates, processes=None):
+        """ Update ``self.hazard_curves`` with the hazard curves of each date in `dates`.
 
         Parameters
         ----------
         dates: list of QuantLib.Dates
+        processes: int, optional
+            If greater than one, bootstrap the curves in up to this number of worker processes. The base yield curves
+            are built here first, so that the workers share them instead of building them again, and each worker
+            returns the nodes of its hazard curves. Default: bootstrap in this process.
         """
-        dates = to_list(dates)
+        dates = [to_ql_date(date) for date in to_list(dates)]
 
-        for date in dates:
-            date = to_ql_date(date)
-            ql.Settings.instance().evaluationDate = date
+        if processes is not None and processes > 1 and len(dates) > 1:
+            if isinstance(self.base_yield_curve, YieldCurveTimeSeries):
+                missing = [date for date in dates if self.base_yield_curve.yield_curves.peek(date) is None]
+                self.base_yield_curve.update_curves(missing, processes=processes)
+            else:
+                for date in dates:
+                    self.base_yield_curve.yield_curve(date)
 
-            helpers_dict = self._get_helpers(date)
+            def bootstrap_chunk(positions):
+                return [self._bootstrap_nodes(dates[i]) for i in positions]
 
-            # Instantiate the curve
-            helpers = [ndhelper.helper for ndhelper in helpers_dict.values()]
-            # Just bootstrapping the nodes
-            hazard_curve = ql.PiecewiseFlatHazardRate(date, helpers, self.day_counter)
-            hazard_dates = hazard_curve.dates()
-            hazard_rates = [hazard_curve.hazardRate(h_date) for h_date in hazard_dates]
+            chunks = split_positions(len(dates), processes)
+            for positions, nodes in zip(chunks, fork_map(bootstrap_chunk, chunks, processes=processes)):
+                for i, (node_serials, hazard_rates) in zip(positions, nodes):
+                    self.hazard_nodes[dates[i]] = (node_serials, hazard_rates)
+                    self.hazard_curves[dates[i]] = self._curve_from_nodes(node_serials, hazard_rates)
+            return
 
-            hazard_curve = ql.HazardRateCurve(hazard_dates, hazard_rates, self.day_counter, self.calendar)
-            hazard_curve.enableExtrapolation()
+        for date in dates:
+            node_serials, hazard_rates = self._bootstrap_nodes(date)
+            self.hazard_nodes[date] = (node_serials, hazard_rates)
+            self.hazard_curves[date] = self._curve_from_nodes(node_serials, hazard_rates)
 
-            self.hazard_curves[date] = hazard_curve
+    def _update_all_curves(self, processes=None):
+        """ Build the hazard curves of all the dates with at least two quotes, skipping the ones already built.
 
-    def _update_all_curves(self):
+        Parameters
+        ----------
+        processes: int, optional
+            Number of worker processes, see :py:meth:`update_curves`.
+        """
         index = self.ts_collection[0].ts_values.index.tolist()
         for i in range(1, len(self.ts_collection)):
             index += self.ts_collection[i].ts_values.index.tolist()
         counted_dates = Counter(index)
-        possible_dates = [date for date, count in counted_dates.items() if count >= 2]
-        self.update_curves(possible_dates)
+        possible_dates = [to_ql_date(date) for date, count in counted_dates.items() if count >= 2]
+        self.update_curves([date for date in possible_dates if date not in self.hazard_curves], processes=processes)
 
     @conditional_vectorize('date')
     def hazard_curve(self, date):
@@ -180,6 +231,62 @@ class CDSCurveTimeSeries:
                 self.update_curves(date)
             return self.hazard_curves[date]
 
+    def survival_probabilities(self, date, to_date=None, to_time=None):
+        """ Survival probabilities of the hazard curve at a date, for many dates or times at once.
+
+        The probabilities are computed in NumPy from the flat hazard rates between the nodes of the curve, as
+        QuantLib does.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the hazard curve.
+        to_date: array-like of date-like, optional
+            The target dates.
+        to_time: array-like of float, optional
+            Times in years of the targets, used when `to_date` is not given.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The survival probabilities, with the shape of `to_date` or `to_time`.
+        """
+        date = to_ql_date(date)
+        hazard_curve = self.hazard_curve(date)
+        try:
+            node_serials, hazard_rates = self.hazard_nodes[date]
+        except KeyError:
+            # A curve of another date, returned when ignore_errors is set.
+            node_dates = hazard_curve.dates()
+            node_serials = np.array([node_date.serialNumber() for node_date in node_dates], dtype=np.int64)
+            hazard_rates = np.array([hazard_curve.hazardRate(node_date) for node_date in node_dates],
+                                    dtype=np.float64)
+        reference_date = ql.Date(int(node_serials[0]))
+        node_times = year_fractions(self.day_counter, reference_date, node_serials)
+        if to_date is not None:
+            to_time = year_fractions(self.day_counter, reference_date,
+                                     np.asarray(to_ql_date_serial(to_date), dtype=np.int64))
+        return _survival_probabilities(node_times, hazard_rates, np.asarray(to_time, dtype=np.float64))
+
+    def default_probabilities(self, date, to_date=None, to_time=None):
+        """ Default probabilities of the hazard curve at a date, for many dates or times at once.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the hazard curve.
+        to_date: array-like of date-like, optional
+            The target dates.
+        to_time: array-like of float, optional
+            Times in years of the targets, used when `to_date` is not given.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The default probabilities, with the shape of `to_date` or `to_time`.
+        """
+        return 1.0 - self.survival_probabilities(date, to_date=to_date, to_time=to_time)
+
     @conditional_vectorize('date')
     def probability_curve_handle(self, date):
         """ Handle for a yield curve at a given date.
@@ -223,7 +330,7 @@ class CDSCurveTimeSeries:
 
         date = to_ql_date(date)
         to_date = to_ql_date(to_date)
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         return self.hazard_curve(date).survivalProbability(to_date)
 
     @conditional_vectorize('date')
@@ -239,7 +346,7 @@ class CDSCurveTimeSeries:
         date = to_ql_date(date)
         ql_period = ql.PeriodParser.parse(str(tenor).upper())
         to_date = self.calendar.advance(date, ql_period)
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         return self.hazard_curve(date).survivalProbability(to_date)
 
     @conditional_vectorize('date')
@@ -254,7 +361,7 @@ class CDSCurveTimeSeries:
         """
 
         date = to_ql_date(date)
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         return self.hazard_curve(date).survivalProbability(time, True)
 
     @conditional_vectorize('date')
@@ -269,7 +376,7 @@ class CDSCurveTimeSeries:
 
         date = to_ql_date(date)
         to_date = to_ql_date(to_date)
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         return self.hazard_curve(date).defaultProbability(to_date)
 
     @conditional_vectorize('date')
@@ -285,7 +392,7 @@ class CDSCurveTimeSeries:
         date = to_ql_date(date)
         ql_period = ql.PeriodParser.parse(str(tenor).upper())
         to_date = self.calendar.advance(date, ql_period)
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         return self.hazard_curve(date).defaultProbability(to_date)
 
     @conditional_vectorize('date')
@@ -300,7 +407,7 @@ class CDSCurveTimeSeries:
         """
 
         date = to_ql_date(date)
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         return self.hazard_curve(date).defaultProbability(time, True)
 
     @conditional_vectorize('date')
@@ -315,7 +422,7 @@ class CDSCurveTimeSeries:
 
         date = to_ql_date(date)
         to_date = to_ql_date(to_date)
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         return self.hazard_curve(date).hazardRate(to_date)
 
     @conditional_vectorize('date')
@@ -331,7 +438,7 @@ class CDSCurveTimeSeries:
         date = to_ql_date(date)
         ql_period = ql.PeriodParser.parse(str(tenor).upper())
         to_date = self.calendar.advance(date, ql_period)
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         return self.hazard_curve(date).hazardRate(to_date)
 
     @conditional_vectorize('date')
@@ -346,7 +453,7 @@ class CDSCurveTimeSeries:
         """
 
         date = to_ql_date(date)
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         return self.hazard_curve(date).hazardRate(time, True)
 
     @conditional_vectorize('date')
@@ -362,7 +469,7 @@ class CDSCurveTimeSeries:
         :return: The % chance of default given the date and tenor.
         """
         date = to_ql_date(date)
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         if recovery_rate is None:
             recovery_rate = float(self.ts_collection[0].ts_attributes[RECOVERY_RATE])
         survival = self.survival_probability_to_time(date=date, time=time)
@@ -380,7 +487,7 @@ class CDSCurveTimeSeries:
         :return: The % chance of default given the date and tenor.
         """
         date = to_ql_date(date)
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         if recovery_rate is None:
             recovery_rate = float(self.ts_collection[0].ts_attributes[RECOVERY_RATE])
         ql_period = ql.PeriodParser.parse(str(tenor).upper())
@@ -402,3 +509,26 @@ class CDSCurveTimeSeries:
     @staticmethod
     def _date_to_month_year(dt_object):
         return str(dt_object.month()) + '-' + str(dt_object.year())
+
+
+def _survival_probabilities(node_times, hazard_rates, times):
+    """
+    Parameters
+    ----------
+    node_times: numpy.ndarray of float64
+        Times of the nodes of a hazard curve, from its reference date.
+    hazard_rates: numpy.ndarray of float64
+        Hazard rates at the nodes. The hazard rate between two nodes is the one at the later node, and after the last
+        node the one at the last node (QuantLib's BackwardFlat interpolation).
+    times: numpy.ndarray of float64
+        Times of the targets.
+
+    Returns
+    -------
+    numpy.ndarray of float64
+        The survival probabilities at `times`. NaN for negative times.
+    """
+    cumulative = np.concatenate(([0.0], np.cumsum(np.diff(node_times) * hazard_rates[1:])))
+    i = np.clip(np.searchsorted(node_times, times, side='right') - 1, 0, len(node_times) - 2)
+    integral = cumulative[i] + (times - node_times[i]) * hazard_rates[i + 1]
+    return np.where(times < 0.0, np.nan, np.exp(-integral))
@@ -20,16 +20,16 @@ ConstantYieldCurve, a yield curve that will be based on a pre-defined list of fo
 
 import QuantLib as ql
 from tsfin.curves.yieldcurve import SimpleYieldCurve
-from tsfin.base import to_list, to_ql_date
+from tsfin.base import to_list, to_ql_date, switch_evaluation_date
 
 
 class ConstantYieldCurve(SimpleYieldCurve):
 
     def __init__(self, forward_rates, forward_dates, calendar, day_counter, compounding,
                  business_convention=ql.Following, enable_extrapolation=True, ignore_errors=True,
-                 frozen_curve_interpolation_type='monotonic_cubic_zero'):
+                 frozen_curve_interpolation_type='monotonic_cubic_zero', curve_store=None):
         super().__init__(calendar=calendar, day_counter=day_counter, enable_extrapolation=enable_extrapolation,
-                         ignore_errors=ignore_errors)
+                         ignore_errors=ignore_errors, curve_store=curve_store)
         self.business_convention = business_convention
         self.compounding = compounding
         self.forward_dates = [
@@ -55,7 +55,7 @@ class ConstantYieldCurve(SimpleYieldCurve):
 
         for date in dates:
             date = to_ql_date(date)
-            ql.Settings.instance().evaluationDate = date
+            switch_evaluation_date(date)
             yield_curve = ql.ImpliedTermStructure(ql.YieldTermStructureHandle(self.forward_curve), date)
             if self.enable_extrapolation:
                 yield_curve.enableExtrapolation()
@@ -18,6 +18,7 @@
 Classes to model currency exchange rate curves, and build the yield curves of their base and counter currencies.
 Maybe in the future should be added to QuantLib.
 """
+from bisect import bisect_right
 from collections import namedtuple, Counter
 from operator import attrgetter
 import numpy as np
@@ -26,7 +27,7 @@ import QuantLib as ql
 from tsio import TimeSeries, TimeSeriesCollection
 from tsfin.instruments.interest_rates.depositrate import DepositRate
 from tsfin.curves import YieldCurveTimeSeries
-from tsfin.base import to_ql_date, to_list, find_le, find_gt
+from tsfin.base import to_ql_date, to_list, to_ql_date_serial, isvectorizable, year_fractions
 
 # namedtuple representing a 'dated value' for the currency curve:
 ExtCurrencyHelper = namedtuple('ExtCurrencyHelper', ['ts_name', 'maturity_date', 'helper'])
@@ -131,18 +132,28 @@ class CurrencyCurveTimeSeries:
 
         Parameters
         ----------
-        date: QuantLib.Date
-            Reference date of the currency curve.
-        to_date: QuantLib.Date
-            Maturity date for the future exchange rate.
+        date: QuantLib.Date or array-like of date-like
+            Reference date(s) of the currency curve(s).
+        to_date: QuantLib.Date or array-like of date-like
+            Maturity date(s) for the future exchange rate, broadcast with `date`.
 
         Returns
         -------
-        scalar
-            Exchange rate to `to_date`, at `date`.
+        scalar or numpy.ndarray of float64
+            Exchange rate(s) to `to_date`, at `date`.
         """
-        to_date = to_ql_date(to_date)
-        return self.currency_curve(date).exchange_rate_to_date(to_date)
+        if not isvectorizable(date):
+            return self.currency_curve(date).exchange_rate_to_date(to_date)
+        dates = np.asarray(to_ql_date_serial(date), dtype=np.int64)
+        dates, to_dates = np.broadcast_arrays(dates, np.asarray(to_ql_date_serial(to_date), dtype=np.int64))
+        rates = np.empty(dates.shape, dtype=np.float64)
+        # One vectorized query per curve date.
+        unique_dates, inverse = np.unique(dates, return_inverse=True)
+        inverse = inverse.reshape(dates.shape)
+        for i, serial in enumerate(unique_dates.tolist()):
+            positions = inverse == i
+            rates[positions] = self.currency_curve(ql.Date(serial))._exchange_rates(to_dates[positions])
+        return rates
 
     def counter_rate_to_date(self, date, to_date, base_rate):
         """ Get interest rate of the counter currency at a given date, to a given date.
@@ -333,8 +344,13 @@ class CurrencyCurve:
         self.helpers = sorted(helpers, key=attrgetter('maturity'))
         self.maturity_dates = [self.reference_date] + [helper.maturity for helper in self.helpers]
         self.nodes = {helper.maturity: helper.quote for helper in self.helpers}
-        self.nodes[reference_date] = spot
+        self.nodes[self.reference_date] = spot
         self.max_date = to_ql_date(self.maturity_dates[-1])
+        # The nodes as sorted arrays, for the interpolation.
+        node_dates = sorted(self.nodes.keys())
+        self.node_serials = np.array([node_date.serialNumber() for node_date in node_dates], dtype=np.int64)
+        self.node_values = np.array([self.nodes[node_date] for node_date in node_dates], dtype=np.float64)
+        self._node_serial_list = self.node_serials.tolist()
         self._day_counter = ql.Actual365Fixed()
         self.counter_rate_day_counter = counter_rate_day_counter
         self.counter_rate_compounding = counter_rate_compounding
@@ -362,29 +378,59 @@ class CurrencyCurve:
 
         Parameters
         ----------
-        date: QuantLib.Date
+        date: QuantLib.Date or array-like of date-like
 
         Returns
         -------
-        scalar
-            The exchange rate implied by the currency curve, using linear interpolation between nodes.
+        scalar or numpy.ndarray of float64
+            The exchange rate(s) implied by the currency curve, using linear interpolation between nodes.
         """
-        date = to_ql_date(date)
-        if date > self.max_date:
-            raise ValueError("The requested date ({0}) is after the curve's max date ({1})".format(date,
-                                                                                                   self.max_date))
-        try:
-            # If the date is in the nodes, use it.
-            return self.nodes[date]
-        except KeyError:
-            # Use linear interpolation to obtain the result.
-            lower_date_bound = find_le(self.maturity_dates, date)
-            upper_date_bound = find_gt(self.maturity_dates, date)
-            lower_bound = self.nodes[lower_date_bound]
-            upper_bound = self.nodes[upper_date_bound]
+        node_serials, node_values = self.node_serials, self.node_values
+        if not isvectorizable(date):
+            date = to_ql_date(date)
+            self._check_range(date, date)
+            i = min(max(bisect_right(self._node_serial_list, date.serialNumber()) - 1, 0), len(node_serials) - 2)
+            # i is negative for a curve with the spot only.
+            if i < 0 or date.serialNumber() == node_serials[i]:
+                return node_values[max(i, 0)]
+            lower_date_bound, upper_date_bound = ql.Date(int(node_serials[i])), ql.Date(int(node_serials[i + 1]))
+            lower_bound, upper_bound = node_values[i], node_values[i + 1]
             lower_interval = self._day_counter.yearFraction(lower_date_bound, date)
             interval = self._day_counter.yearFraction(lower_date_bound, upper_date_bound)
             return lower_bound + lower_interval * (upper_bound - lower_bound) / interval
+        return self._exchange_rates(np.asarray(to_ql_date_serial(date), dtype=np.int64))
+
+    def _exchange_rates(self, serials):
+        """
+        Parameters
+        ----------
+        serials: numpy.ndarray of int64
+            Serial numbers of the dates.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The exchange rates to the dates, as in :py:meth:`exchange_rate_to_date`.
+        """
+        node_serials, node_values = self.node_serials, self.node_values
+        if serials.size == 0:
+            return np.empty(serials.shape, dtype=np.float64)
+        self._check_range(ql.Date(int(serials.min())), ql.Date(int(serials.max())))
+        if len(node_serials) == 1:
+            return np.full(serials.shape, node_values[0])
+        i = np.clip(np.searchsorted(node_serials, serials, side='right') - 1, 0, len(node_serials) - 2)
+        lower_bound, upper_bound = node_values[i], node_values[i + 1]
+        lower_interval = year_fractions(self._day_counter, node_serials[i], serials)
+        interval = year_fractions(self._day_counter, node_serials[i], node_serials[i + 1])
+        return lower_bound + lower_interval * (upper_bound - lower_bound) / interval
+
+    def _check_range(self, min_date, max_date):
+        if max_date > self.max_date:
+            raise ValueError("The requested date ({0}) is after the curve's max date ({1})".format(max_date,
+                                                                                                   self.max_date))
+        if min_date.serialNumber() < self.node_serials[0]:
+            raise ValueError("The requested date ({0}) is before the curve's reference date ({1})".format(
+                min_date, self.reference_date))
 
     def spot_rate(self):
         """ Exchange rate at the reference date (spot rate).
@@ -0,0 +1,428 @@
+# Copyright (C) 2016-2018 Lanx Capital Investimentos LTDA.
+#
+# This file is part of Time Series Finance (tsfin).
+#
+# Time Series Finance (tsfin) is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or (at your option)
+# any later version.
+#
+# Time Series Finance (tsfin) is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Time Series Finance (tsfin). If not, see <https://www.gnu.org/licenses/>.
+"""
+CurveStore, a bounded store for the QuantLib curves of a curve time series, and FrozenCurveStore, a persistent store
+of the nodes of frozen curves.
+"""
+import os
+import atexit
+import shutil
+import weakref
+import hashlib
+from contextlib import contextmanager
+import numpy as np
+try:
+    import fcntl
+except ImportError:
+    # No file locking outside POSIX systems: the store is then only safe with a single writer.
+    fcntl = None
+from tsfin.base import LRUCache
+
+# Rough memory footprint of a QuantLib curve: a fixed part plus a part per node (date, time, rate and interpolation
+# coefficients). QuantLib does not report the memory it uses, so this is only an estimate used to bound the store.
+CURVE_BASE_BYTES = 1024
+CURVE_NODE_BYTES = 96
+
+LRU = 'lru'
+WINDOW = 'window'
+
+
+def estimate_curve_bytes(curve):
+    """
+    Parameters
+    ----------
+    curve: QuantLib.TermStructure
+        A curve.
+
+    Returns
+    -------
+    int
+        Estimated memory used by `curve`, in bytes.
+    """
+    try:
+        nodes = len(curve.dates())
+    except (AttributeError, RuntimeError):
+        # Curves without nodes, e.g. implied or spreaded curves.
+        nodes = 0
+    return CURVE_BASE_BYTES + nodes * CURVE_NODE_BYTES
+
+
+class CurveStore(LRUCache):
+    """ Store of curves by date, bounded in number of curves and/or bytes.
+
+    Used as the ``yield_curves`` attribute of the yield curve time series. The curves evicted from the store are
+    rebuilt by the curve time series when requested again.
+
+    Parameters
+    ----------
+    max_curves: int, optional
+        Maximum number of curves. Default: unbounded.
+    max_bytes: int, optional
+        Maximum estimated memory of the curves, in bytes. Default: unbounded.
+    eviction: str, optional
+        Which curves to evict when the store is full:
+        * 'lru': the least recently used curves.
+        * 'window': the curves whose dates are farthest from the date of the last curve requested or stored.
+        Default: 'lru'.
+    window: int, optional
+        Only for 'window' eviction. If given, curves more than `window` calendar days away from the date of the last
+        curve requested or stored are also evicted.
+    curve_bytes: function, optional
+        Function estimating the memory of a curve, in bytes. Default: :py:func:`estimate_curve_bytes`.
+
+    Note
+    ----
+    The most recently stored curve is never evicted, even if it alone exceeds `max_bytes`.
+    """
+    def __init__(self, max_curves=None, max_bytes=None, eviction=LRU, window=None, curve_bytes=None):
+        super().__init__(maxsize=max_curves)
+        eviction = str(eviction).lower()
+        if eviction not in (LRU, WINDOW):
+            raise ValueError("Unable to use the eviction policy {}".format(eviction))
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self.window = window
+        self.curve_bytes = curve_bytes if curve_bytes is not None else estimate_curve_bytes
+        self.nbytes = 0
+        self._bytes = dict()
+        self._last_date = None
+
+    def __getitem__(self, date):
+        value = super().__getitem__(date)
+        self._last_date = date
+        return value
+
+    def __setitem__(self, date, curve):
+        if date in self._data:
+            self._remove(date)
+        self._data[date] = curve
+        # Only estimated for a byte bound: the estimate reads the curve nodes, bootstrapping unfrozen curves.
+        self._bytes[date] = self.curve_bytes(curve) if self.max_bytes is not None else 0
+        self.nbytes += self._bytes[date]
+        self._last_date = date
+        self._evict(date)
+
+    def __delitem__(self, date):
+        self._remove(date)
+
+    def _remove(self, date):
+        del self._data[date]
+        self.nbytes -= self._bytes.pop(date)
+
+    def _is_full(self):
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            return True
+        return self.max_bytes is not None and self.nbytes > self.max_bytes
+
+    def _evict(self, kept_date):
+        if self.eviction == WINDOW:
+            if self.window is not None:
+                for date in [date for date in self._data if abs(date - kept_date) > self.window]:
+                    self._remove(date)
+                    self.evictions += 1
+            if self._is_full() and len(self._data) > 1:
+                # Farthest dates first.
+                by_distance = sorted((date for date in self._data if date != kept_date),
+                                     key=lambda date: abs(date - kept_date), reverse=True)
+                for date in by_distance:
+                    self._remove(date)
+                    self.evictions += 1
+                    if not self._is_full():
+                        break
+        else:
+            self._data.move_to_end(kept_date)
+            while self._is_full() and len(self._data) > 1:
+                date = next(iter(self._data))
+                self._remove(date)
+                self.evictions += 1
+
+    def peek(self, date, default=None):
+        """Get a curve without updating the usage order or the statistics.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the curve.
+        default: optional
+            Returned if there is no curve at `date`.
+
+        Returns
+        -------
+        QuantLib.TermStructure
+            The curve at `date`.
+        """
+        return self._data.get(date, default)
+
+    def clear(self):
+        """Remove all the curves, keeping the counters."""
+        super().clear()
+        self._bytes.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        """
+        Returns
+        -------
+        dict
+            The hits, misses, evictions, current number of curves and estimated bytes (only estimated if
+            `max_bytes` is given), and the bounds of the store.
+        """
+        stats = super().stats()
+        stats.update({'bytes': self.nbytes, 'max_bytes': self.max_bytes, 'eviction': self.eviction})
+        return stats
+
+
+def signature_key(signature):
+    """
+    Parameters
+    ----------
+    signature: object
+        Any object with a stable `repr`, e.g. a tuple of helper names and quotes.
+
+    Returns
+    -------
+    numpy.uint64
+        A 64-bit hash of `signature`, stable across processes (unlike the built-in hash).
+    """
+    digest = hashlib.blake2b(repr(signature).encode('utf-8'), digest_size=8).digest()
+    return np.frombuffer(digest, dtype='<u8')[0]
+
+
+def _flush_at_exit(store_reference):
+    store = store_reference()
+    if store is not None:
+        store.flush()
+
+
+class FrozenCurveStore:
+    """ Persistent store of the nodes of frozen curves, memory-mapped from disk.
+
+    The nodes of each curve date are stored with a key of the data used to build the curve (e.g. the helper quotes).
+    A stored curve is only returned if its key matches the current one, so that curves are rebuilt when their quotes
+    change. Curves with different identities (curve type, interpolation, instruments, etc.) are stored in different
+    subdirectories of `directory`.
+
+    Parameters
+    ----------
+    directory: str
+        The root directory of the store.
+    identity: object
+        Identity of the curve time series, with a stable `repr`.
+    flush_size: int, optional
+        Number of new curves above which :py:meth:`flush` writes them by default. Default: 256.
+
+    Note
+    ----
+    New nodes are kept in memory until :py:meth:`flush`. The remaining new nodes are written at interpreter exit.
+    Each flush writes a complete generation of the files to a new subdirectory and then atomically replaces the
+    pointer to the current generation, so readers always load the files of a single generation. Flushes hold an
+    exclusive file lock and merge the new nodes into the generation currently on disk, so several processes may
+    share the same directory.
+    """
+    files = ('dates', 'keys', 'offsets', 'node_serials', 'node_rates')
+    current_file = 'CURRENT'
+    lock_file = 'lock'
+
+    def __init__(self, directory, identity, flush_size=256):
+        self.path = os.path.join(directory, '{:016x}'.format(int(signature_key(identity))))
+        self.identity = repr(identity)
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.flush_size = flush_size
+        self._pending = dict()
+        self._load()
+        atexit.register(_flush_at_exit, weakref.ref(self))
+
+    @contextmanager
+    def _locked(self, exclusive):
+        """ Hold the file lock of the store, shared for reading or exclusive for writing."""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, self.lock_file), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _current_generation(self):
+        """
+        Returns
+        -------
+        int or None
+            The number of the current generation on disk, or None if nothing was written yet.
+        """
+        try:
+            with open(os.path.join(self.path, self.current_file)) as current_file:
+                return int(current_file.read())
+        except (IOError, ValueError):
+            return None
+
+    def _generation_path(self, generation):
+        return os.path.join(self.path, 'generation-{:d}'.format(generation))
+
+    def _load(self):
+        if not os.path.isdir(self.path):
+            self._load_generation(None)
+            return
+        with self._locked(exclusive=False):
+            self._load_generation(self._current_generation())
+
+    def _load_generation(self, generation):
+        self._generation = generation
+        self._dates = np.empty(0, dtype=np.int64)
+        self._keys = np.empty(0, dtype=np.uint64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._node_serials = np.empty(0, dtype=np.int64)
+        self._node_rates = np.empty(0, dtype=np.float64)
+        if generation is None:
+            return
+        path = self._generation_path(generation)
+        try:
+            with open(os.path.join(path, 'identity.txt')) as identity_file:
+                if identity_file.read() != self.identity:
+                    return
+            arrays = [np.load(os.path.join(path, name + '.npy'), mmap_mode='r') for name in self.files]
+        except (IOError, ValueError):
+            return
+        self._dates, self._keys, self._offsets, self._node_serials, self._node_rates = arrays
+
+    def __len__(self):
+        return len(self._dates) + sum(1 for serial in self._pending if not self._stored(serial))
+
+    def _stored(self, serial):
+        i = np.searchsorted(self._dates, serial)
+        return i < len(self._dates) and self._dates[i] == serial
+
+    def get(self, date, key):
+        """
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The curve date.
+        key: numpy.uint64
+            The key of the data used to build the curve, see :py:func:`signature_key`.
+
+        Returns
+        -------
+        tuple (numpy.ndarray of int64, numpy.ndarray of float64) or None
+            The node date serials and node rates of the curve at `date`, or None if there is no curve stored with
+            `key` at `date`.
+        """
+        serial = date.serialNumber()
+        pending = self._pending.get(serial)
+        if pending is not None and pending[0] == key:
+            self.hits += 1
+            return pending[1], pending[2]
+        i = np.searchsorted(self._dates, serial)
+        if i < len(self._dates) and self._dates[i] == serial:
+            if self._keys[i] == key:
+                self.hits += 1
+                start, end = self._offsets[i], self._offsets[i + 1]
+                return np.array(self._node_serials[start:end]), np.array(self._node_rates[start:end])
+            self.invalidated += 1
+        self.misses += 1
+        return None
+
+    def put(self, date, key, node_serials, node_rates):
+        """ Store the nodes of the curve at a date, replacing any curve stored at that date.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The curve date.
+        key: numpy.uint64
+            The key of the data used to build the curve, see :py:func:`signature_key`.
+        node_serials: array-like of int
+            Serial numbers of the node dates.
+        node_rates: array-like of float
+            Rates at the nodes.
+        """
+        self._pending[date.serialNumber()] = (key, np.asarray(node_serials, dtype=np.int64),
+                                              np.asarray(node_rates, dtype=np.float64))
+
+    def flush(self, min_pending=1):
+        """ Write the new nodes to disk.
+
+        Parameters
+        ----------
+        min_pending: int, optional
+            Only write if there are at least this number of new curves. Default: 1.
+        """
+        if not self._pending or len(self._pending) < min_pending:
+            return
+        with self._locked(exclusive=True):
+            # Merge into the generation on disk, which may have been written by another process since the last load.
+            self._load_generation(self._current_generation())
+            generation = 0 if self._generation is None else self._generation + 1
+            self._write_generation(generation, self._merged_arrays())
+            temporary = os.path.join(self.path, self.current_file + '.tmp')
+            with open(temporary, 'w') as current_file:
+                current_file.write(str(generation))
+            os.replace(temporary, os.path.join(self.path, self.current_file))
+            if self._generation is not None:
+                # Readers keep access to the memory-mapped files of the removed generation.
+                shutil.rmtree(self._generation_path(self._generation), ignore_errors=True)
+            self._pending.clear()
+            self._load_generation(generation)
+
+    def _merged_arrays(self):
+        """
+        Returns
+        -------
+        dict
+            The stored arrays, with the new nodes replacing the stored ones at the same dates.
+        """
+        kept = np.flatnonzero(~np.isin(self._dates, list(self._pending.keys())))
+        pending_serials = sorted(self._pending.keys())
+        dates = np.concatenate((self._dates[kept], pending_serials)).astype(np.int64)
+        keys = np.concatenate((self._keys[kept], [self._pending[s][0] for s in pending_serials])).astype(np.uint64)
+        sizes = np.concatenate((np.diff(self._offsets)[kept],
+                                [len(self._pending[s][1]) for s in pending_serials])).astype(np.int64)
+        node_serials = [self._node_serials[self._offsets[i]:self._offsets[i + 1]] for i in kept] + \
+            [self._pending[s][1] for s in pending_serials]
+        node_rates = [self._node_rates[self._offsets[i]:self._offsets[i + 1]] for i in kept] + \
+            [self._pending[s][2] for s in pending_serials]
+        order = np.argsort(dates, kind='stable')
+        return {'dates': dates[order],
+                'keys': keys[order],
+                'offsets': np.concatenate(([0], np.cumsum(sizes[order]))).astype(np.int64),
+                'node_serials': np.concatenate([node_serials[i] for i in order] or [np.empty(0)]).astype(np.int64),
+                'node_rates': np.concatenate([node_rates[i] for i in order] or [np.empty(0)]).astype(np.float64)}
+
+    def _write_generation(self, generation, arrays):
+        """ Write a complete generation of the files, to be made current afterwards."""
+        path = self._generation_path(generation)
+        # Leftover of an interrupted flush.
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        for name in self.files:
+            np.save(os.path.join(path, name + '.npy'), arrays[name])
+        with open(os.path.join(path, 'identity.txt'), 'w') as identity_file:
+            identity_file.write(self.identity)
+
+    def stats(self):
+        """
+        Returns
+        -------
+        dict
+            The hits, misses, invalidated entries (stored with another key) and number of stored curves.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'invalidated': self.invalidated, 'size': len(self)}
@@ -0,0 +1,158 @@
+# Copyright (C) 2016-2018 Lanx Capital Investimentos LTDA.
+#
+# This file is part of Time Series Finance (tsfin).
+#
+# Time Series Finance (tsfin) is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or (at your option)
+# any later version.
+#
+# Time Series Finance (tsfin) is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Time Series Finance (tsfin). If not, see <https://www.gnu.org/licenses/>.
+"""
+CurveSurface, a date x tenor matrix of values of a yield curve time series.
+"""
+import numpy as np
+import pandas as pd
+import QuantLib as ql
+from tsfin.base import to_list, to_ql_date, QL_SERIAL_EPOCH
+
+ZERO_RATE = 'zero_rate'
+DISCOUNT = 'discount'
+FORWARD = 'forward'
+
+
+class CurveSurface:
+    """ Date x tenor matrix of zero rates, discount factors or forward rates of a yield curve time series.
+
+    The values are stored in one contiguous float64 block, sorted by date, with room to grow: dates appended after the
+    last one are written in place, so the surface can be extended as new dates arrive without being rebuilt.
+
+    Parameters
+    ----------
+    curve_timeseries: :py:class:`YieldCurveTimeSeries`
+        The yield curves.
+    tenors: list of str
+        Strings representing QuantLib tenors, advanced from each date with the calendar of the curves.
+    measure: str, optional
+        * 'zero_rate': zero rates to each tenor.
+        * 'discount': discount factors to each tenor.
+        * 'forward': forward rates between each tenor and the previous one (the curve date for the first tenor).
+        Default: 'zero_rate'.
+    compounding: QuantLib.Compounding, optional
+        Compounding convention of the rates. Default: QuantLib.Continuous.
+    frequency: QuantLib.Frequency, optional
+        Frequency convention of the rates. Default: QuantLib.Annual.
+    day_counter: QuantLib.DayCounter, optional
+        Day counter of the rates. Default: the day counter of the curves.
+    processes: int, optional
+        Number of worker processes to bootstrap the missing curves, see
+        :py:meth:`YieldCurveTimeSeries.update_curves`. Default: bootstrap in this process.
+    """
+    def __init__(self, curve_timeseries, tenors, measure=ZERO_RATE, compounding=ql.Continuous, frequency=ql.Annual,
+                 day_counter=None, processes=None):
+        measure = str(measure).lower()
+        if measure not in (ZERO_RATE, DISCOUNT, FORWARD):
+            raise ValueError("Unable to build a curve surface of {}".format(measure))
+        self.curve_timeseries = curve_timeseries
+        self.tenors = [str(tenor).upper() for tenor in to_list(tenors)]
+        self.measure = measure
+        self.compounding = compounding
+        self.frequency = frequency
+        self.day_counter = day_counter
+        self.processes = processes
+        self._periods = [ql.PeriodParser.parse(tenor) for tenor in self.tenors]
+        self._serials = np.empty(0, dtype=np.int64)
+        self._values = np.empty((0, len(self.tenors)), dtype=np.float64)
+
+    def __len__(self):
+        return len(self._serials)
+
+    def _rows(self, dates):
+        values = np.empty((len(dates), len(self._periods)), dtype=np.float64)
+        curves = self.curve_timeseries
+        for i, date in enumerate(dates):
+            to_dates = [curves.calendar.advance(date, period) for period in self._periods]
+            if self.measure == ZERO_RATE:
+                values[i] = curves.zero_rates(date, self.compounding, self.frequency, to_date=to_dates,
+                                              day_counter=self.day_counter)
+            elif self.measure == DISCOUNT:
+                values[i] = curves.discount_factors(date, to_date=to_dates)
+            else:
+                values[i] = curves.forward_rates(date, [date] + to_dates[:-1], to_dates, self.compounding,
+                                                 self.frequency, day_counter=self.day_counter)
+        return values
+
+    def append(self, dates):
+        """ Add the values at new dates, bootstrapping the missing curves in bulk.
+
+        Dates already in the surface are skipped.
+
+        Parameters
+        ----------
+        dates: date-like or list of date-like
+            The dates to add.
+        """
+        dates = sorted(set(to_ql_date(date) for date in to_list(dates)))
+        serials = np.array([date.serialNumber() for date in dates], dtype=np.int64)
+        new = ~np.isin(serials, self._serials)
+        dates = [date for date, is_new in zip(dates, new) if is_new]
+        serials = serials[new]
+        if len(dates) == 0:
+            return
+        missing = [date for date in dates if self.curve_timeseries.yield_curves.peek(date) is None]
+        if len(missing) > 0:
+            if self.processes is not None:
+                self.curve_timeseries.update_curves(missing, processes=self.processes)
+            else:
+                self.curve_timeseries.update_curves(missing)
+        rows = self._rows(dates)
+        size = len(self._serials)
+        if size == 0 or serials[0] > self._serials[-1]:
+            # New dates after the last one: write them in place, growing the block geometrically if needed.
+            if size + len(serials) > len(self._values):
+                capacity = max(size + len(serials), 2 * len(self._values))
+                values = np.empty((capacity, len(self.tenors)), dtype=np.float64)
+                values[:size] = self._values[:size]
+                self._values = values
+            self._values[size:size + len(serials)] = rows
+            self._serials = np.concatenate((self._serials, serials))
+        else:
+            # Dates before the last one: rebuild the block, so that frames already returned are left untouched.
+            all_serials = np.concatenate((self._serials, serials))
+            order = np.argsort(all_serials, kind='stable')
+            self._values = np.concatenate((self._values[:size], rows))[order]
+            self._serials = all_serials[order]
+
+    def values(self):
+        """
+        Returns
+        -------
+        numpy.ndarray of float64, shape (dates, tenors)
+            The values of the surface, a view of its block.
+        """
+        return self._values[:len(self._serials)]
+
+    def dates(self):
+        """
+        Returns
+        -------
+        pandas.DatetimeIndex
+            The dates of the surface.
+        """
+        return pd.DatetimeIndex(QL_SERIAL_EPOCH + pd.to_timedelta(self._serials, unit='D'))
+
+    def to_frame(self):
+        """
+        Returns
+        -------
+        pandas.DataFrame
+            The values of the surface indexed by date, with a column per tenor. The frame is backed by the block of the
+            surface, without copying it.
+        """
+        return pd.DataFrame(self.values(), index=self.dates(), columns=self.tenors, copy=False)
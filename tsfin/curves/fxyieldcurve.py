@@ -28,36 +28,48 @@ from tsfin.curves.yieldcurve import YieldCurveTimeSeries, ExtRateHelper
 
 
 class FxYieldCurveTimeSeries(YieldCurveTimeSeries):
+    # The spot rates stored by _get_helpers are needed by implied_fx_rate_to_date.
+    _parallel_bootstrap = False
 
     def __init__(self, base_yield_curve, ts_collection=None, calendar=None, day_counter=None,
                  keep_only_on_the_run_month=False, ignore_errors=False, curve_type='linear_zero', freeze_curves=True,
                  enable_extrapolation=True, frozen_curve_interpolation_type='monotonic_cubic_zero',
-                 constraint_at_zero=True, **other_rate_helper_args):
+                 constraint_at_zero=True, curve_store=None, incremental=False, node_cache_dir=None,
+                 **other_rate_helper_args):
         super().__init__(ts_collection=ts_collection, calendar=calendar, day_counter=day_counter,
                          keep_only_on_the_run_month=keep_only_on_the_run_month, ignore_errors=ignore_errors,
                          curve_type=curve_type, freeze_curves=freeze_curves, enable_extrapolation=enable_extrapolation,
                          frozen_curve_interpolation_type=frozen_curve_interpolation_type,
-                         constraint_at_zero=constraint_at_zero, **other_rate_helper_args)
+                         constraint_at_zero=constraint_at_zero, curve_store=curve_store,
+                         incremental=incremental, node_cache_dir=node_cache_dir, **other_rate_helper_args)
         self.base_yield_curve = base_yield_curve
         self.currencies = TimeSeriesCollection()
         self.fx_spot_price = dict()
+        # Shared by the helpers of all the instruments, which are built once and updated in place as the date moves.
+        self.fx_spot_quote = ql.SimpleQuote(1)
+        self.fx_spot_handle = ql.RelinkableQuoteHandle(self.fx_spot_quote)
+        self.base_curve_handle = ql.RelinkableYieldTermStructureHandle()
+
+    def _link_instrument(self, ts):
+        if ts.term_structure is not self.base_curve_handle or ts.currency_spot_handle is not self.fx_spot_handle:
+            ts.term_structure = self.base_curve_handle
+            ts.currency_spot_handle = self.fx_spot_handle
+            self.currencies.add(ts.currency_ts)
 
     def _get_helpers(self, date):
 
         helpers = dict()
         self.fx_spot_price[date] = None
-        base_yield_curve = self.base_yield_curve.yield_curve(date=date)
+        self.base_curve_handle.linkTo(self.base_yield_curve.yield_curve(date=date))
         for ts in self.ts_collection:
+            self._link_instrument(ts)
             ts_name = ts.ts_name
             issue_date = ts.issue_date
             helper = ts.rate_helper(date=date, **self.other_rate_helper_args)
-            self.currencies.add(ts.currency_ts)
             if self.fx_spot_price[date] is None:
                 fx_rate = ts.currency_spot_rate.value()
                 self.fx_spot_price[date] = ql.SimpleQuote(fx_rate)
-
-            ts.currency_spot_handle.linkTo(self.fx_spot_price[date])
-            ts.term_structure.linkTo(base_yield_curve)
+                self.fx_spot_quote.setValue(fx_rate)
 
             if helper is not None:
                 maturity_date = helper.maturityDate()
@@ -21,13 +21,74 @@ yield curve.
 TODO: Implement an equivalent of this class in QuantLib and use it directly inside the YieldCurveTimeSeries class.
 """
 
+import numpy as np
 import QuantLib as ql
-from tsfin.base import to_ql_date, conditional_vectorize
+from tsfin.base import to_ql_date, to_ql_date_serial, isvectorizable, LRUCache, compound_factor, implied_rate, \
+    year_fractions
+
+
+class HybridNodeCurve:
+    """ NumPy mirror of a weighted sum of frozen yield curves at a date.
+
+    Parameters
+    ----------
+    reference_date: QuantLib.Date
+        The date of the curves.
+    node_curves: list of :py:class:`NodeCurve`
+        The mirrors of the curves being summed.
+    day_counters: list of QuantLib.DayCounter
+        The day counters of the zero rates of each curve.
+    weights: list of scalars
+        The weights of each curve.
+    """
+    def __init__(self, reference_date, node_curves, day_counters, weights):
+        self.reference_date = reference_date
+        self.node_curves = tuple(node_curves)
+        self.day_counters = tuple(day_counters)
+        self.weights = tuple(weights)
+
+    def zero_rate(self, serials, compounding, frequency):
+        """
+        Parameters
+        ----------
+        serials: array-like of int
+            Date serial numbers of the maturities.
+        compounding: QuantLib.Compounding
+            Compounding convention of the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention of the rates.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Weighted sum of the zero rates of the curves to the dates.
+        """
+        return sum(weight * node_curve.zero_rate(serials, day_counter, compounding, frequency)
+                   for weight, node_curve, day_counter in zip(self.weights, self.node_curves, self.day_counters))
+
+    def zero_rate_times(self, time, compounding, frequency):
+        """
+        Parameters
+        ----------
+        time: array-like of float
+            Times from the reference date.
+        compounding: QuantLib.Compounding
+            Compounding convention of the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention of the rates.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Weighted sum of the zero rates of the curves to the times.
+        """
+        return sum(weight * node_curve.zero_rate_times(time, compounding, frequency)
+                   for weight, node_curve in zip(self.weights, self.node_curves))
 
 
 class HybridYieldCurveTimeSeries:
 
-    def __init__(self, yield_curves, weights=None):
+    def __init__(self, yield_curves, weights=None, cache_size=256):
         """A class to handle sums of multiple yield curves. Has the same methods of the YieldCurveTimeSeries class.
 
         Parameters
@@ -36,6 +97,8 @@ class HybridYieldCurveTimeSeries:
             The curves to be summed.
         weights: list of scalars, optional
             The weights of each yield curve in `yield_curves`.
+        cache_size: int, optional
+            Number of dates whose :py:meth:`hybrid_curve` is kept. Zero disables the cache. Default: 256.
 
         Note
         ----
@@ -47,8 +110,13 @@ class HybridYieldCurveTimeSeries:
         else:
             self.weights = weights
         self.day_counter = self.yield_curves[0].day_counter
+        self.hybrid_curves = LRUCache(maxsize=cache_size) if cache_size else None
+
+    @staticmethod
+    def _output(values):
+        # Scalar for scalar inputs, as the c-vectorized methods.
+        return float(values) if np.ndim(values) == 0 else values
 
-    @conditional_vectorize('date', 'to_date', 'zero_rate')
     def _discount_factor_to_date(self, date, to_date, zero_rate, compounding, frequency):
         """ Calculate discount factor to a given date, at a given date, given an interest rate.
 
@@ -70,12 +138,10 @@ class HybridYieldCurveTimeSeries:
         scalar
             The discount rate to `to_date`, equivalent to the given interest rate.
         """
-        date = to_ql_date(date)
-        to_date = to_ql_date(to_date)
-        return ql.InterestRate(zero_rate, self.day_counter, compounding, frequency).discountFactor(date, to_date,
-                                                                                                   date, to_date)
+        time = year_fractions(self.day_counter, np.asarray(to_ql_date_serial(date)),
+                              np.asarray(to_ql_date_serial(to_date)))
+        return self._output(1.0 / compound_factor(zero_rate, time, compounding, frequency))
 
-    @conditional_vectorize('time', 'zero_rate')
     def _discount_factor_to_time(self, time, zero_rate, compounding, frequency):
         """ Calculate discount factor to a given time, at a given date, given an interest rate.
 
@@ -95,9 +161,9 @@ class HybridYieldCurveTimeSeries:
         scalar
             The discount rate to `time`, equivalent to the given interest rate.
         """
-        return ql.InterestRate(zero_rate, self.day_counter, compounding, frequency).discountFactor(time)
+        return self._output(1.0 / compound_factor(zero_rate, np.asarray(time, dtype=np.float64), compounding,
+                                                  frequency))
 
-    @conditional_vectorize('date1', 'date2', 'discount1', 'discount2')
     def _forward_rate_from_discounts_to_date(self, date1, date2, discount1, discount2, compounding, frequency):
         """ Calculate forward rate given two discount rates at two dates.
 
@@ -119,12 +185,13 @@ class HybridYieldCurveTimeSeries:
         Returns
         -------
         scalar
-            The forward rate to between `date1` and `date2`.
+            The forward rate to between `date1` and `date2`. NaN where `date1` equals `date2`.
         """
-        return ql.InterestRate.impliedRate(discount1/discount2, self.day_counter, compounding, frequency, date1, date2,
-                                           date1, date2).rate()
+        time = year_fractions(self.day_counter, np.asarray(to_ql_date_serial(date1)),
+                              np.asarray(to_ql_date_serial(date2)))
+        return self._output(implied_rate(np.asarray(discount1) / np.asarray(discount2), time, compounding,
+                                         frequency))
 
-    @conditional_vectorize('time1', 'time2', 'discount1', 'discount2')
     def _forward_rate_from_discounts_to_time(self, time1, time2, discount1, discount2, compounding, frequency):
         """ Calculate forward rate given two discount rates to two times.
 
@@ -146,10 +213,165 @@ class HybridYieldCurveTimeSeries:
         Returns
         -------
         scalar
-            The forward rate between `time1` and `time2`.
+            The forward rate between `time1` and `time2`. NaN where `time1` equals `time2`.
+        """
+        time = np.asarray(time2, dtype=np.float64) - np.asarray(time1, dtype=np.float64)
+        return self._output(implied_rate(np.asarray(discount1) / np.asarray(discount2), time, compounding,
+                                         frequency))
+
+    def hybrid_curve(self, date):
+        """ NumPy mirror of the sum of the yield curves at a date.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curves.
+
+        Returns
+        -------
+        :py:class:`HybridNodeCurve` or None
+            The mirror of the weighted sum of the curves at `date`, or None if any of the curves has no
+            :py:meth:`YieldCurveTimeSeries.node_curve` at `date`.
+        """
+        date = to_ql_date(date)
+        node_curves = list()
+        for curve in self.yield_curves:
+            node_curve = curve.node_curve(date) if hasattr(curve, 'node_curve') else None
+            if node_curve is None:
+                return None
+            node_curves.append(node_curve)
+        if self.hybrid_curves is not None:
+            cached = self.hybrid_curves.get(date)
+            # The component curves may have been rebuilt since the hybrid curve was cached.
+            if cached is not None and all(a is b for a, b in zip(cached.node_curves, node_curves)):
+                return cached
+        hybrid_curve = HybridNodeCurve(date, node_curves, [curve.day_counter for curve in self.yield_curves],
+                                       self.weights)
+        if self.hybrid_curves is not None:
+            self.hybrid_curves[date] = hybrid_curve
+        return hybrid_curve
+
+    def zero_rates(self, date, compounding, frequency, to_date=None, to_time=None):
+        """ Zero rates of the sum of the yield curves at a date, for many dates or times at once.
+
+        Evaluated in NumPy by :py:meth:`hybrid_curve` if all the curves are frozen, by each curve otherwise.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curves.
+        compounding: QuantLib.Compounding
+            Compounding convention for the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention for the rates.
+        to_date: array-like of date-like, optional
+            Maturities of the rates.
+        to_time: array-like of float, optional
+            Times in years of the rates, used when `to_date` is not given.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The zero rates, with the shape of `to_date` or `to_time`.
+        """
+        date = to_ql_date(date)
+        hybrid_curve = self.hybrid_curve(date)
+        if to_date is not None:
+            if hybrid_curve is not None:
+                return hybrid_curve.zero_rate(np.asarray(to_ql_date_serial(to_date), dtype=np.int64), compounding,
+                                              frequency)
+            return np.asarray(sum(weight * np.asarray(curve.zero_rate_to_date(date=date, to_date=to_date,
+                                                                              compounding=compounding,
+                                                                              frequency=frequency), dtype=np.float64)
+                                  for weight, curve in zip(self.weights, self.yield_curves)))
+        to_time = np.asarray(to_time, dtype=np.float64)
+        if hybrid_curve is not None:
+            return hybrid_curve.zero_rate_times(to_time, compounding, frequency)
+        return np.asarray(sum(weight * np.asarray(curve.zero_rate_to_time(date=date, to_time=to_time,
+                                                                          compounding=compounding,
+                                                                          frequency=frequency), dtype=np.float64)
+                              for weight, curve in zip(self.weights, self.yield_curves)))
+
+    def discount_factors(self, date, to_date=None, to_time=None):
+        """ Discount factors of the sum of the yield curves at a date, for many dates or times at once.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curves.
+        to_date: array-like of date-like, optional
+            Maturities of the discount factors.
+        to_time: array-like of float, optional
+            Times in years of the discount factors, used when `to_date` is not given.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The discount factors, with the shape of `to_date` or `to_time`, as in :py:meth:`discount_to_date`.
+        """
+        date = to_ql_date(date)
+        zero_rate = self.zero_rates(date, ql.Compounded, ql.Continuous, to_date=to_date, to_time=to_time)
+        if to_date is not None:
+            time = year_fractions(self.day_counter, date, np.asarray(to_ql_date_serial(to_date), dtype=np.int64))
+        else:
+            time = np.asarray(to_time, dtype=np.float64)
+        return 1.0 / compound_factor(zero_rate, time, ql.Compounded, ql.Continuous)
+
+    def forward_rates(self, date, to_date1, to_date2, compounding, frequency):
+        """ Forward rates of the sum of the yield curves at a date, for many periods at once.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curves.
+        to_date1: array-like of date-like
+            Start dates of the periods.
+        to_date2: array-like of date-like
+            End dates of the periods, broadcast with `to_date1`.
+        compounding: QuantLib.Compounding
+            Compounding convention for the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention for the rates.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The forward rates between `to_date1` and `to_date2`, as in :py:meth:`forward_rate_date_to_date`. NaN for
+            empty periods.
+        """
+        serials1, serials2 = np.broadcast_arrays(np.asarray(to_ql_date_serial(to_date1), dtype=np.int64),
+                                                 np.asarray(to_ql_date_serial(to_date2), dtype=np.int64))
+        serials = np.concatenate((serials1.ravel(), serials2.ravel()))
+        discounts = self.discount_factors(date, to_date=[ql.Date(int(serial)) for serial in serials])
+        compound = (discounts[:serials1.size] / discounts[serials1.size:]).reshape(serials1.shape)
+        return implied_rate(compound, year_fractions(self.day_counter, serials1, serials2), compounding, frequency)
+
+    def forward_rates_times(self, date, to_time1, to_time2, compounding, frequency):
+        """ Forward rates of the sum of the yield curves at a date, for many periods in years at once.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curves.
+        to_time1: array-like of float
+            Start times of the periods.
+        to_time2: array-like of float
+            End times of the periods, broadcast with `to_time1`.
+        compounding: QuantLib.Compounding
+            Compounding convention for the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention for the rates.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The forward rates between `to_time1` and `to_time2`, as in :py:meth:`forward_rate_time_to_time`. NaN for
+            empty periods.
         """
-        return ql.InterestRate.impliedRate(discount1/discount2, self.day_counter, compounding, frequency,
-                                           time2-time1).rate()
+        time1, time2 = np.broadcast_arrays(np.asarray(to_time1, dtype=np.float64),
+                                           np.asarray(to_time2, dtype=np.float64))
+        compound = self.discount_factors(date, to_time=time1) / self.discount_factors(date, to_time=time2)
+        return implied_rate(compound, time2 - time1, compounding, frequency)
 
     def zero_rate_to_date(self, date, to_date, compounding, frequency, extrapolate=True):
         """
@@ -171,6 +393,8 @@ class HybridYieldCurveTimeSeries:
         scalar
             Zero rate for `to_date`, implied by the yield curve at `date`.
         """
+        if extrapolate and not isvectorizable(date):
+            return self._output(self.zero_rates(date, compounding, frequency, to_date=to_date))
         return sum(weight * curve.zero_rate_to_date(date=date, to_date=to_date, compounding=compounding,
                                                     frequency=frequency, extrapolate=extrapolate)
                    for weight, curve in zip(self.weights, self.yield_curves))
@@ -195,6 +419,8 @@ class HybridYieldCurveTimeSeries:
         scalar
             Zero rate for `to_time`, implied by the yield curve at `date`.
         """
+        if extrapolate and not isvectorizable(date):
+            return self._output(self.zero_rates(date, compounding, frequency, to_time=to_time))
         return sum(weight * curve.zero_rate_to_time(date=date, to_time=to_time, compounding=compounding,
                                                     frequency=frequency, extrapolate=extrapolate)
                    for weight, curve in zip(self.weights, self.yield_curves))
@@ -46,6 +46,9 @@ class ImpliedYieldCurveTimeSeries:
         """
 
         date = to_ql_date(date)
+        if hasattr(self.yield_curve_time_series, 'implied_term_structure'):
+            # Cached by the base time series, by (base date, date).
+            return self.yield_curve_time_series.implied_term_structure(self.base_date, date)
         return ql.ImpliedTermStructure(self.yield_curve_time_series.yield_curve_handle(self.base_date), date)
 
     def yield_curve_handle(self, date):
@@ -121,3 +124,57 @@ class ImpliedYieldCurveTimeSeries:
         day_counter = day_counter if day_counter is not None else self.day_counter
         return self.yield_curve(date).forwardRate(to_date1, to_date2, day_counter, compounding, frequency,
                                                   extrapolate).rate()
+
+    def discount_factors(self, date, to_date=None, to_time=None):
+        """ Discount factors of the implied yield curves at many dates, for many dates or times at once.
+
+        Computed as ratios of discount factors of the base yield curve, see
+        :py:meth:`YieldCurveTimeSeries.implied_discount_factors`.
+
+        Parameters
+        ----------
+        date: date-like or array-like of date-like
+            The dates of the implied yield curves.
+        to_date: array-like of date-like, optional
+            Maturities of the discount factors, broadcast with `date`.
+        to_time: array-like of float, optional
+            Times in years from `date` of the discount factors, used when `to_date` is not given.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The discount factors.
+        """
+        return self.yield_curve_time_series.implied_discount_factors(self.base_date, date, to_date=to_date,
+                                                                     to_time=to_time)
+
+    def zero_rates(self, date, compounding, frequency, to_date=None, to_time=None, day_counter=None):
+        """ Zero rates of the implied yield curves at many dates, for many dates or times at once.
+
+        Computed as ratios of discount factors of the base yield curve, see
+        :py:meth:`YieldCurveTimeSeries.implied_zero_rates`.
+
+        Parameters
+        ----------
+        date: date-like or array-like of date-like
+            The dates of the implied yield curves.
+        compounding: QuantLib.Compounding
+            Compounding convention for the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention for the rates.
+        to_date: array-like of date-like, optional
+            Maturities of the rates, broadcast with `date`.
+        to_time: array-like of float, optional
+            Times in years from `date` of the rates, used when `to_date` is not given.
+        day_counter: QuantLib.DayCounter, optional
+            The day counter of the rates with `to_date`. Default: the day counter of the curves.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The zero rates.
+        """
+        day_counter = day_counter if day_counter is not None else self.day_counter
+        return self.yield_curve_time_series.implied_zero_rates(self.base_date, date, compounding, frequency,
+                                                               to_date=to_date, to_time=to_time,
+                                                               day_counter=day_counter)
@@ -0,0 +1,363 @@
+# Copyright (C) 2016-2018 Lanx Capital Investimentos LTDA.
+#
+# This file is part of Time Series Finance (tsfin).
+#
+# Time Series Finance (tsfin) is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or (at your option)
+# any later version.
+#
+# Time Series Finance (tsfin) is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Time Series Finance (tsfin). If not, see <https://www.gnu.org/licenses/>.
+"""
+NodeCurve, a NumPy evaluation of the frozen zero curves built by :py:func:`tsfin.base.to_ql_interpolated_curve`.
+"""
+import numpy as np
+from tsfin.base import year_fractions, implied_rate
+
+# Time step used by QuantLib for rates at the reference date and for forward rates over an empty period.
+QL_TIME_STEP = 0.0001
+
+LINEAR = 'linear'
+LOG_LINEAR = 'log_linear'
+KRUGER = 'kruger'
+SPLINE = 'spline'
+MONOTONIC_SPLINE = 'monotonic_spline'
+
+# Interpolation of the zero rates of each frozen curve interpolation type. 'log_cubic_zero' is missing on purpose: it
+# is evaluated by QuantLib.
+INTERPOLATIONS = {'cubic_zero': KRUGER,
+                  'log_linear_zero': LOG_LINEAR,
+                  'spline_cubic_zero': SPLINE,
+                  'monotonic_cubic_zero': MONOTONIC_SPLINE,
+                  'linear_zero': LINEAR}
+
+
+def interpolation_method(interpolation_type):
+    """
+    Parameters
+    ----------
+    interpolation_type: str
+        A frozen curve interpolation type, as in :py:func:`tsfin.base.to_ql_interpolated_curve`.
+
+    Returns
+    -------
+    str or None
+        The :py:class:`NodeCurve` method mirroring `interpolation_type`, or None if it is not supported.
+    """
+    interpolation_type = str(interpolation_type).lower()
+    if interpolation_type == 'log_cubic_zero':
+        return None
+    # Unknown types are linear zero curves, as in to_ql_interpolated_curve.
+    return INTERPOLATIONS.get(interpolation_type, LINEAR)
+
+
+def _spline_slopes(dx, slopes):
+    # Natural cubic spline: continuous second derivative, zero at both ends.
+    n = len(dx) + 1
+    matrix = np.zeros((n, n), dtype=np.float64)
+    rhs = np.empty(n, dtype=np.float64)
+    matrix[0, 0], matrix[0, 1] = 2.0, 1.0
+    rhs[0] = 3.0 * slopes[0]
+    matrix[n - 1, n - 2], matrix[n - 1, n - 1] = 1.0, 2.0
+    rhs[n - 1] = 3.0 * slopes[n - 2]
+    for i in range(1, n - 1):
+        matrix[i, i - 1] = dx[i]
+        matrix[i, i] = 2.0 * (dx[i] + dx[i - 1])
+        matrix[i, i + 1] = dx[i - 1]
+        rhs[i] = 3.0 * (dx[i] * slopes[i - 1] + dx[i - 1] * slopes[i])
+    return np.linalg.solve(matrix, rhs)
+
+
+def _kruger_slopes(slopes):
+    n = len(slopes) + 1
+    derivatives = np.empty(n, dtype=np.float64)
+    left, right = slopes[:-1], slopes[1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        derivatives[1:-1] = np.where(left * right <= 0.0, 0.0, 2.0 / (1.0 / left + 1.0 / right))
+    derivatives[0] = (3.0 * slopes[0] - derivatives[1]) / 2.0
+    derivatives[-1] = (3.0 * slopes[-1] - derivatives[-2]) / 2.0
+    return derivatives
+
+
+def _hyman_filter(dx, slopes, derivatives):
+    # Hyman's monotonicity filter, as applied by QuantLib's CubicInterpolation.
+    n = len(derivatives)
+    filtered = derivatives.copy()
+    for i in range(n):
+        d = filtered[i]
+        if i == 0 or i == n - 1:
+            s = slopes[0] if i == 0 else slopes[n - 2]
+            bound = abs(3.0 * s)
+            filtered[i] = np.sign(d) * min(abs(d), bound) if d * s > 0.0 else 0.0
+            continue
+        pm = (slopes[i - 1] * dx[i] + slopes[i] * dx[i - 1]) / (dx[i - 1] + dx[i])
+        bound = 3.0 * min(abs(slopes[i - 1]), abs(slopes[i]), abs(pm))
+        if i > 1 and (slopes[i - 1] - slopes[i - 2]) * (slopes[i] - slopes[i - 1]) > 0.0:
+            pd = (slopes[i - 1] * (2.0 * dx[i - 1] + dx[i - 2]) - slopes[i - 2] * dx[i - 1]) / (dx[i - 2] + dx[i - 1])
+            if pm * pd > 0.0 and pm * (slopes[i - 1] - slopes[i - 2]) > 0.0:
+                bound = max(bound, 1.5 * min(abs(pm), abs(pd)))
+        if i < n - 2 and (slopes[i] - slopes[i - 1]) * (slopes[i + 1] - slopes[i]) > 0.0:
+            pu = (slopes[i] * (2.0 * dx[i] + dx[i + 1]) - slopes[i + 1] * dx[i]) / (dx[i] + dx[i + 1])
+            if pm * pu > 0.0 and -pm * (slopes[i] - slopes[i - 1]) > 0.0:
+                bound = max(bound, 1.5 * min(abs(pm), abs(pu)))
+        filtered[i] = np.sign(d) * min(abs(d), bound) if d * pm > 0.0 else 0.0
+    return filtered
+
+
+class NodeCurve:
+    """ NumPy mirror of a frozen QuantLib zero curve, for evaluating many dates or times at once.
+
+    Reproduces QuantLib's interpolation of the continuously compounded zero rates at the nodes, and its flat forward
+    extrapolation after the last node, so that the results match those of the QuantLib curve up to rounding.
+
+    Parameters
+    ----------
+    reference_date: QuantLib.Date
+        The reference date of the curve, i.e. its first node.
+    node_times: array-like of float
+        Times of the nodes, from `reference_date` with `day_counter`.
+    node_rates: array-like of float
+        Continuously compounded zero rates at the nodes.
+    day_counter: QuantLib.DayCounter
+        The day counter of the curve.
+    method: str
+        The interpolation method, see :py:func:`interpolation_method`.
+    """
+    def __init__(self, reference_date, node_times, node_rates, day_counter, method):
+        self.reference_date = reference_date
+        self.day_counter = day_counter
+        self.method = method
+        self.times = np.asarray(node_times, dtype=np.float64)
+        self.rates = np.asarray(node_rates, dtype=np.float64)
+        values = np.log(self.rates) if method == LOG_LINEAR else self.rates
+        dx = np.diff(self.times)
+        slopes = np.diff(values) / dx
+        self._values = values[:-1]
+        if method in (LINEAR, LOG_LINEAR) or len(self.times) < 3:
+            self._a = slopes
+            self._b = np.zeros_like(slopes)
+            self._c = np.zeros_like(slopes)
+        else:
+            if method == KRUGER:
+                derivatives = _kruger_slopes(slopes)
+            else:
+                derivatives = _spline_slopes(dx, slopes)
+                if method == MONOTONIC_SPLINE:
+                    derivatives = _hyman_filter(dx, slopes, derivatives)
+            self._a = derivatives[:-1]
+            self._b = (3.0 * slopes - derivatives[1:] - 2.0 * derivatives[:-1]) / dx
+            self._c = (derivatives[1:] + derivatives[:-1] - 2.0 * slopes) / (dx * dx)
+        t_max = self.times[-1]
+        self._instantaneous_forward_max = self.rates[-1] + t_max * self._interpolation_derivative(t_max)
+
+    @classmethod
+    def from_curve(cls, yield_curve, interpolation_type):
+        """
+        Parameters
+        ----------
+        yield_curve: QuantLib.YieldTermStructure
+            A frozen curve, as returned by :py:func:`tsfin.base.to_ql_interpolated_curve`.
+        interpolation_type: str
+            The interpolation type used to build `yield_curve`.
+
+        Returns
+        -------
+        :py:class:`NodeCurve` or None
+            The NumPy mirror of `yield_curve`, or None if its interpolation is not supported.
+        """
+        method = interpolation_method(interpolation_type)
+        if method is None:
+            return None
+        try:
+            nodes = yield_curve.nodes()
+        except AttributeError:
+            return None
+        reference_date = nodes[0][0]
+        day_counter = yield_curve.dayCounter()
+        serials = np.array([node_date.serialNumber() for node_date, _ in nodes], dtype=np.int64)
+        rates = np.array([rate for _, rate in nodes], dtype=np.float64)
+        return cls(reference_date, year_fractions(day_counter, reference_date, serials), rates, day_counter, method)
+
+    def _segments(self, time):
+        return np.clip(np.searchsorted(self.times, time, side='right') - 1, 0, len(self.times) - 2)
+
+    def _interpolation(self, time):
+        i = self._segments(time)
+        dx = time - self.times[i]
+        value = self._values[i] + dx * (self._a[i] + dx * (self._b[i] + dx * self._c[i]))
+        return np.exp(value) if self.method == LOG_LINEAR else value
+
+    def _interpolation_derivative(self, time):
+        i = self._segments(time)
+        dx = time - self.times[i]
+        derivative = self._a[i] + dx * (2.0 * self._b[i] + 3.0 * dx * self._c[i])
+        return derivative * self._interpolation(time) if self.method == LOG_LINEAR else derivative
+
+    def zero_yield(self, time):
+        """
+        Parameters
+        ----------
+        time: array-like of float
+            Times from the reference date.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Continuously compounded zero rates at `time`. NaN for negative times.
+        """
+        time = np.asarray(time, dtype=np.float64)
+        t_max = self.times[-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            extrapolated = (self.rates[-1] * t_max + self._instantaneous_forward_max * (time - t_max)) / time
+        rates = np.where(time <= t_max, self._interpolation(time), extrapolated)
+        return np.where(time < 0.0, np.nan, rates)
+
+    def discount_times(self, time):
+        """
+        Parameters
+        ----------
+        time: array-like of float
+            Times from the reference date.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Discount factors at `time`.
+        """
+        time = np.asarray(time, dtype=np.float64)
+        return np.where(time == 0.0, 1.0, np.exp(-self.zero_yield(time) * time))
+
+    def times_to(self, serials):
+        """
+        Parameters
+        ----------
+        serials: array-like of int
+            Date serial numbers.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Times from the reference date to the dates, with the day counter of the curve.
+        """
+        return year_fractions(self.day_counter, self.reference_date, serials)
+
+    def discount(self, serials):
+        """
+        Parameters
+        ----------
+        serials: array-like of int
+            Date serial numbers.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Discount factors at the dates.
+        """
+        return self.discount_times(self.times_to(serials))
+
+    def zero_rate(self, serials, day_counter, compounding, frequency):
+        """
+        Parameters
+        ----------
+        serials: array-like of int
+            Date serial numbers of the maturities.
+        day_counter: QuantLib.DayCounter
+            Day counter of the rates.
+        compounding: QuantLib.Compounding
+            Compounding convention of the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention of the rates.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Zero rates to the dates, as ``QuantLib.YieldTermStructure.zeroRate``.
+        """
+        serials = np.asarray(serials, dtype=np.int64)
+        at_reference = serials == self.reference_date.serialNumber()
+        discount = np.where(at_reference, self.discount_times(QL_TIME_STEP), self.discount(serials))
+        time = np.where(at_reference, QL_TIME_STEP, year_fractions(day_counter, self.reference_date, serials))
+        return implied_rate(1.0 / discount, time, compounding, frequency)
+
+    def zero_rate_times(self, time, compounding, frequency):
+        """
+        Parameters
+        ----------
+        time: array-like of float
+            Times from the reference date.
+        compounding: QuantLib.Compounding
+            Compounding convention of the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention of the rates.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Zero rates to the times, as ``QuantLib.YieldTermStructure.zeroRate``.
+        """
+        time = np.asarray(time, dtype=np.float64)
+        time = np.where(time == 0.0, QL_TIME_STEP, time)
+        return implied_rate(1.0 / self.discount_times(time), time, compounding, frequency)
+
+    def forward_rate(self, serials1, serials2, day_counter, compounding, frequency):
+        """
+        Parameters
+        ----------
+        serials1: array-like of int
+            Date serial numbers of the start of the periods.
+        serials2: array-like of int
+            Date serial numbers of the end of the periods, broadcast with `serials1`.
+        day_counter: QuantLib.DayCounter
+            Day counter of the rates.
+        compounding: QuantLib.Compounding
+            Compounding convention of the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention of the rates.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Forward rates between the dates, as ``QuantLib.YieldTermStructure.forwardRate``. NaN where a period ends
+            before it starts.
+        """
+        serials1, serials2 = np.broadcast_arrays(np.asarray(serials1, dtype=np.int64),
+                                                 np.asarray(serials2, dtype=np.int64))
+        time1 = self.times_to(serials1)
+        empty = serials1 == serials2
+        # Empty periods are replaced by a short period around their date, as in QuantLib.
+        short1 = np.maximum(time1 - QL_TIME_STEP / 2.0, 0.0)
+        compound = np.where(empty, self.discount_times(short1) / self.discount_times(short1 + QL_TIME_STEP),
+                            self.discount_times(time1) / self.discount(serials2))
+        time = np.where(empty, QL_TIME_STEP, year_fractions(day_counter, serials1, serials2))
+        return np.where(serials2 < serials1, np.nan, implied_rate(compound, time, compounding, frequency))
+
+    def forward_rate_times(self, time1, time2, compounding, frequency):
+        """
+        Parameters
+        ----------
+        time1: array-like of float
+            Times of the start of the periods.
+        time2: array-like of float
+            Times of the end of the periods, broadcast with `time1`.
+        compounding: QuantLib.Compounding
+            Compounding convention of the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention of the rates.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Forward rates between the times, as ``QuantLib.YieldTermStructure.forwardRate``.
+        """
+        time1, time2 = np.broadcast_arrays(np.asarray(time1, dtype=np.float64), np.asarray(time2, dtype=np.float64))
+        empty = time1 == time2
+        time1 = np.where(empty, np.maximum(time1 - QL_TIME_STEP / 2.0, 0.0), time1)
+        time2 = np.where(empty, time1 + QL_TIME_STEP, time2)
+        compound = self.discount_times(time1) / self.discount_times(time2)
+        return implied_rate(compound, time2 - time1, compounding, frequency)
@@ -19,14 +19,38 @@ InterpolatedSpreadYieldCurveTimeSeries, a class to handle a time series of sprea
 SingleSpreadYieldCurveTimeSeries, a class to handle a time series of single spread yield curves.
 """
 
+import numpy as np
 import QuantLib as ql
-from tsfin.base import to_ql_date, conditional_vectorize, to_list
+from tsfin.base import to_ql_date, conditional_vectorize, to_list, to_ql_date_serial, compound_factor, implied_rate, \
+    year_fractions, switch_evaluation_date
+from tsfin.curves.curvestore import CurveStore
+from tsfin.curves.nodecurve import QL_TIME_STEP
 
 
 class InterpolatedSpreadYieldCurveTimeSeries:
 
     def __init__(self, yield_curve_time_series, spreads_ts_collection=None, spreads=None, day_counter=None,
-                 compounding=ql.Compounded, frequency=ql.Annual, **kwargs):
+                 compounding=ql.Compounded, frequency=ql.Annual, curve_store=None, **kwargs):
+        """ Time series of yield curves added to spreads interpolated linearly between maturities.
+
+        Parameters
+        ----------
+        yield_curve_time_series: :py:class:`YieldCurveTimeSeries`
+            The base yield curves.
+        spreads_ts_collection: :py:obj:`TimeSeriesCollection`, optional
+            Instruments with the spreads, through their ``spread_rate`` and ``maturity`` methods.
+        spreads: dict, optional
+            QuantLib.SimpleQuote spreads by maturity date, used for all dates when `spreads_ts_collection` is not
+            given.
+        day_counter: QuantLib.DayCounter
+            Day counter of the spreads.
+        compounding: QuantLib.Compounding, optional
+            Compounding convention of the spreads. Default: QuantLib.Compounded.
+        frequency: QuantLib.Frequency, optional
+            Frequency convention of the spreads. Default: QuantLib.Annual.
+        curve_store: :py:class:`CurveStore`, optional
+            Store for the spreaded curves, which are built when requested. Default: a store of up to 256 curves.
+        """
         self.yield_curve_time_series = yield_curve_time_series
         self.spreads_ts_collection = spreads_ts_collection
         self.spreads = spreads
@@ -34,7 +58,68 @@ class InterpolatedSpreadYieldCurveTimeSeries:
         self.calendar = yield_curve_time_series.calendar
         self.compounding = compounding
         self.frequency = frequency
-        self.spreaded_curves = dict()
+        self.spreaded_curves = curve_store if curve_store is not None else CurveStore(max_curves=256)
+        # Date x spread instrument arrays of the spread maturities and rates. The row of each date is in _spread_rows.
+        size = len(spreads_ts_collection) if spreads_ts_collection is not None else 0
+        self.spread_maturities = np.empty((0, size), dtype=np.int64)
+        self.spread_rates = np.empty((0, size), dtype=np.float64)
+        self._spread_rows = dict()
+
+    def update_spread_nodes(self, dates):
+        """ Compute the spread nodes of each date in `dates` not computed yet, from ``self.spreads_ts_collection``.
+
+        Parameters
+        ----------
+        dates: QuantLib.Date or list of QuantLib.Date
+            The dates of the spreads.
+        """
+        if self.spreads_ts_collection is None:
+            return
+        dates = [to_ql_date(date) for date in to_list(dates)]
+        dates = [date for date in dict.fromkeys(dates) if date.serialNumber() not in self._spread_rows]
+        if len(dates) == 0:
+            return
+        size = len(self._spread_rows)
+        if size + len(dates) > len(self.spread_rates):
+            # Grow the arrays geometrically, so that dates added one at a time do not copy them every time.
+            capacity = max(size + len(dates), 2 * len(self.spread_rates))
+            maturities = np.zeros((capacity, self.spread_rates.shape[1]), dtype=np.int64)
+            rates = np.full((capacity, self.spread_rates.shape[1]), np.nan, dtype=np.float64)
+            maturities[:size] = self.spread_maturities[:size]
+            rates[:size] = self.spread_rates[:size]
+            self.spread_maturities, self.spread_rates = maturities, rates
+        for row, date in enumerate(dates, size):
+            switch_evaluation_date(date)
+            for column, ts in enumerate(self.spreads_ts_collection):
+                maturity = ts.maturity(date=date)
+                self.spread_maturities[row, column] = maturity.serialNumber()
+                self.spread_rates[row, column] = ts.spread_rate(date=date).equivalentRate(
+                    self.day_counter, self.compounding, self.frequency, date, maturity).rate()
+            self._spread_rows[date.serialNumber()] = row
+
+    def spread_nodes(self, date):
+        """
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the spreads.
+
+        Returns
+        -------
+        tuple (numpy.ndarray of int64, numpy.ndarray of float64)
+            The serial numbers of the spread maturities, sorted, and the spreads at each maturity.
+        """
+        date = to_ql_date(date)
+        if self.spreads_ts_collection is None:
+            maturities = sorted(self.spreads.keys()) if self.spreads is not None else []
+            return np.array([maturity.serialNumber() for maturity in maturities], dtype=np.int64), \
+                np.array([self.spreads[maturity].value() for maturity in maturities], dtype=np.float64)
+        self.update_spread_nodes(date)
+        row = self._spread_rows[date.serialNumber()]
+        maturities, rates = self.spread_maturities[row], self.spread_rates[row]
+        # Spreads with the same maturity: keep the last one in the collection.
+        reversed_maturities, last = np.unique(maturities[::-1], return_index=True)
+        return reversed_maturities, rates[::-1][last]
 
     def update_curves(self, dates):
 
@@ -42,23 +127,15 @@ class InterpolatedSpreadYieldCurveTimeSeries:
         for date in dates:
             date = to_ql_date(date)
 
-            ql.Settings.instance().evaluationDate = date
-            spread_dict = dict()
-            if self.spreads_ts_collection is not None:
-                for ts in self.spreads_ts_collection:
-                    maturity = ts.maturity(date=date)
-                    rate = ts.spread_rate(date=date).equivalentRate(self.day_counter, self.compounding, self.frequency,
-                                                                    date, maturity).rate()
-                    spread_dict[maturity] = ql.SimpleQuote(rate)
-            elif self.spreads is not None:
+            switch_evaluation_date(date)
+            if self.spreads_ts_collection is None and self.spreads is not None:
                 # passing the dict with dates and simple quotes directly.
-                spread_dict = self.spreads
-
-            date_list = list()
-            spread_list = list()
-            for maturity in sorted(spread_dict.keys()):
-                date_list.append(maturity)
-                spread_list.append(ql.QuoteHandle(spread_dict[maturity]))
+                date_list = sorted(self.spreads.keys())
+                spread_list = [ql.QuoteHandle(self.spreads[maturity]) for maturity in date_list]
+            else:
+                maturities, rates = self.spread_nodes(date)
+                date_list = [ql.Date(int(maturity)) for maturity in maturities]
+                spread_list = [ql.QuoteHandle(ql.SimpleQuote(float(rate))) for rate in rates]
 
             curve_handle = ql.YieldTermStructureHandle(self.yield_curve_time_series.yield_curve(date=date))
             spread_curve = ql.SpreadedLinearZeroInterpolatedTermStructure(curve_handle, spread_list, date_list,
@@ -89,7 +166,59 @@ class InterpolatedSpreadYieldCurveTimeSeries:
 
         except KeyError:
             self.update_curves(dates=date)
-            return self.spreaded_curves[date]
+            spreaded_curve = self.spreaded_curves.peek(date)
+            if spreaded_curve is None:
+                raise KeyError("No spreaded curve was stored at {}".format(date))
+            return spreaded_curve
+
+    def zero_rates(self, date, to_date, compounding, frequency, day_counter=None):
+        """ Zero rates of the spreaded yield curve at a date, for many dates at once.
+
+        Where the base curve is a frozen curve (see :py:meth:`YieldCurveTimeSeries.node_curve`), the rates are
+        computed in NumPy from its nodes and the spread nodes, without building the spreaded curve. Otherwise they are
+        evaluated by QuantLib.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curve.
+        to_date: array-like of date-like
+            Maturities of the rates.
+        compounding: QuantLib.Compounding
+            Compounding convention for the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention for the rates.
+        day_counter: QuantLib.DayCounter, optional
+            The day counter of the rates. Default: the day counter of the spreads.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The zero rates, with the shape of `to_date`, as in :py:meth:`zero_rate_to_date`.
+        """
+        date = to_ql_date(date)
+        day_counter = day_counter if day_counter is not None else self.day_counter
+        serials = np.asarray(to_ql_date_serial(to_date), dtype=np.int64)
+        node_curve = None
+        if hasattr(self.yield_curve_time_series, 'node_curve'):
+            node_curve = self.yield_curve_time_series.node_curve(date)
+        if node_curve is None:
+            yield_curve = self.yield_curve(date)
+            rates = [yield_curve.zeroRate(ql.Date(serial), day_counter, compounding, frequency, True).rate()
+                     for serial in serials.ravel().tolist()]
+            return np.array(rates, dtype=np.float64).reshape(serials.shape)
+        maturities, spreads = self.spread_nodes(date)
+        # As QuantLib's spreaded curve: the spreads are added to the base zero rates with the compounding of the
+        # spreads, at times measured with the day counter of the base curve, and are flat outside their maturities.
+        reference_serial = node_curve.reference_date.serialNumber()
+        at_reference = serials == reference_serial
+        times = np.where(at_reference, QL_TIME_STEP, node_curve.times_to(serials))
+        spread = np.interp(times, node_curve.times_to(maturities), spreads) if len(maturities) > 0 else 0.0
+        base_rates = implied_rate(1.0 / node_curve.discount_times(times), times, self.compounding, self.frequency)
+        compound = compound_factor(base_rates + spread, times, self.compounding, self.frequency)
+        rate_times = np.where(at_reference, QL_TIME_STEP,
+                              year_fractions(day_counter, node_curve.reference_date, serials))
+        return implied_rate(compound, rate_times, compounding, frequency)
 
     def yield_curve_handle(self, date):
         """ Handle for a yield curve at a given date.
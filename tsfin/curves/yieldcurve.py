@@ -18,15 +18,24 @@
 YieldCurveTimeSeries, a class to handle a time series of yield curves.
 """
 
+import inspect
 from collections import namedtuple, Counter
 from operator import attrgetter
+import numpy as np
+import pandas as pd
 import QuantLib as ql
-from tsfin.base import to_list, conditional_vectorize, find_le, find_gt, to_ql_date, to_ql_piecewise_curve, \
-    to_ql_interpolated_curve
+from tsfin.base import to_list, conditional_vectorize, find_le, find_gt, to_ql_date, to_ql_date_serial, \
+    to_ql_piecewise_curve, to_ql_interpolated_curve, fork_map, split_positions, LRUCache, QL_SERIAL_EPOCH, \
+    implied_rate, year_fractions, serialize_evaluation_date, switch_evaluation_date
+from tsfin.curves.curvestore import CurveStore, FrozenCurveStore, signature_key
+from tsfin.curves.nodecurve import NodeCurve, QL_TIME_STEP
+from tsfin.curves.curvesurface import CurveSurface
 
 
 # ExtRateHelpers are a named tuples containing QuantLib RateHelpers objects and other meta-information.
 ExtRateHelper = namedtuple('ExtRateHelper', ['ts_name', 'issue_date', 'maturity_date', 'helper'])
+# The last bootstrapped curve, kept for incremental bootstrapping.
+BootstrapState = namedtuple('BootstrapState', ['date', 'signature', 'node_serials', 'node_rates'])
 
 
 class SimpleYieldCurve:
@@ -40,14 +49,21 @@ class SimpleYieldCurve:
         Day counter for the yield curves.
     ignore_errors: bool, optional
         Use last available yield curve if building a yield curve fails at a given date. Defaults to False.
+    curve_store: :py:class:`CurveStore`, optional
+        Store for the yield curves, possibly bounded. Curves evicted from the store are rebuilt when requested again.
+        Defaults to an unbounded store.
     """
 
-    def __init__(self, calendar, day_counter, enable_extrapolation, ignore_errors):
-        self.yield_curves = dict()
+    def __init__(self, calendar, day_counter, enable_extrapolation, ignore_errors, curve_store=None):
+        self.yield_curves = curve_store if curve_store is not None else CurveStore()
         self.calendar = calendar
         self.day_counter = day_counter
         self.enable_extrapolation = enable_extrapolation
         self.ignore_errors = ignore_errors
+        # NumPy mirrors of the frozen curves, with the curve they mirror, by date.
+        self._node_curves = LRUCache(maxsize=256)
+        # Implied term structures, with the curve they are implied from, by (date, future date).
+        self._implied_curves = LRUCache(maxsize=1024)
 
     def update_curves(self, dates):
         pass
@@ -80,7 +96,7 @@ class SimpleYieldCurve:
                 except Exception as e:
                     print("Error in creating curve in {}".format(date))
                     print(e)
-                    curve_dates = list(self.yield_curves.keys())
+                    curve_dates = sorted(self.yield_curves.keys())
                     try:
                         # Try to find latest date less than 'date'.
                         latest_available_date = find_le(curve_dates, date)
@@ -90,7 +106,10 @@ class SimpleYieldCurve:
                     return self.yield_curve(to_ql_date(latest_available_date))
             else:
                 self.update_curves(date)
-            return self.yield_curves[date]
+            yield_curve = self.yield_curves.peek(date)
+            if yield_curve is None:
+                raise KeyError("No yield curve was stored at {}".format(date))
+            return yield_curve
 
     def spreaded_curve(self, date, spread, compounding, frequency, day_counter=None):
         """ Get yield curve at a date, added to a spread.
@@ -226,8 +245,17 @@ class SimpleYieldCurve:
         QuantLib.ImpliedTermStructure
             The implied term structure at the future date from date
         """
+        date = to_ql_date(date)
         future_date = to_ql_date(future_date)
-        return ql.ImpliedTermStructure(self.yield_curve_handle(date), future_date)
+        yield_curve = self.yield_curve(date)
+        key = (date, future_date)
+        cached = self._implied_curves.get(key)
+        # The curve may have been rebuilt since the implied term structure was cached.
+        if cached is not None and cached[0] is yield_curve:
+            return cached[1]
+        implied_curve = ql.ImpliedTermStructure(ql.YieldTermStructureHandle(yield_curve), future_date)
+        self._implied_curves[key] = (yield_curve, implied_curve)
+        return implied_curve
 
     @conditional_vectorize('date', 'to_date')
     def discount_to_date(self, date, to_date, extrapolate=True):
@@ -532,21 +560,287 @@ class SimpleYieldCurve:
         return self.implied_term_structure(date, future_date).zeroRate(to_time, compounding, frequency,
                                                                        extrapolate).rate()
 
+    def _node_interpolation_type(self):
+        """
+        Returns
+        -------
+        str or None
+            The interpolation type of the curves, if they are frozen curves that :py:class:`NodeCurve` can evaluate.
+        """
+        return None
+
+    def node_curve(self, date):
+        """ NumPy mirror of the yield curve at a date, for evaluating many dates or times at once.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curve.
+
+        Returns
+        -------
+        :py:class:`NodeCurve` or None
+            The mirror of the curve at `date`, or None if the curve is not a frozen curve with a supported
+            interpolation.
+        """
+        date = to_ql_date(date)
+        yield_curve = self.yield_curve(date)
+        interpolation_type = self._node_interpolation_type()
+        if interpolation_type is None:
+            return None
+        cached = self._node_curves.get(date)
+        # The curve may have been rebuilt since the mirror was cached, e.g. after an eviction from the curve store.
+        if cached is not None and cached[0] is yield_curve:
+            return cached[1]
+        node_curve = NodeCurve.from_curve(yield_curve, interpolation_type)
+        self._node_curves[date] = (yield_curve, node_curve)
+        return node_curve
+
+    def discount_factors(self, date, to_date=None, to_time=None):
+        """ Discount factors of the yield curve at a date, for many dates or times at once.
+
+        Frozen curves are evaluated in NumPy by :py:meth:`node_curve`, other curves by QuantLib.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curve.
+        to_date: array-like of date-like, optional
+            Maturities of the discount factors.
+        to_time: array-like of float, optional
+            Times in years of the discount factors, used when `to_date` is not given.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The discount factors, with the shape of `to_date` or `to_time`.
+        """
+        node_curve = self.node_curve(date)
+        if to_date is not None:
+            serials = np.asarray(to_ql_date_serial(to_date), dtype=np.int64)
+            if node_curve is not None:
+                return node_curve.discount(serials)
+            yield_curve = self.yield_curve(date)
+            return self._map_serials(lambda d: yield_curve.discount(d, True), serials)
+        to_time = np.asarray(to_time, dtype=np.float64)
+        if node_curve is not None:
+            return node_curve.discount_times(to_time)
+        yield_curve = self.yield_curve(date)
+        return np.vectorize(lambda t: yield_curve.discount(float(t), True), otypes=[np.float64])(to_time)
+
+    def zero_rates(self, date, compounding, frequency, to_date=None, to_time=None, day_counter=None):
+        """ Zero rates of the yield curve at a date, for many dates or times at once.
+
+        Frozen curves are evaluated in NumPy by :py:meth:`node_curve`, other curves by QuantLib.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curve.
+        compounding: QuantLib.Compounding
+            Compounding convention for the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention for the rates.
+        to_date: array-like of date-like, optional
+            Maturities of the rates.
+        to_time: array-like of float, optional
+            Times in years of the rates, used when `to_date` is not given.
+        day_counter: QuantLib.DayCounter, optional
+            The day counter of the rates with `to_date`. Default: the day counter of the curve.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The zero rates, with the shape of `to_date` or `to_time`.
+        """
+        node_curve = self.node_curve(date)
+        if to_date is not None:
+            day_counter = day_counter if day_counter is not None else self.day_counter
+            serials = np.asarray(to_ql_date_serial(to_date), dtype=np.int64)
+            if node_curve is not None:
+                return node_curve.zero_rate(serials, day_counter, compounding, frequency)
+            yield_curve = self.yield_curve(date)
+            return self._map_serials(lambda d: yield_curve.zeroRate(d, day_counter, compounding, frequency,
+                                                                    True).rate(), serials)
+        to_time = np.asarray(to_time, dtype=np.float64)
+        if node_curve is not None:
+            return node_curve.zero_rate_times(to_time, compounding, frequency)
+        yield_curve = self.yield_curve(date)
+        return np.vectorize(lambda t: yield_curve.zeroRate(float(t), compounding, frequency, True).rate(),
+                            otypes=[np.float64])(to_time)
+
+    def forward_rates(self, date, to_date1, to_date2, compounding, frequency, day_counter=None):
+        """ Forward rates of the yield curve at a date, for many periods at once.
+
+        Frozen curves are evaluated in NumPy by :py:meth:`node_curve`, other curves by QuantLib.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curve.
+        to_date1: array-like of date-like
+            Start dates of the periods.
+        to_date2: array-like of date-like
+            End dates of the periods, broadcast with `to_date1`.
+        compounding: QuantLib.Compounding
+            Compounding convention for the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention for the rates.
+        day_counter: QuantLib.DayCounter, optional
+            The day counter of the rates. Default: the day counter of the curve.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The forward rates between `to_date1` and `to_date2`.
+        """
+        day_counter = day_counter if day_counter is not None else self.day_counter
+        serials1, serials2 = np.broadcast_arrays(np.asarray(to_ql_date_serial(to_date1), dtype=np.int64),
+                                                 np.asarray(to_ql_date_serial(to_date2), dtype=np.int64))
+        node_curve = self.node_curve(date)
+        if node_curve is not None:
+            return node_curve.forward_rate(serials1, serials2, day_counter, compounding, frequency)
+        yield_curve = self.yield_curve(date)
+        rates = [yield_curve.forwardRate(ql.Date(start), ql.Date(end), day_counter, compounding, frequency,
+                                         True).rate()
+                 for start, end in zip(serials1.ravel().tolist(), serials2.ravel().tolist())]
+        return np.array(rates, dtype=np.float64).reshape(serials1.shape)
+
+    def _implied_discounts(self, date, future_serials, time):
+        # As QuantLib.ImpliedTermStructure: discounts of the base curve, relative to the discount at the future date.
+        yield_curve = self.yield_curve(date)
+        future_time = year_fractions(yield_curve.dayCounter(), yield_curve.referenceDate(), future_serials)
+        future_time, time = np.broadcast_arrays(future_time, time)
+        discounts = self.discount_factors(date, to_time=np.concatenate((future_time.ravel(),
+                                                                        (future_time + time).ravel())))
+        return (discounts[future_time.size:] / discounts[:future_time.size]).reshape(future_time.shape)
+
+    def implied_discount_factors(self, date, future_date, to_date=None, to_time=None):
+        """ Discount factors of the yield curve at a date, implied at future dates, for many dates or times at once.
+
+        Computed as ratios of discount factors of the curve at `date` (see :py:meth:`discount_factors`), without
+        building the implied term structures.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curve.
+        future_date: date-like or array-like of date-like
+            Dates of the implied yield curves.
+        to_date: array-like of date-like, optional
+            Maturities of the discount factors, broadcast with `future_date`.
+        to_time: array-like of float, optional
+            Times in years from `future_date` of the discount factors, used when `to_date` is not given.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The discount factors, as in :py:meth:`implied_term_structure`.
+        """
+        future_serials = np.asarray(to_ql_date_serial(future_date), dtype=np.int64)
+        if to_date is not None:
+            serials = np.asarray(to_ql_date_serial(to_date), dtype=np.int64)
+            to_time = year_fractions(self.yield_curve(date).dayCounter(), future_serials, serials)
+        return self._implied_discounts(date, future_serials, np.asarray(to_time, dtype=np.float64))
+
+    def implied_zero_rates(self, date, future_date, compounding, frequency, to_date=None, to_time=None,
+                           day_counter=None):
+        """ Zero rates of the yield curve at a date, implied at future dates, for many dates or times at once.
+
+        Computed as ratios of discount factors of the curve at `date` (see :py:meth:`discount_factors`), without
+        building the implied term structures.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curve.
+        future_date: date-like or array-like of date-like
+            Dates of the implied yield curves.
+        compounding: QuantLib.Compounding
+            Compounding convention for the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention for the rates.
+        to_date: array-like of date-like, optional
+            Maturities of the rates, broadcast with `future_date`.
+        to_time: array-like of float, optional
+            Times in years from `future_date` of the rates, used when `to_date` is not given.
+        day_counter: QuantLib.DayCounter, optional
+            The day counter of the rates with `to_date`. Default: the day counter of the curve.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The zero rates, as in :py:meth:`implied_zero_rate_to_date` and :py:meth:`implied_zero_rate_to_time`.
+        """
+        future_serials = np.asarray(to_ql_date_serial(future_date), dtype=np.int64)
+        if to_date is None:
+            # Null times are replaced by a short time, as in QuantLib.
+            to_time = np.asarray(to_time, dtype=np.float64)
+            to_time = np.where(to_time == 0.0, QL_TIME_STEP, to_time)
+            discounts = self._implied_discounts(date, future_serials, to_time)
+            return implied_rate(1.0 / discounts, to_time, compounding, frequency)
+        day_counter = day_counter if day_counter is not None else self.day_counter
+        future_serials, serials = np.broadcast_arrays(future_serials,
+                                                      np.asarray(to_ql_date_serial(to_date), dtype=np.int64))
+        at_future = serials == future_serials
+        # Maturities at the future date are replaced by a short time, as in QuantLib.
+        curve_time = np.where(at_future, QL_TIME_STEP,
+                              year_fractions(self.yield_curve(date).dayCounter(), future_serials, serials))
+        discounts = self._implied_discounts(date, future_serials, curve_time)
+        time = np.where(at_future, QL_TIME_STEP, year_fractions(day_counter, future_serials, serials))
+        return implied_rate(1.0 / discounts, time, compounding, frequency)
+
+    def zero_rate_matrix(self, dates, tenors, compounding, frequency, day_counter=None):
+        """ Zero rates for many curve dates and tenors.
+
+        Parameters
+        ----------
+        dates: array-like of date-like
+            The dates of the yield curves.
+        tenors: array-like of str
+            Strings representing QuantLib tenors, advanced from each date with the calendar of the curves.
+        compounding: QuantLib.Compounding
+            Compounding convention for the rates.
+        frequency: QuantLib.Frequency
+            Frequency convention for the rates.
+        day_counter: QuantLib.DayCounter, optional
+            The day counter of the rates. Default: the day counter of the curves.
+
+        Returns
+        -------
+        numpy.ndarray of float64, shape (dates, tenors)
+            The zero rates, as in :py:meth:`zero_rate_to_tenor`.
+        """
+        periods = [ql.PeriodParser.parse(str(tenor).upper()) for tenor in to_list(tenors)]
+        dates = [to_ql_date(date) for date in to_list(dates)]
+        rates = np.empty((len(dates), len(periods)), dtype=np.float64)
+        for i, date in enumerate(dates):
+            to_dates = [self.calendar.advance(date, period) for period in periods]
+            rates[i] = self.zero_rates(date, compounding, frequency, to_date=to_dates, day_counter=day_counter)
+        return rates
+
+    @staticmethod
+    def _map_serials(function, serials):
+        return np.array([function(ql.Date(serial)) for serial in serials.ravel().tolist()],
+                        dtype=np.float64).reshape(serials.shape)
+
     @staticmethod
     def _date_to_month_year(dt_object):
         return str(dt_object.month()) + '-' + str(dt_object.year())
 
 
 class YieldCurveTimeSeries(SimpleYieldCurve):
+    # Whether the curves can be bootstrapped in worker processes, i.e. bootstrapping has no side effects needed later.
+    _parallel_bootstrap = True
 
     def __init__(self, ts_collection=None, calendar=None, day_counter=None, keep_only_on_the_run_month=False,
                  ignore_errors=False, curve_type='linear_zero', freeze_curves=True, enable_extrapolation=True,
-                 frozen_curve_interpolation_type='monotonic_cubic_zero', constraint_at_zero=True,
-                 **other_rate_helper_args):
+                 frozen_curve_interpolation_type='monotonic_cubic_zero', constraint_at_zero=True, curve_store=None,
+                 incremental=False, node_cache_dir=None, **other_rate_helper_args):
         """Time series of QuantLib YieldTermStructures objects.
 
-        The QuantLib YieldTermStructure objects are stored in the dict self.yield_curves and are 'lazy' created and
-        stored when requested.
+        The QuantLib YieldTermStructure objects are stored in the :py:class:`CurveStore` self.yield_curves and are
+        'lazy' created and stored when requested.
 
         Parameters
         ----------
@@ -560,24 +854,150 @@ class YieldCurveTimeSeries(SimpleYieldCurve):
             Whether to use only one instrument per month for the yield curves. Defaults to False.
         ignore_errors: bool, optional
             Use last available yield curve if building a yield curve fails at a given date. Defaults to False.
+        curve_store: :py:class:`CurveStore`, optional
+            Store for the yield curves, e.g. bounded in number of curves or memory. Defaults to an unbounded store.
+        incremental: bool, optional
+            Only for frozen curves. Whether to reuse the curve of the previously bootstrapped date when no helper quote
+            changed. The previous frozen curve is re-anchored at the new date, keeping the zero rates at the same
+            number of days from the curve date. This ignores the calendar and roll effects between the two dates (of
+            the order of a basis point after a week of unchanged quotes), so only use it where that is acceptable. The
+            number of bootstraps and node solves saved is in ``self.bootstrap_stats``. Defaults to False.
+        node_cache_dir: str, optional
+            Only for frozen curves. Directory of a persistent :py:class:`FrozenCurveStore` of curve nodes, shared by
+            any number of curve time series. Curves whose helper quotes did not change since they were stored are
+            loaded instead of bootstrapped. Defaults to no persistent store.
         **other_rate_helper_args: key=value pairs, optional
             Additional arguments to pass to ``rate_helper`` methods of the instruments in `ts_collection`.
         """
         super().__init__(calendar=calendar, day_counter=day_counter, ignore_errors=ignore_errors,
-                         enable_extrapolation=enable_extrapolation)
+                         enable_extrapolation=enable_extrapolation, curve_store=curve_store)
         self.ts_collection = ts_collection
         self.keep_only_on_the_run_month = keep_only_on_the_run_month
-        self.yield_curves = dict()
         self.curve_type = str(curve_type).lower()
         self.freeze_curves = freeze_curves
         self.frozen_curve_interpolation_type = str(frozen_curve_interpolation_type).lower()
         self.constraint_at_zero = constraint_at_zero
+        self.incremental = incremental
+        self.bootstrap_stats = {'bootstraps': 0, 'reused': 0, 'node_solves_saved': 0, 'loaded': 0}
+        self._last_bootstrap = None
         self.other_rate_helper_args = other_rate_helper_args
+        self._helper_index = None
+        self.node_cache = None
+        if node_cache_dir is not None and freeze_curves:
+            self.node_cache = FrozenCurveStore(node_cache_dir, identity=self._curve_identity())
+
+    def _node_interpolation_type(self):
+        return self.frozen_curve_interpolation_type if self.freeze_curves else None
+
+    def _curve_identity(self):
+        """
+        Returns
+        -------
+        tuple
+            The attributes that define how the curves are built, identifying them in a :py:class:`FrozenCurveStore`.
+        """
+        ts_names = sorted(ts.ts_name for ts in self.ts_collection) if self.ts_collection is not None else []
+        return (type(self).__name__, self.curve_type, self.frozen_curve_interpolation_type, self.day_counter.name(),
+                self.calendar.name(), self.constraint_at_zero, tuple(ts_names),
+                tuple(sorted((key, repr(value)) for key, value in self.other_rate_helper_args.items())))
+
+    def _active_interval(self, ts):
+        """
+        Parameters
+        ----------
+        ts: :py:obj:`Instrument`
+            An instrument of ``self.ts_collection``.
+
+        Returns
+        -------
+        tuple (float, float)
+            The serial number of the first date at which `ts` may return a rate helper, and of the first date after
+            that at which it no longer does: before its first valid quote, and from its expiry (or, for instruments
+            with a ``max_inactive_days`` argument, that many days after their last valid quote) on. Infinite where
+            unbounded.
+        """
+        start, end = -np.inf, np.inf
+        try:
+            ts_values = ts.quotes.ts_values
+            first_index, last_index = ts_values.first_valid_index(), ts_values.last_valid_index()
+        except AttributeError:
+            first_index = last_index = None
+        if first_index is not None:
+            start = np.ceil((pd.Timestamp(first_index) - QL_SERIAL_EPOCH) / pd.Timedelta(days=1))
+        for attribute in ('expire_date', 'maturity_date'):
+            expiry = getattr(ts, attribute, None)
+            if isinstance(expiry, ql.Date):
+                end = min(end, expiry.serialNumber())
+        try:
+            parameter = inspect.signature(ts.rate_helper).parameters.get('max_inactive_days')
+        except (AttributeError, TypeError, ValueError):
+            parameter = None
+        if parameter is not None and last_index is not None:
+            max_inactive_days = self.other_rate_helper_args.get('max_inactive_days', parameter.default)
+            last = np.ceil((pd.Timestamp(last_index) - QL_SERIAL_EPOCH) / pd.Timedelta(days=1))
+            end = min(end, last + max_inactive_days)
+        return start, end
+
+    def _quote_ranges(self):
+        """
+        Returns
+        -------
+        tuple
+            The first and last valid quote dates of each instrument of ``self.ts_collection``, on which their active
+            intervals depend.
+        """
+        ranges = list()
+        for ts in self.ts_collection:
+            try:
+                ts_values = ts.quotes.ts_values
+                ranges.append((ts_values.first_valid_index(), ts_values.last_valid_index()))
+            except AttributeError:
+                ranges.append((None, None))
+        return tuple(ranges)
+
+    def reset_helper_index(self):
+        """Rebuild the index of the active intervals of the instruments at the next bootstrap, e.g. after changing
+        ``self.other_rate_helper_args``. Changes of the quote ranges of the instruments are detected by
+        :py:meth:`update_curves`."""
+        self._helper_index = None
+
+    def _refresh_helper_index(self):
+        """Build the index of the active intervals of the instruments, unless it was built with the current quote
+        ranges."""
+        ranges = self._quote_ranges()
+        if self._helper_index is not None and self._helper_index[4] == ranges:
+            return
+        instruments = list(self.ts_collection)
+        intervals = np.array([self._active_interval(ts) for ts in instruments], dtype=np.float64).reshape(-1, 2)
+        # Sorted by start, so that the instruments already quoted at a date are a prefix of the index.
+        order = np.argsort(intervals[:, 0], kind='stable')
+        self._helper_index = (instruments, intervals[order, 0], intervals[order, 1], order, ranges)
+
+    def _live_instruments(self, date):
+        """
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curve.
+
+        Returns
+        -------
+        list
+            The instruments of ``self.ts_collection`` that may return a rate helper at `date`, in their order in the
+            collection.
+        """
+        if self._helper_index is None or len(self._helper_index[0]) != len(self.ts_collection):
+            self._refresh_helper_index()
+        instruments, starts, ends, order, _ = self._helper_index
+        serial = date.serialNumber()
+        started = np.searchsorted(starts, serial, side='right')
+        live = np.sort(order[:started][ends[:started] > serial])
+        return [instruments[i] for i in live.tolist()]
 
     def _get_helpers(self, date):
 
         helpers = dict()
-        for ts in self.ts_collection:
+        for ts in self._live_instruments(date):
             ts_name = ts.ts_name
             issue_date = ts.issue_date
             helper = ts.rate_helper(date=date, **self.other_rate_helper_args)
@@ -611,29 +1031,164 @@ class YieldCurveTimeSeries(SimpleYieldCurve):
 
         return helpers
 
-    def update_curves(self, dates):
+    def _bootstrap(self, date, helpers_dict=None):
+        """ Bootstrap the yield curve at a date, with the global evaluation date set to `date`.
+
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curve.
+        helpers_dict: dict, optional
+            The rate helpers at `date`, as returned by :py:meth:`_get_helpers`. Default: get them.
+
+        Returns
+        -------
+        QuantLib.YieldTermStructure
+            The curve linked to the rate helpers.
+        """
+        switch_evaluation_date(date)
+        if helpers_dict is None:
+            helpers_dict = self._get_helpers(date)
+        self.bootstrap_stats['bootstraps'] += 1
+        # Instantiate the curve
+        helpers = [ndhelper.helper for ndhelper in helpers_dict.values()]
+        # Bootstrapping the nodes
+        return to_ql_piecewise_curve(helpers=helpers,
+                                     calendar=self.calendar,
+                                     day_counter=self.day_counter,
+                                     curve_type=self.curve_type,
+                                     constraint_at_zero=self.constraint_at_zero)
+
+    def _bootstrap_nodes(self, date):
+        """
+        Parameters
+        ----------
+        date: QuantLib.Date
+            The date of the yield curve.
+
+        Returns
+        -------
+        tuple (numpy.ndarray of int, numpy.ndarray of float64, numpy.uint64)
+            The serial numbers of the node dates of the curve bootstrapped at `date`, the continuously compounded
+            zero rates at the nodes, as used by :py:meth:`_curve_from_nodes`, and the key of the helper quotes under
+            which the nodes were stored in ``self.node_cache`` (None without a node cache, or if the nodes were not
+            bootstrapped here but loaded or re-anchored from the last bootstrap).
+        """
+        if not self.incremental and self.node_cache is None:
+            return self._frozen_nodes(self._bootstrap(date)) + (None,)
+        switch_evaluation_date(date)
+        helpers_dict = self._get_helpers(date)
+        signature = self._helpers_signature(helpers_dict)
+        key = signature_key(signature) if self.node_cache is not None else None
+        nodes = self.node_cache.get(date, key) if key is not None else None
+        last = self._last_bootstrap
+        if nodes is not None:
+            self.bootstrap_stats['loaded'] += 1
+            node_serials, node_rates = nodes
+            key = None
+        elif self.incremental and last is not None and last.signature == signature:
+            # Same quotes as in the last bootstrap: re-anchor its nodes at the new date.
+            self.bootstrap_stats['reused'] += 1
+            self.bootstrap_stats['node_solves_saved'] += len(helpers_dict)
+            node_serials = last.node_serials + (date.serialNumber() - last.date.serialNumber())
+            node_rates = last.node_rates
+            # Re-anchored nodes are approximate, so they are not stored for other curve time series.
+            key = None
+        else:
+            node_serials, node_rates = self._frozen_nodes(self._bootstrap(date, helpers_dict))
+            if key is not None:
+                self.node_cache.put(date, key, node_serials, node_rates)
+        self._last_bootstrap = BootstrapState(date=date, signature=signature, node_serials=node_serials,
+                                              node_rates=node_rates)
+        return node_serials, node_rates, key
+
+    def _frozen_nodes(self, yield_curve):
+        node_dates = yield_curve.dates()
+        node_rates = [yield_curve.zeroRate(node_date, self.day_counter, ql.Continuous, ql.NoFrequency).rate()
+                      for node_date in node_dates]
+        return np.array([node_date.serialNumber() for node_date in node_dates], dtype=np.int64), \
+            np.array(node_rates, dtype=np.float64)
+
+    @staticmethod
+    def _helpers_signature(helpers_dict):
+        """
+        Parameters
+        ----------
+        helpers_dict: dict
+            The rate helpers at `date`, as returned by :py:meth:`_get_helpers`.
+
+        Returns
+        -------
+        tuple
+            The name and quote of each helper. Helpers with the same signature give the same curve, up to calendar
+            effects.
+        """
+        return tuple(sorted((ext_helper.ts_name, ext_helper.helper.quote().value())
+                            for ext_helper in helpers_dict.values()))
+
+    def _curve_from_nodes(self, node_serials, node_rates):
+        """
+        Parameters
+        ----------
+        node_serials: array-like of int
+            Serial numbers of the node dates.
+        node_rates: array-like of float
+            Continuously compounded zero rates at the nodes.
+
+        Returns
+        -------
+        QuantLib.YieldTermStructure
+            The frozen curve interpolating the nodes.
+        """
+        yield_curve = to_ql_interpolated_curve(node_dates=[ql.Date(int(serial)) for serial in node_serials],
+                                               node_rates=[float(rate) for rate in node_rates],
+                                               day_counter=self.day_counter,
+                                               calendar=self.calendar,
+                                               interpolation_type=self.frozen_curve_interpolation_type)
+        if self.enable_extrapolation:
+            yield_curve.enableExtrapolation()
+        return yield_curve
+
+    @serialize_evaluation_date(restore=False)
+    def update_curves(self, dates, processes=None):
         """ Update ``self.yield_curves`` with the yield curves of each date in `dates`.
 
         Parameters
         ----------
         dates: QuantLib.Date or list of QuantLib.Date
             The curve dates to be interpolated
+        processes: int, optional
+            If greater than one, bootstrap the curves in up to this number of worker processes. Each worker returns
+            the nodes of the frozen curves, which are rebuilt here. Only used when ``self.freeze_curves`` is True.
+            Default: bootstrap in this process.
 
         """
-        dates = to_list(dates)
+        dates = [to_ql_date(date) for date in to_list(dates)]
+        # Quotes may have been appended since the last call, which moves the active intervals of the instruments.
+        self._refresh_helper_index()
+        if self.incremental:
+            # Consecutive dates are the most likely to share their helpers.
+            dates = sorted(dates)
+        if processes is not None and processes > 1 and self.freeze_curves and self._parallel_bootstrap and \
+                len(dates) > 1:
+            def bootstrap_chunk(positions):
+                return [self._bootstrap_nodes(dates[i]) for i in positions], self.bootstrap_stats
+
+            stats = dict(self.bootstrap_stats)
+            chunks = split_positions(len(dates), processes)
+            for positions, (nodes, chunk_stats) in zip(chunks, fork_map(bootstrap_chunk, chunks, processes=processes)):
+                for i, (node_serials, node_rates, key) in zip(positions, nodes):
+                    self.yield_curves[dates[i]] = self._curve_from_nodes(node_serials, node_rates)
+                    if key is not None:
+                        # The nodes stored by the workers are lost with them.
+                        self.node_cache.put(dates[i], key, node_serials, node_rates)
+                for key in stats:
+                    self.bootstrap_stats[key] += chunk_stats[key] - stats[key]
+            if self.node_cache is not None:
+                self.node_cache.flush()
+            return
 
         for date in dates:
-            date = to_ql_date(date)
-            ql.Settings.instance().evaluationDate = date
-            helpers_dict = self._get_helpers(date)
-            # Instantiate the curve
-            helpers = [ndhelper.helper for ndhelper in helpers_dict.values()]
-            # Bootstrapping the nodes
-            yield_curve = to_ql_piecewise_curve(helpers=helpers,
-                                                calendar=self.calendar,
-                                                day_counter=self.day_counter,
-                                                curve_type=self.curve_type,
-                                                constraint_at_zero=self.constraint_at_zero)
             # Here you can choose if you want to use the curve linked to the helpers or a frozen curve.
             # Freezing the curve is needed when you are changing exclusively the global evaluation date,
             # QuantLib helpers don't understand that only the evaluation date is changing and end up using
@@ -641,22 +1196,53 @@ class YieldCurveTimeSeries(SimpleYieldCurve):
             # Not freezing the curves is useful when you are changing the underlying prices of the helpers, this way
             # the curve will update accordingly to the changes in the helpers.
             if self.freeze_curves:
-                node_dates = yield_curve.dates()
-                node_rates = [yield_curve.zeroRate(node_date, self.day_counter, ql.Continuous, ql.NoFrequency).rate()
-                              for node_date in node_dates]
-                yield_curve = to_ql_interpolated_curve(node_dates=node_dates,
-                                                       node_rates=node_rates,
-                                                       day_counter=self.day_counter,
-                                                       calendar=self.calendar,
-                                                       interpolation_type=self.frozen_curve_interpolation_type)
-            if self.enable_extrapolation:
-                yield_curve.enableExtrapolation()
+                node_serials, node_rates, _ = self._bootstrap_nodes(date)
+                yield_curve = self._curve_from_nodes(node_serials, node_rates)
+            else:
+                yield_curve = self._bootstrap(date)
+                if self.enable_extrapolation:
+                    yield_curve.enableExtrapolation()
             self.yield_curves[date] = yield_curve
+        if self.node_cache is not None:
+            # Curves built one at a time, on request, are written in batches.
+            self.node_cache.flush(min_pending=1 if len(dates) > 1 else self.node_cache.flush_size)
 
-    def _update_all_curves(self):
+    def _update_all_curves(self, processes=None):
         index = self.ts_collection[0].ts_values.index.tolist()
         for i in range(1, len(self.ts_collection)):
             index += self.ts_collection[i].ts_values.index.tolist()
         counted_dates = Counter(index)
         possible_dates = [date for date, count in counted_dates.items() if count >= 2]
-        self.update_curves(possible_dates)
+        self.update_curves(possible_dates, processes=processes)
+
+    def curve_surface(self, dates, tenors, measure='zero_rate', compounding=ql.Continuous, frequency=ql.Annual,
+                      day_counter=None, processes=None):
+        """ Date x tenor matrix of values of the yield curves, e.g. for risk reports over a fixed tenor grid.
+
+        Parameters
+        ----------
+        dates: list of date-like
+            The dates of the yield curves. The missing curves are bootstrapped in bulk.
+        tenors: list of str
+            Strings representing QuantLib tenors, advanced from each date with the calendar of the curves.
+        measure: str, optional
+            'zero_rate', 'discount' or 'forward', see :py:class:`CurveSurface`. Default: 'zero_rate'.
+        compounding: QuantLib.Compounding, optional
+            Compounding convention of the rates. Default: QuantLib.Continuous.
+        frequency: QuantLib.Frequency, optional
+            Frequency convention of the rates. Default: QuantLib.Annual.
+        day_counter: QuantLib.DayCounter, optional
+            Day counter of the rates. Default: the day counter of the curves.
+        processes: int, optional
+            Number of worker processes to bootstrap the missing curves, see :py:meth:`update_curves`.
+
+        Returns
+        -------
+        :py:class:`CurveSurface`
+            The surface at `dates`. New dates are added with :py:meth:`CurveSurface.append`, and
+            :py:meth:`CurveSurface.to_frame` returns it as a pandas.DataFrame.
+        """
+        surface = CurveSurface(self, tenors, measure=measure, compounding=compounding, frequency=frequency,
+                               day_counter=day_counter, processes=processes)
+        surface.append(dates)
+        return surface
@@ -3,3 +3,4 @@ from tsfin.instruments.bonds.fixedratebond import FixedRateBond
 from tsfin.instruments.bonds.callablefixedratebond import CallableFixedRateBond
 from tsfin.instruments.bonds.floatingratebond import FloatingRateBond
 from tsfin.instruments.bonds.contingentconvertiblebond import ContingentConvertibleBond
+from tsfin.instruments.bonds.cashflowstore import CashFlowStore
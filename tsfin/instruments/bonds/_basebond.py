@@ -16,17 +16,20 @@
 # along with Time Series Finance (tsfin). If not, see <https://www.gnu.org/licenses/>.
 from functools import wraps
 from collections import OrderedDict
-from operator import itemgetter
 from datetime import timedelta
 import numpy as np
 import pandas as pd
 import QuantLib as ql
 from tsfin.base import Instrument, to_ql_date, to_ql_frequency, to_ql_business_convention, to_ql_calendar, \
-    to_ql_compounding, to_ql_date_generation, to_ql_day_counter, conditional_vectorize, find_le, to_datetime
+    to_ql_compounding, to_ql_date_generation, to_ql_day_counter, conditional_vectorize, array_vectorize, find_le, \
+    to_datetime, to_ql_date_serial, to_object_array, compound_factor, implied_rate, year_fractions, \
+    LRUCache, serialize_evaluation_date, switch_evaluation_date
 from tsfin.constants import BOND_TYPE, QUOTE_TYPE, CURRENCY, YIELD_QUOTE_COMPOUNDING, \
     YIELD_QUOTE_FREQUENCY, ISSUE_DATE, FIRST_ACCRUAL_DATE, MATURITY_DATE, CALENDAR, \
     BUSINESS_CONVENTION, DATE_GENERATION, SETTLEMENT_DAYS, FACE_AMOUNT, COUPONS, DAY_COUNTER, REDEMPTION, DISCOUNT, \
     YIELD, CLEAN_PRICE, DIRTY_PRICE, COUPON_FREQUENCY, EXPIRE_DATE_OVRD, YIELD_CURVE
+from tsfin.instruments.bonds._bondkernels import BondCashFlows, BondDateTable, YieldSolverResult, \
+    YieldToWorstResult, RiskMeasures, risk_measures, solve_yields, solve_zspreads
 
 
 def default_arguments(f):
@@ -237,6 +240,13 @@ class _BaseBond(Instrument):
     ----
     See the :py:mod:`constants` for required attributes in `timeseries` and their possible values.
     """
+    # Whether the cash flow amounts of the bond never change, so that they can be extracted only once.
+    _fixed_cash_flows = True
+    # Maximum number of call components created by _create_call_component kept for reuse.
+    call_component_cache_size = 256
+    # Maximum number of bonds whose cash flows are kept by cash_flow_schedule.
+    cash_flow_schedule_cache_size = 512
+
     def __init__(self, timeseries, *args, **kwargs):
         super().__init__(timeseries=timeseries)
         # If quotes are in discount format, just convert them to clean prices.
@@ -284,6 +294,11 @@ class _BaseBond(Instrument):
         self._zero_coupon_rate_helper = OrderedDict()
         self.bond = None  # Assigned later by the child bond class.
         self._bond_components_backup = None
+        # {id(QuantLib.Bond): (QuantLib.Bond, BondCashFlows)}, filled by cash_flow_schedule.
+        self._cash_flow_schedules = LRUCache(maxsize=self.cash_flow_schedule_cache_size)
+        # {(maturity serial, redemption): QuantLib.Bond}, filled by _create_call_component.
+        self._call_components = LRUCache(maxsize=self.call_component_cache_size)
+        self._date_table = None  # Built on first use by date_table.
 
         '''
         ######################################################################
@@ -310,18 +325,35 @@ class _BaseBond(Instrument):
         Returns
         -------
         QuantLib.Bond
-            The new bond.
+            The new bond. Bonds are reused for repeated maturities and redemptions (see
+            :py:meth:`call_component_cache_stats`).
         """
         to_date = to_ql_date(to_date)
         if to_date in self.bond_components and redemption is None:
             return self.bond_components[to_date]
         elif redemption is None:
             redemption = self.implied_redemption(redemption_date=to_date)
-        return create_call_component(to_date, redemption, self.schedule, self.calendar,
-                                     self.business_convention, self.coupon_frequency,
-                                     self.date_generation, self.month_end,
-                                     self.settlement_days, self.face_amount, self.coupons,
-                                     self.day_counter, self.issue_date)
+        key = (to_date.serialNumber(), float(redemption))
+        try:
+            return self._call_components[key]
+        except KeyError:
+            bond = create_call_component(to_date, redemption, self.schedule, self.calendar,
+                                         self.business_convention, self.coupon_frequency,
+                                         self.date_generation, self.month_end,
+                                         self.settlement_days, self.face_amount, self.coupons,
+                                         self.day_counter, self.issue_date)
+            self._call_components[key] = bond
+            return bond
+
+    def call_component_cache_stats(self):
+        """
+        Returns
+        -------
+        dict
+            The hits, misses, evictions, current size and maximum size of the cache of call components created by
+            :py:meth:`_create_call_component`.
+        """
+        return self._call_components.stats()
 
     def _insert_bond_component(self, date, bond_component):
         """Insert a bond component in the bond_components dictionary.
@@ -411,6 +443,198 @@ class _BaseBond(Instrument):
         """
         return self.maturity_date
 
+    def date_table(self):
+        """Lookup table of settlement dates, accrued interest and next cash flow, built on first use.
+
+        The table has one row per calendar day, from the issue date to the maturity (or expire) date, for trades
+        settled with the bond's calendar, settlement days and business convention. The accrued interest column is
+        only filled if the bond cash flows are fixed (see :py:meth:`cash_flow_schedule`).
+
+        Returns
+        -------
+        :py:class:`BondDateTable`
+            The bond's date table.
+        """
+        if self._date_table is not None:
+            return self._date_table
+        first_serial = self.issue_date.serialNumber()
+        last_serial = max(self.expire_date, self.maturity_date).serialNumber()
+        serials = np.arange(first_serial, last_serial + 1, dtype=np.int32)
+        period = ql.Period(self.settlement_days, ql.Days)
+        settlement_serials = np.empty(len(serials), dtype=np.int32)
+        for i, serial in enumerate(serials.tolist()):
+            settlement_serials[i] = self.calendar.advance(ql.Date(serial), period,
+                                                          self.business_convention).serialNumber()
+        accrued = np.full(len(serials), np.nan, dtype=np.float64)
+        if self._fixed_cash_flows:
+            for i in np.flatnonzero(serials < self.maturity_date.serialNumber()):
+                accrued[i] = self.bond.accruedAmount(ql.Date(int(serials[i])))
+        # Only the payment dates are needed here, so the cash flow amounts (which may need a forecast curve) are not
+        # evaluated.
+        payment_serials = np.sort(np.array([cash_flow.date().serialNumber() for cash_flow in self.bond.cashflows()],
+                                           dtype=np.int32))
+        next_cash_flow = np.searchsorted(payment_serials, serials, side='right').astype(np.int32)
+        self._date_table = BondDateTable(first_serial, settlement_serials, accrued, next_cash_flow)
+        return self._date_table
+
+    def _date_table_positions(self, serials, calendar=None, settlement_days=None, business_convention=None):
+        """
+        Parameters
+        ----------
+        serials: numpy.ndarray of int
+            Date serial numbers.
+        calendar: QuantLib.Calendar, optional
+            The calendar used for calculation.
+        settlement_days: int, optional
+            Number of days for trade settlement.
+        business_convention: QuantLib.BusinessDayConvention, optional
+            The business day convention used for calculation.
+
+        Returns
+        -------
+        numpy.ndarray of int or None
+            The rows of `serials` in :py:meth:`date_table`, or None if the table cannot be used, i.e. if the bond
+            cash flows are not fixed, if the passed conventions are not the bond's or if any of the dates is outside
+            the table.
+        """
+        if not self._fixed_cash_flows:
+            return None
+        if calendar is not None and calendar != self.calendar:
+            return None
+        if settlement_days is not None and int(settlement_days) != self.settlement_days:
+            return None
+        if business_convention is not None and business_convention != self.business_convention:
+            return None
+        return self.date_table().positions(serials)
+
+    def _trade_and_settlement_dates(self, date, calendar, settlement_days, business_convention):
+        """Shared setup of the array-vectorized methods.
+
+        Parameters
+        ----------
+        date: array-like of date-like
+            The trade dates.
+        calendar: QuantLib.Calendar
+            The calendar used for calculation.
+        settlement_days: int
+            Number of days for trade settlement.
+        business_convention: QuantLib.BusinessDayConvention
+            The business day convention used for calculation.
+
+        Returns
+        -------
+        tuple (list of QuantLib.Date, list of QuantLib.Date, numpy.ndarray of int32)
+            The trade dates, their settlement dates and the serial numbers of the settlement dates. Each distinct
+            trade date is advanced only once.
+        """
+        trade_serials = to_ql_date_serial(date)
+        positions = self._date_table_positions(trade_serials, calendar=calendar, settlement_days=settlement_days,
+                                               business_convention=business_convention)
+        if positions is not None:
+            settlement_serials = self.date_table().settlement_serials[positions]
+            ql_dates = dict()
+            trade_dates = [ql_dates.setdefault(serial, ql.Date(serial)) for serial in trade_serials.tolist()]
+            settlement_dates = [ql_dates.setdefault(serial, ql.Date(serial)) for serial in settlement_serials.tolist()]
+            return trade_dates, settlement_dates, settlement_serials
+        period = ql.Period(int(settlement_days), ql.Days)
+        advanced = dict()
+        trade_dates = list()
+        settlement_dates = list()
+        settlement_serials = np.empty(len(trade_serials), dtype=np.int32)
+        for i, serial in enumerate(trade_serials.tolist()):
+            trade_date = ql.Date(serial)
+            try:
+                settlement_date = advanced[serial]
+            except KeyError:
+                settlement_date = calendar.advance(trade_date, period, business_convention)
+                advanced[serial] = settlement_date
+            trade_dates.append(trade_date)
+            settlement_dates.append(settlement_date)
+            settlement_serials[i] = settlement_date.serialNumber()
+        return trade_dates, settlement_dates, settlement_serials
+
+    def _expiry_serial(self):
+        """
+        Returns
+        -------
+        int
+            Serial number of the first date for which :py:meth:`is_expired` is True.
+        """
+        return min(self.expire_date, self.maturity_date).serialNumber()
+
+    def _accrued_amount(self, settlement_date, **kwargs):
+        """
+        Parameters
+        ----------
+        settlement_date: QuantLib.Date
+            The settlement date.
+
+        Returns
+        -------
+        scalar
+            The accrued interest of the bond, as in :py:meth:`accrued_interest`, for a single date and without the
+            overhead of the default arguments and vectorization.
+        """
+        if settlement_date >= self.maturity_date:
+            return np.nan
+        if self._fixed_cash_flows:
+            serial = settlement_date.serialNumber()
+            table = self.date_table()
+            if table.first_serial <= serial <= table.last_serial:
+                return table.accrued[serial - table.first_serial]
+        return self.bond.accruedAmount(settlement_date)
+
+    def _accrued_amounts(self, settlement_dates, settlement_serials, **kwargs):
+        """
+        Parameters
+        ----------
+        settlement_dates: list of QuantLib.Date
+            The settlement dates.
+        settlement_serials: numpy.ndarray of int
+            The serial numbers of `settlement_dates`.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The accrued interest of the bond at each settlement date, as in :py:meth:`_accrued_amount`.
+        """
+        if self._fixed_cash_flows:
+            positions = self._date_table_positions(settlement_serials)
+            if positions is not None:
+                return self.date_table().accrued[positions]
+        accrued = dict()
+        result = np.empty(len(settlement_dates), dtype=np.float64)
+        for i, serial in enumerate(settlement_serials.tolist()):
+            if serial not in accrued:
+                accrued[serial] = self._accrued_amount(settlement_dates[i], **kwargs)
+            result[i] = accrued[serial]
+        return result
+
+    def cash_flow_schedule(self, bond=None):
+        """
+        Parameters
+        ----------
+        bond: QuantLib.Bond, optional
+            The bond whose cash flows are extracted.
+            Default: self.bond.
+
+        Returns
+        -------
+        :py:class:`BondCashFlows`
+            The cash flows of `bond` as arrays. Extracted once per bond if `_fixed_cash_flows` is True.
+        """
+        if bond is None:
+            bond = self.bond
+        if not self._fixed_cash_flows:
+            return BondCashFlows(bond)
+        try:
+            return self._cash_flow_schedules[id(bond)][1]
+        except KeyError:
+            cash_flows = BondCashFlows(bond)
+            # The bond is kept so its id is not reused while the entry exists.
+            self._cash_flow_schedules[id(bond)] = (bond, cash_flows)
+            return cash_flows
+
     @default_arguments
     @conditional_vectorize('date')
     def settlement_date(self, date, calendar, settlement_days, business_convention, *args, **kwargs):
@@ -551,7 +775,7 @@ class _BaseBond(Instrument):
             raise ValueError("Bond class rate_helper method does not support curve_type = {}".format(curve_type))
 
     @default_arguments
-    @conditional_vectorize('date')
+    @array_vectorize('date')
     def accrued_interest(self, last, date, **kwargs):
         """
         Parameters
@@ -568,10 +792,15 @@ class _BaseBond(Instrument):
         scalar
             The accrued interest of the bond.
         """
-        date = to_ql_date(date)
-        if date >= self.maturity_date:
-            return np.nan
-        return self.bond.accruedAmount(date)
+        serials = to_ql_date_serial(date)
+        if self._fixed_cash_flows:
+            positions = self._date_table_positions(serials)
+            if positions is not None:
+                return self.date_table().accrued[positions]
+        result = np.full(len(serials), np.nan, dtype=np.float64)
+        for i in np.flatnonzero(serials < self.maturity_date.serialNumber()):
+            result[i] = self.bond.accruedAmount(ql.Date(int(serials[i])))
+        return result
 
     @default_arguments
     @conditional_vectorize('date')
@@ -592,10 +821,9 @@ class _BaseBond(Instrument):
 
 
         """
-        start_date = to_ql_date(start_date)
-        date = to_ql_date(date)
-        return list((cf.date(), cf.date(), cf.amount() / self.face_amount) for cf in self.bond.cashflows()
-                    if start_date <= cf.date() <= date)
+        payment_dates, amounts = self._cash_flows_to_date(start_date, date)
+        return list((payment_date, payment_date, amount / self.face_amount)
+                    for payment_date, amount in zip(payment_dates, amounts.tolist()))
 
     @default_arguments
     @conditional_vectorize('date')
@@ -619,12 +847,56 @@ class _BaseBond(Instrument):
 
 
         """
+        return self._cash_flows_to_date(start_date, date)[1].sum() / self.face_amount
+
+    def _cash_flows_to_date(self, start_date, date):
+        """
+        Parameters
+        ----------
+        start_date: QuantLib.Date
+            The start date (inclusive).
+        date: QuantLib.Date
+            The end date (inclusive).
+
+        Returns
+        -------
+        tuple (list of QuantLib.Date, numpy.ndarray of float64)
+            The payment dates and amounts of the cash flows paid between `start_date` and `date`. If the bond cash
+            flows are not fixed, only the amounts of these cash flows are evaluated, so that later coupons do not need
+            a forecast curve.
+        """
+        if self._fixed_cash_flows:
+            cash_flows = self.cash_flow_schedule()
+            start, end = self._cash_flow_range(cash_flows, start_date, date)
+            return [cash_flows.cash_flows[i].date() for i in range(start, end)], cash_flows.amounts[start:end]
         start_date = to_ql_date(start_date)
         date = to_ql_date(date)
-        return sum(cf.amount() for cf in self.bond.cashflows() if start_date <= cf.date() <= date) / self.face_amount
+        cash_flows = [cf for cf in self.bond.cashflows() if start_date <= cf.date() <= date]
+        return [cf.date() for cf in cash_flows], np.array([cf.amount() for cf in cash_flows], dtype=np.float64)
+
+    @staticmethod
+    def _cash_flow_range(cash_flows, start_date, date):
+        """
+        Parameters
+        ----------
+        cash_flows: :py:class:`BondCashFlows`
+            The bond cash flows.
+        start_date: QuantLib.Date
+            The start date (inclusive).
+        date: QuantLib.Date
+            The end date (inclusive).
+
+        Returns
+        -------
+        tuple (int, int)
+            The positions of the first cash flow paid from `start_date` on and of the first one paid after `date`.
+        """
+        start = np.searchsorted(cash_flows.dates, to_ql_date(start_date).serialNumber(), side='left')
+        end = np.searchsorted(cash_flows.dates, to_ql_date(date).serialNumber(), side='right')
+        return int(start), int(end)
 
     @default_arguments
-    @conditional_vectorize('quote', 'date')
+    @array_vectorize('quote', 'date')
     def clean_price(self, last, quote, date, day_counter, calendar, business_convention, compounding, frequency,
                     settlement_days, quote_type=None, yield_curve=None, **kwargs):
         """
@@ -672,27 +944,31 @@ class _BaseBond(Instrument):
         if quote_type is None:
             quote_type = self.quote_type
 
+        quote = quote.astype(np.float64)
         if quote_type == CLEAN_PRICE:
             return quote
-        date = to_ql_date(date)
-        settlement_date = self.settlement_date(date=date, calendar=calendar, settlement_days=settlement_days,
-                                               business_convention=business_convention)
-        if self.is_expired(settlement_date):
-            return np.nan
-        elif quote_type == DIRTY_PRICE:
-            return quote - self.accrued_interest(last=last, date=settlement_date, **kwargs)
+        dates, settlement_dates, settlement_serials = self._trade_and_settlement_dates(
+            date=date, calendar=calendar, settlement_days=settlement_days, business_convention=business_convention)
+        result = np.full(len(dates), np.nan, dtype=np.float64)
+        not_expired = np.flatnonzero(settlement_serials < self._expiry_serial())
+        if quote_type == DIRTY_PRICE:
+            result[not_expired] = quote[not_expired] - self._accrued_amounts(
+                [settlement_dates[i] for i in not_expired], settlement_serials[not_expired], last=last, **kwargs)
         elif quote_type == DISCOUNT:
-            return self.face_amount - quote * 100 * day_counter.yearFraction(settlement_date, self.maturity_date)
+            for i in not_expired:
+                year_fraction = day_counter.yearFraction(settlement_dates[i], self.maturity_date)
+                result[i] = self.face_amount - quote[i] * 100 * year_fraction
         elif quote_type == YIELD:
-            return self.bond.cleanPrice(quote, day_counter, compounding, frequency, settlement_date)
+            for i in not_expired:
+                result[i] = self.bond.cleanPrice(quote[i], day_counter, compounding, frequency, settlement_dates[i])
         elif quote_type == YIELD_CURVE:
-            yield_curve = yield_curve.yield_curve(date=date)
-            if self.is_expired(settlement_date):
-                return np.nan
-            return ql.BondFunctions.cleanPrice(self.bond, yield_curve, settlement_date)
+            for i in not_expired:
+                curve = yield_curve.yield_curve(date=dates[i])
+                result[i] = ql.BondFunctions.cleanPrice(self.bond, curve, settlement_dates[i])
+        return result
 
     @default_arguments
-    @conditional_vectorize('quote', 'date')
+    @array_vectorize('quote', 'date')
     def dirty_price(self, last, quote, date, day_counter, calendar, business_convention, compounding, frequency,
                     settlement_days, quote_type=None, yield_curve=None, **kwargs):
         """
@@ -740,24 +1016,29 @@ class _BaseBond(Instrument):
         if quote_type is None:
             quote_type = self.quote_type
 
-        date = to_ql_date(date)
-        settlement_date = self.settlement_date(date=date, calendar=calendar, settlement_days=settlement_days,
-                                               business_convention=business_convention)
-        if self.is_expired(settlement_date):
-            return np.nan
-
+        quote = quote.astype(np.float64)
+        dates, settlement_dates, settlement_serials = self._trade_and_settlement_dates(
+            date=date, calendar=calendar, settlement_days=settlement_days, business_convention=business_convention)
+        result = np.full(len(dates), np.nan, dtype=np.float64)
+        not_expired = np.flatnonzero(settlement_serials < self._expiry_serial())
         if quote_type == CLEAN_PRICE:
-            return quote + self.accrued_interest(last=last, date=settlement_date, **kwargs)
+            result[not_expired] = quote[not_expired] + self._accrued_amounts(
+                [settlement_dates[i] for i in not_expired], settlement_serials[not_expired], last=last, **kwargs)
         elif quote_type == DIRTY_PRICE:
-            return quote
+            result[not_expired] = quote[not_expired]
         elif quote_type == DISCOUNT:
-            return self.face_amount - quote * 100 * day_counter.yearFraction(settlement_date, self.maturity_date)
+            for i in not_expired:
+                year_fraction = day_counter.yearFraction(settlement_dates[i], self.maturity_date)
+                result[i] = self.face_amount - quote[i] * 100 * year_fraction
         elif quote_type == YIELD:
-            return self.bond.dirtyPrice(quote, day_counter, compounding, frequency, settlement_date)
+            for i in not_expired:
+                result[i] = self.bond.dirtyPrice(quote[i], day_counter, compounding, frequency, settlement_dates[i])
         elif quote_type == YIELD_CURVE:
-            yield_curve = yield_curve.yield_curve(date=date)
-            clean_price = ql.BondFunctions.cleanPrice(self.bond, yield_curve, settlement_date)
-            return clean_price + self.accrued_interest(last=last, date=settlement_date, **kwargs)
+            for i in not_expired:
+                curve = yield_curve.yield_curve(date=dates[i])
+                clean_price = ql.BondFunctions.cleanPrice(self.bond, curve, settlement_dates[i])
+                result[i] = clean_price + self._accrued_amount(settlement_dates[i], last=last, **kwargs)
+        return result
 
     @default_arguments
     @conditional_vectorize('quote', 'date')
@@ -919,8 +1200,9 @@ class _BaseBond(Instrument):
         paid_interest = self.cash_to_date(start_date=start_date, date=date)
         return (value + paid_interest) / start_value - 1
 
+    @serialize_evaluation_date
     @default_arguments
-    @conditional_vectorize('quote', 'date')
+    @array_vectorize('quote', 'date')
     def ytm(self, last, quote, date, day_counter, calendar, business_convention, compounding, frequency,
             settlement_days, quote_type=None, **kwargs):
         """
@@ -963,34 +1245,358 @@ class _BaseBond(Instrument):
             The bond's yield to maturity.
         """
         bond = kwargs.get('bond', self.bond)  # Useful to pass bonds other than self as arguments.
-        date = to_ql_date(date)
-        settlement_date = self.settlement_date(date=date, calendar=calendar, settlement_days=settlement_days,
-                                               business_convention=business_convention)
-        if self.is_expired(settlement_date):
-            # input("Returning nan because its expired date: {0}, settlement {1}".format(date, settlement_date))
-            return np.nan
-        ql.Settings.instance().evaluationDate = date
         if quote_type is None:
             quote_type = self.quote_type
-        if quote_type == CLEAN_PRICE:
-            for exponent in range(4):
-                accuracy = 1.0e-8*(10**exponent)
-                try:
-                    return bond.bondYield(quote, day_counter, compounding, frequency, settlement_date, accuracy)
-                except RuntimeError:
-                    pass
-        elif quote_type == DIRTY_PRICE:
-            clean_quote = quote - self.accrued_interest(last=last, date=settlement_date, **kwargs)
-            for exponent in range(4):
-                accuracy = 1.0e-8*(10**exponent)
-                try:
-                    return bond.bondYield(clean_quote, day_counter, compounding, frequency, settlement_date, accuracy)
-                except RuntimeError:
-                    pass
+        quote = quote.astype(np.float64)
+        dates, settlement_dates, settlement_serials = self._trade_and_settlement_dates(
+            date=date, calendar=calendar, settlement_days=settlement_days, business_convention=business_convention)
+        result = np.full(len(dates), np.nan, dtype=np.float64)
+        # Expired dates are left as nan.
+        not_expired = np.flatnonzero(settlement_serials < self._expiry_serial())
+        if quote_type in (CLEAN_PRICE, DIRTY_PRICE):
+            for i in not_expired:
+                switch_evaluation_date(dates[i])
+                clean_quote = quote[i]
+                if quote_type == DIRTY_PRICE:
+                    clean_quote -= self._accrued_amount(settlement_dates[i], last=last, **kwargs)
+                for exponent in range(4):
+                    accuracy = 1.0e-8*(10**exponent)
+                    try:
+                        result[i] = bond.bondYield(clean_quote, day_counter, compounding, frequency,
+                                                   settlement_dates[i], accuracy)
+                        break
+                    except RuntimeError:
+                        pass
         elif quote_type == YIELD:
-            interest_rate = ql.InterestRate(quote, self.day_counter, self.yield_quote_compounding,
-                                            self.yield_quote_frequency)
-            return interest_rate.equivalentRate(compounding, frequency, 1)
+            for i in not_expired:
+                interest_rate = ql.InterestRate(quote[i], self.day_counter, self.yield_quote_compounding,
+                                                self.yield_quote_frequency)
+                result[i] = interest_rate.equivalentRate(compounding, frequency, 1).rate()
+        return result
+
+    @default_arguments
+    def solve_ytm(self, last, quote, date, day_counter, calendar, business_convention, compounding, frequency,
+                  settlement_days, quote_type=None, accuracy=1.0e-10, max_iterations=100, **kwargs):
+        """Yield to maturity for all dates at once, solved over a matrix of the bond cash flows.
+
+        Parameters
+        ----------
+        last: bool, optional
+            Whether to use last data.
+            Default: see :py:func:`default_arguments`.
+        quote: scalar or array-like of scalar, optional
+            The bond's quote.
+            Default: see :py:func:`default_arguments`.
+        date: QuantLib.Date or array-like of date-like, optional
+            The date of the calculation.
+            Default: see :py:func:`default_arguments`.
+        day_counter: QuantLib.DayCounter, optional
+            The day counter for the calculation.
+            Default: see :py:func:`default_arguments`.
+        calendar: QuantLib.Calendar, optional
+            The calendar used for calculation.
+            Default: see :py:func:`default_arguments`.
+        business_convention: QuantLib.BusinessDayConvention
+            The business day convention used for calculation.
+            Default: see :py:func:`default_arguments`.
+        compounding: QuantLib.Compounding, optional
+            The compounding convention for the calculation.
+            Default: see :py:func:`default_arguments`.
+        frequency: QuantLib.Frequency, optional
+            The compounding frequency.
+            Default: see :py:func:`default_arguments`.
+        settlement_days: int, optional
+            Number of days for trade settlement.
+            Default: see :py:func:`default_arguments`.
+        quote_type: str, optional
+            The quote type for calculation ex: CLEAN_PRICE, DIRTY_PRICE, YIELD
+            Default: None
+        accuracy: scalar, optional
+            Convergence tolerance of the yields.
+            Default: 1.0e-10.
+        max_iterations: int, optional
+            Maximum number of solver iterations.
+            Default: 100.
+
+        Returns
+        -------
+        :py:class:`YieldSolverResult`
+            Arrays with the yields to maturity (nan for expired dates and for dates where the solver did not
+            converge), a mask of the converged dates and the number of solver iterations of each date.
+        """
+        quote, date = np.broadcast_arrays(to_object_array(quote), to_object_array(date))
+        return self._solve_ytm(quote=quote.astype(np.float64), date=date, day_counter=day_counter, calendar=calendar,
+                               business_convention=business_convention, compounding=compounding,
+                               frequency=frequency, settlement_days=settlement_days, quote_type=quote_type,
+                               accuracy=accuracy, max_iterations=max_iterations, last=last, **kwargs)
+
+    def _npv_targets(self, quote, quote_type, settlement_dates, settlement_serials, bond, **kwargs):
+        """
+        Parameters
+        ----------
+        quote: numpy.ndarray of float64
+            CLEAN_PRICE or DIRTY_PRICE quotes.
+        quote_type: str
+            The quote type of `quote`.
+        settlement_dates: list of QuantLib.Date
+            The settlement dates.
+        settlement_serials: numpy.ndarray of int
+            The serial numbers of `settlement_dates`.
+        bond: QuantLib.Bond
+            The bond whose notional is used.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The dirty prices in currency units, i.e. the present values the bond cash flows must match.
+        """
+        targets = quote.copy()
+        if quote_type == CLEAN_PRICE:
+            targets += self._accrued_amounts(settlement_dates, settlement_serials, **kwargs)
+        notional = dict()
+        for j, serial in enumerate(settlement_serials.tolist()):
+            if serial not in notional:
+                notional[serial] = bond.notional(settlement_dates[j])
+            targets[j] *= notional[serial] / 100
+        return targets
+
+    def _solve_ytm(self, quote, date, day_counter, calendar, business_convention, compounding, frequency,
+                   settlement_days, quote_type, accuracy, max_iterations, **kwargs):
+        """Implementation of :py:meth:`solve_ytm`, for aligned float64 quotes and dates."""
+        bond = kwargs.get('bond', self.bond)  # Useful to pass bonds other than self as arguments.
+        if quote_type is None:
+            quote_type = self.quote_type
+        dates, settlement_dates, settlement_serials = self._trade_and_settlement_dates(
+            date=date, calendar=calendar, settlement_days=settlement_days, business_convention=business_convention)
+        size = len(dates)
+        yields = np.full(size, np.nan, dtype=np.float64)
+        converged = np.zeros(size, dtype=bool)
+        iterations = np.zeros(size, dtype=np.int32)
+        # Expired dates are left as nan.
+        not_expired = np.flatnonzero(settlement_serials < self._expiry_serial())
+        if quote_type == YIELD:
+            compound = compound_factor(quote[not_expired], 1.0, self.yield_quote_compounding,
+                                       self.yield_quote_frequency)
+            yields[not_expired] = implied_rate(compound, 1.0, compounding, frequency)
+            converged[not_expired] = True
+            return YieldSolverResult(yields, converged, iterations)
+        if quote_type not in (CLEAN_PRICE, DIRTY_PRICE) or len(not_expired) == 0:
+            return YieldSolverResult(yields, converged, iterations)
+        alive_settlement_dates = [settlement_dates[i] for i in not_expired]
+        alive_serials = settlement_serials[not_expired]
+        targets = self._npv_targets(quote[not_expired], quote_type, alive_settlement_dates, alive_serials, bond,
+                                    **kwargs)
+        cash_flows = self.cash_flow_schedule(bond=bond)
+        first = None
+        if bond is self.bond and self._fixed_cash_flows:
+            positions = self._date_table_positions(alive_serials)
+            if positions is not None:
+                first = self.date_table().next_cash_flow[positions]
+        first, amounts, steps = cash_flows.discount_matrices(alive_settlement_dates, day_counter, first=first)
+        result = solve_yields(amounts, steps, targets, compounding, frequency, accuracy=accuracy,
+                              max_iterations=max_iterations)
+        yields[not_expired] = result.yields
+        converged[not_expired] = result.converged
+        iterations[not_expired] = result.iterations
+        return YieldSolverResult(yields, converged, iterations)
+
+    @default_arguments
+    def solve_ytw(self, last, quote, date, day_counter, calendar, business_convention, compounding, frequency,
+                  settlement_days, quote_type=None, accuracy=1.0e-10, max_iterations=100, **kwargs):
+        """Yield to worst and worst date for all dates at once, solving the yields of every bond component together.
+
+        Parameters
+        ----------
+        last: bool, optional
+            Whether to use last data.
+            Default: see :py:func:`default_arguments`.
+        quote: scalar or array-like of scalar, optional
+            The bond's quote.
+            Default: see :py:func:`default_arguments`.
+        date: QuantLib.Date or array-like of date-like, optional
+            The date of the calculation.
+            Default: see :py:func:`default_arguments`.
+        day_counter: QuantLib.DayCounter, optional
+            The day counter for the calculation.
+            Default: see :py:func:`default_arguments`.
+        calendar: QuantLib.Calendar, optional
+            The calendar used for calculation.
+            Default: see :py:func:`default_arguments`.
+        business_convention: QuantLib.BusinessDayConvention
+            The business day convention used for calculation.
+            Default: see :py:func:`default_arguments`.
+        compounding: QuantLib.Compounding, optional
+            The compounding convention for the calculation.
+            Default: see :py:func:`default_arguments`.
+        frequency: QuantLib.Frequency, optional
+            The compounding frequency.
+            Default: see :py:func:`default_arguments`.
+        settlement_days: int, optional
+            Number of days for trade settlement.
+            Default: see :py:func:`default_arguments`.
+        quote_type: str, optional
+            The quote type for calculation ex: CLEAN_PRICE, DIRTY_PRICE, YIELD
+            Default: None
+        accuracy: scalar, optional
+            Convergence tolerance of the yields.
+            Default: 1.0e-10.
+        max_iterations: int, optional
+            Maximum number of solver iterations.
+            Default: 100.
+
+        Returns
+        -------
+        :py:class:`YieldToWorstResult`
+            Arrays with the yields to worst (nan for expired dates), the serial numbers of the worst dates (0 if
+            there is none), the positions of the worst components in `self.bond_components` (-1 if there is none)
+            and a mask of the dates for which the yields of all the components converged.
+        """
+        quote, date = np.broadcast_arrays(to_object_array(quote), to_object_array(date))
+        return self._solve_ytw(quote=quote.astype(np.float64), date=date, day_counter=day_counter, calendar=calendar,
+                               business_convention=business_convention, compounding=compounding,
+                               frequency=frequency, settlement_days=settlement_days, quote_type=quote_type,
+                               accuracy=accuracy, max_iterations=max_iterations, last=last, **kwargs)
+
+    def _solve_ytw(self, quote, date, day_counter, calendar, business_convention, compounding, frequency,
+                   settlement_days, quote_type, accuracy, max_iterations, **kwargs):
+        """Implementation of :py:meth:`solve_ytw`, for aligned float64 quotes and dates."""
+        if quote_type is None:
+            quote_type = self.quote_type
+        dates, settlement_dates, settlement_serials = self._trade_and_settlement_dates(
+            date=date, calendar=calendar, settlement_days=settlement_days, business_convention=business_convention)
+        size = len(dates)
+        yields = np.full(size, np.nan, dtype=np.float64)
+        worst_dates = np.zeros(size, dtype=np.int32)
+        worst_components = np.full(size, -1, dtype=np.int32)
+        converged = np.zeros(size, dtype=bool)
+        components = list(self.bond_components.items())
+        maturity_serials = np.array([key.serialNumber() for key, bond in components], dtype=np.int32)
+        # (dates x components) mask of the components that mature after each settlement date.
+        not_expired = settlement_serials < self._expiry_serial()
+        alive = not_expired[:, None] & (settlement_serials[:, None] < maturity_serials[None, :])
+        rows, columns = np.nonzero(alive)
+        if len(rows) == 0 or quote_type not in (CLEAN_PRICE, DIRTY_PRICE, YIELD):
+            return YieldToWorstResult(yields, worst_dates, worst_components, converged)
+        if quote_type == YIELD:
+            compound = compound_factor(quote[rows], 1.0, self.yield_quote_compounding, self.yield_quote_frequency)
+            pair_yields = implied_rate(compound, 1.0, compounding, frequency)
+            pair_converged = np.ones(len(rows), dtype=bool)
+        else:
+            alive_rows = np.flatnonzero(alive.any(axis=1))
+            targets = np.full(size, np.nan, dtype=np.float64)
+            targets[alive_rows] = self._npv_targets(quote[alive_rows], quote_type,
+                                                    [settlement_dates[i] for i in alive_rows],
+                                                    settlement_serials[alive_rows], self.bond, **kwargs)
+            # The cash flows of all the components are stacked in one zero-padded (date, component) matrix.
+            schedules = [self.cash_flow_schedule(bond=bond) for key, bond in components]
+            width = max(len(schedule) for schedule in schedules)
+            amounts = np.zeros((len(rows), width), dtype=np.float64)
+            steps = np.zeros((len(rows), width), dtype=np.float64)
+            for column, schedule in enumerate(schedules):
+                pairs = np.flatnonzero(columns == column)
+                if len(pairs) == 0:
+                    continue
+                first, block_amounts, block_steps = schedule.discount_matrices(
+                    [settlement_dates[i] for i in rows[pairs]], day_counter)
+                amounts[pairs, :len(schedule)] = block_amounts
+                steps[pairs, :len(schedule)] = block_steps
+            result = solve_yields(amounts, steps, targets[rows], compounding, frequency, accuracy=accuracy,
+                                  max_iterations=max_iterations)
+            pair_yields = result.yields
+            pair_converged = result.converged
+        # The worst component is the first one with the lowest yield, ignoring the ones that did not converge.
+        matrix = np.full(alive.shape, np.inf, dtype=np.float64)
+        matrix[rows, columns] = np.where(np.isnan(pair_yields), np.inf, pair_yields)
+        worst = np.argmin(matrix, axis=1)
+        solved = np.isfinite(matrix[np.arange(size), worst])
+        yields[solved] = matrix[solved, worst[solved]]
+        worst_components[solved] = worst[solved]
+        worst_dates[solved] = maturity_serials[worst[solved]]
+        all_converged = np.ones(alive.shape, dtype=bool)
+        all_converged[rows, columns] = pair_converged
+        converged[:] = solved & all_converged.all(axis=1)
+        return YieldToWorstResult(yields, worst_dates, worst_components, converged)
+
+    def _risk_measures(self, yields, settlement_dates, day_counter, compounding, frequency, bond=None):
+        """
+        Parameters
+        ----------
+        yields: numpy.ndarray of float64
+            The yields of `bond`.
+        settlement_dates: list of QuantLib.Date
+            The settlement dates, aligned with `yields`.
+        day_counter: QuantLib.DayCounter
+            The day counter of the yields.
+        compounding: QuantLib.Compounding
+            The compounding convention of the yields.
+        frequency: QuantLib.Frequency
+            The compounding frequency of the yields.
+        bond: QuantLib.Bond, optional
+            The bond whose cash flows are used.
+            Default: self.bond.
+
+        Returns
+        -------
+        :py:class:`RiskMeasures`
+            The durations and convexities of `bond`, computed over its extracted cash flows.
+        """
+        first, amounts, steps = self.cash_flow_schedule(bond=bond).discount_matrices(settlement_dates, day_counter)
+        return risk_measures(yields, amounts, steps, compounding, frequency)
+
+    def _select_duration(self, measures, duration_type, compounding):
+        """
+        Parameters
+        ----------
+        measures: :py:class:`RiskMeasures`
+            The risk measures.
+        duration_type: QuantLib.Duration.Type
+            The duration type.
+        compounding: QuantLib.Compounding
+            The compounding convention of the yields.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The durations of type `duration_type`.
+        """
+        if self.yield_quote_compounding == ql.Simple:
+            duration_type = ql.Duration.Simple
+        if duration_type == ql.Duration.Simple:
+            return measures.simple
+        elif duration_type == ql.Duration.Modified:
+            return measures.modified
+        elif duration_type == ql.Duration.Macaulay:
+            if compounding != ql.Compounded:
+                raise ValueError("Unable to compute Macaulay duration with compounding {}".format(compounding))
+            return measures.macaulay
+        raise ValueError("Unable to compute duration of type {}".format(duration_type))
+
+    def _risk_measures_to_worst(self, quote, date, day_counter, calendar, business_convention, compounding,
+                                frequency, settlement_days, **kwargs):
+        """
+        Returns
+        -------
+        tuple (numpy.ndarray, :py:class:`RiskMeasures`)
+            The mask of the dates with a yield to worst and, for those dates, the durations and convexities of the
+            worst components at their yields to worst.
+        """
+        quote_type = kwargs.pop('quote_type', None)
+        ytw = self._solve_ytw(quote=quote.astype(np.float64), date=date, day_counter=day_counter, calendar=calendar,
+                              business_convention=business_convention, compounding=compounding, frequency=frequency,
+                              settlement_days=settlement_days, quote_type=quote_type, accuracy=1.0e-10,
+                              max_iterations=100, **kwargs)
+        dates, settlement_dates, settlement_serials = self._trade_and_settlement_dates(
+            date=date, calendar=calendar, settlement_days=settlement_days, business_convention=business_convention)
+        solved = ytw.components >= 0
+        measures = [np.full(len(dates), np.nan, dtype=np.float64) for field in RiskMeasures._fields]
+        components = list(self.bond_components.values())
+        for component in np.unique(ytw.components[solved]):
+            rows = np.flatnonzero(ytw.components == component)
+            component_measures = self._risk_measures(ytw.yields[rows], [settlement_dates[i] for i in rows],
+                                                     day_counter, compounding, frequency, bond=components[component])
+            for field, values in zip(measures, component_measures):
+                field[rows] = values
+        return solved, RiskMeasures(*measures)
 
     @default_arguments
     @conditional_vectorize('quote', 'date')
@@ -1035,19 +1641,16 @@ class _BaseBond(Instrument):
         tuple (scalar, QuantLib.Date)
             The bond's yield to worst and worst date.
         """
-        date = to_ql_date(date)
-        settlement_date = self.settlement_date(date=date, calendar=calendar, settlement_days=settlement_days,
-                                               business_convention=business_convention)
-        if self.is_expired(settlement_date):
-            # input("Returning nan because its expired date: {0}, settlement {1}".format(date, settlement_date))
+        result = self._solve_ytw(quote=np.array([quote], dtype=np.float64), date=to_object_array(to_ql_date(date)),
+                                 day_counter=day_counter, calendar=calendar, business_convention=business_convention,
+                                 compounding=compounding, frequency=frequency, settlement_days=settlement_days,
+                                 quote_type=quote_type, accuracy=1.0e-10, max_iterations=100, last=last, **kwargs)
+        if result.components[0] < 0:
             return np.nan, np.nan
-        return min(((self.ytm(last=last, quote=quote, date=date, day_counter=day_counter, calendar=calendar,
-                              business_convention=business_convention, compounding=compounding, frequency=frequency,
-                              settlement_days=settlement_days, bond=bond, quote_type=quote_type, **kwargs), key)
-                    for key, bond in self.bond_components.items() if key > settlement_date), key=itemgetter(0))
+        return result.yields[0], list(self.bond_components.keys())[result.components[0]]
 
     @default_arguments
-    @conditional_vectorize('quote', 'date')
+    @array_vectorize('quote', 'date')
     def ytw(self, last, quote, date, day_counter, calendar, business_convention, compounding, frequency,
             settlement_days, quote_type=None, **kwargs):
         """
@@ -1089,16 +1692,10 @@ class _BaseBond(Instrument):
         scalar
             The bond's yield to worst.
         """
-        date = to_ql_date(date)
-        settlement_date = self.calendar.advance(date, ql.Period(settlement_days, ql.Days),
-                                                self.business_convention)
-        if self.is_expired(settlement_date):
-            # input("Returning nan because its expired date: {0}, settlement {1}".format(date, settlement_date))
-            return np.nan
-        return min((self.ytm(last=last, quote=quote, date=date, day_counter=day_counter, calendar=calendar,
-                             business_convention=business_convention, compounding=compounding, frequency=frequency,
-                             settlement_days=settlement_days, bond=bond, quote_type=quote_type, **kwargs)
-                    for key, bond in self.bond_components.items() if key > settlement_date))
+        return self._solve_ytw(quote=quote.astype(np.float64), date=date, day_counter=day_counter, calendar=calendar,
+                               business_convention=business_convention, compounding=compounding,
+                               frequency=frequency, settlement_days=settlement_days, quote_type=quote_type,
+                               accuracy=1.0e-10, max_iterations=100, last=last, **kwargs).yields
 
     @default_arguments
     @conditional_vectorize('quote', 'date', 'rolling_call_date')
@@ -1608,7 +2205,7 @@ class _BaseBond(Instrument):
         return bond.dirtyPrice(yield_to_date, day_counter, compounding, frequency, settlement_date)
 
     @default_arguments
-    @conditional_vectorize('quote', 'date')
+    @array_vectorize('quote', 'date')
     def duration_to_mat(self, duration_type, last, quote, date, day_counter, calendar, business_convention, compounding,
                         frequency, settlement_days, **kwargs):
         """
@@ -1649,21 +2246,21 @@ class _BaseBond(Instrument):
         scalar
             Bond's duration to maturity.
         """
-        date = to_ql_date(date)
         ytm = self.ytm(last=last, quote=quote, date=date, day_counter=day_counter, calendar=calendar,
                        business_convention=business_convention, compounding=compounding, frequency=frequency,
                        settlement_days=settlement_days, bypass_set_floating_rate_index=True, **kwargs)
-        settlement_date = self.settlement_date(date=date, calendar=calendar, settlement_days=settlement_days,
-                                               business_convention=business_convention)
-        if self.is_expired(settlement_date):
-            return np.nan
-        if self.yield_quote_compounding == ql.Simple:
-            duration_type = ql.Duration.Simple
-        return ql.BondFunctions_duration(self.bond, ytm, day_counter, compounding, frequency, duration_type,
-                                         settlement_date)
+        dates, settlement_dates, settlement_serials = self._trade_and_settlement_dates(
+            date=date, calendar=calendar, settlement_days=settlement_days, business_convention=business_convention)
+        result = np.full(len(dates), np.nan, dtype=np.float64)
+        alive = np.flatnonzero((settlement_serials < self._expiry_serial()) & np.isfinite(ytm))
+        if len(alive) > 0:
+            measures = self._risk_measures(ytm[alive], [settlement_dates[i] for i in alive], day_counter, compounding,
+                                           frequency)
+            result[alive] = self._select_duration(measures, duration_type, compounding)
+        return result
 
     @default_arguments
-    @conditional_vectorize('quote', 'date')
+    @array_vectorize('quote', 'date')
     def duration_to_worst(self, duration_type, last, quote, date, day_counter, calendar, business_convention,
                           compounding, frequency, settlement_days, **kwargs):
         """
@@ -1704,20 +2301,12 @@ class _BaseBond(Instrument):
         scalar
             Bond's duration to worst.
         """
-        date = to_ql_date(date)
-        ytw, worst_date = self.ytw_and_worst_date(last=last, quote=quote, date=date, day_counter=day_counter,
-                                                  calendar=calendar, business_convention=business_convention,
-                                                  compounding=compounding, frequency=frequency,
-                                                  settlement_days=settlement_days,
-                                                  bypass_set_floating_rate_index=True, **kwargs)
-        settlement_date = self.settlement_date(date=date, calendar=calendar, settlement_days=settlement_days,
-                                               business_convention=business_convention)
-        if self.is_expired(settlement_date):
-            return np.nan
-        if self.yield_quote_compounding == ql.Simple:
-            duration_type = ql.Duration.Simple
-        return ql.BondFunctions_duration(self.bond_components[worst_date], ytw, day_counter, compounding, frequency,
-                                         duration_type, settlement_date)
+        solved, measures = self._risk_measures_to_worst(quote=quote, date=date, day_counter=day_counter,
+                                                        calendar=calendar, business_convention=business_convention,
+                                                        compounding=compounding, frequency=frequency,
+                                                        settlement_days=settlement_days, last=last,
+                                                        bypass_set_floating_rate_index=True, **kwargs)
+        return np.where(solved, self._select_duration(measures, duration_type, compounding), np.nan)
 
     @default_arguments
     @conditional_vectorize('quote', 'date')
@@ -1778,7 +2367,7 @@ class _BaseBond(Instrument):
         return ql.BondFunctions_duration(bond, ytw, day_counter, compounding, frequency, duration_type, settlement_date)
 
     @default_arguments
-    @conditional_vectorize('quote', 'date')
+    @array_vectorize('quote', 'date')
     def convexity_to_mat(self, last, quote, date, day_counter, calendar, business_convention, compounding, frequency,
                          settlement_days, **kwargs):
         """
@@ -1817,18 +2406,21 @@ class _BaseBond(Instrument):
         scalar
             Bond's convexity to maturity.
         """
-        date = to_ql_date(date)
         ytm = self.ytm(last=last, quote=quote, date=date, day_counter=day_counter, calendar=calendar,
                        business_convention=business_convention, compounding=compounding, frequency=frequency,
-                       settlement_day=settlement_days, bypass_set_floating_rate_index=True, **kwargs)
-        settlement_date = self.settlement_date(date=date, calendar=calendar, settlement_days=settlement_days,
-                                               business_convention=business_convention)
-        if self.is_expired(settlement_date):
-            return np.nan
-        return ql.BondFunctions_convexity(self.bond, ytm, day_counter, compounding, frequency, settlement_date)
+                       settlement_days=settlement_days, bypass_set_floating_rate_index=True, **kwargs)
+        dates, settlement_dates, settlement_serials = self._trade_and_settlement_dates(
+            date=date, calendar=calendar, settlement_days=settlement_days, business_convention=business_convention)
+        result = np.full(len(dates), np.nan, dtype=np.float64)
+        alive = np.flatnonzero((settlement_serials < self._expiry_serial()) & np.isfinite(ytm))
+        if len(alive) > 0:
+            measures = self._risk_measures(ytm[alive], [settlement_dates[i] for i in alive], day_counter, compounding,
+                                           frequency)
+            result[alive] = measures.convexity
+        return result
 
     @default_arguments
-    @conditional_vectorize('quote', 'date')
+    @array_vectorize('quote', 'date')
     def convexity_to_worst(self, last, quote, date, day_counter, calendar, business_convention, compounding, frequency,
                            settlement_days, **kwargs):
         """
@@ -1867,18 +2459,12 @@ class _BaseBond(Instrument):
         scalar
             Bond's convexity to worst.
         """
-        date = to_ql_date(date)
-        ytw, worst_date = self.ytw_and_worst_date(last=last, quote=quote, date=date, day_counter=day_counter,
-                                                  calendar=calendar, business_convention=business_convention,
-                                                  compounding=compounding, frequency=frequency,
-                                                  settlement_days=settlement_days, bypass_set_floating_rate_index=True,
-                                                  **kwargs)
-        settlement_date = self.settlement_date(date=date, calendar=calendar, settlement_days=settlement_days,
-                                               business_convention=business_convention)
-        if self.is_expired(settlement_date):
-            return np.nan
-        return ql.BondFunctions_convexity(self.bond_components[worst_date], ytw, day_counter, compounding, frequency,
-                                          settlement_date)
+        solved, measures = self._risk_measures_to_worst(quote=quote, date=date, day_counter=day_counter,
+                                                        calendar=calendar, business_convention=business_convention,
+                                                        compounding=compounding, frequency=frequency,
+                                                        settlement_days=settlement_days, last=last,
+                                                        bypass_set_floating_rate_index=True, **kwargs)
+        return np.where(solved, measures.convexity, np.nan)
 
     @default_arguments
     @conditional_vectorize('quote', 'date')
@@ -1935,7 +2521,7 @@ class _BaseBond(Instrument):
         return ql.BondFunctions_convexity(bond, ytw, day_counter, compounding, frequency, settlement_date)
 
     @default_arguments
-    @conditional_vectorize('quote', 'date')
+    @array_vectorize('quote', 'date')
     def zspread_to_mat(self, yield_curve_timeseries, last, quote, date, day_counter, calendar, business_convention,
                        compounding, frequency, settlement_days, **kwargs):
         """
@@ -1976,32 +2562,99 @@ class _BaseBond(Instrument):
         scalar
             Bond's z-spread to maturity relative to `yield_curve_timeseries`.
         """
-        date = to_ql_date(date)
-        settlement_date = self.settlement_date(date=date, calendar=calendar, settlement_days=settlement_days,
-                                               business_convention=business_convention)
-        if self.is_expired(settlement_date):
-            return np.nan
-        if yield_curve_timeseries.calendar.isHoliday(date):
-            yield_date = yield_curve_timeseries.calendar.adjust(date, ql.Preceding)
-            yield_curve = ql.ImpliedTermStructure(yield_curve_timeseries.yield_curve_handle(date=yield_date), date)
-        else:
-            yield_curve = yield_curve_timeseries.yield_curve(date=date)
+        dates, settlement_dates, settlement_serials = self._trade_and_settlement_dates(
+            date=date, calendar=calendar, settlement_days=settlement_days, business_convention=business_convention)
+        result = np.full(len(dates), np.nan, dtype=np.float64)
+        rows = np.flatnonzero(settlement_serials < self._expiry_serial())
+        result[rows] = self._zspreads(yield_curve_timeseries=yield_curve_timeseries, quote=quote.astype(np.float64),
+                                      dates=dates, settlement_dates=settlement_dates,
+                                      settlement_serials=settlement_serials, rows=rows, day_counter=day_counter,
+                                      compounding=compounding, frequency=frequency, last=last, **kwargs)
+        return result
 
-        ql.Settings.instance().evaluationDate = date
-        if self.quote_type == CLEAN_PRICE:
-            pass
+    def _zspreads(self, yield_curve_timeseries, quote, dates, settlement_dates, settlement_serials, rows,
+                  day_counter, compounding, frequency, **kwargs):
+        """Z-spreads of a bond for the selected dates, solved all at once.
+
+        The curve discount factors at the cash flow dates are read once for each date and the spreads are then solved
+        with a vectorized root finder, as in QuantLib's BondFunctions.zSpread. On holidays of the curve calendar, the
+        curve of the previous business day is used, discounting from `date`.
+
+        Parameters
+        ----------
+        yield_curve_timeseries: :py:func:`YieldCurveTimeSeries`
+            The yield curve object against which the z-spreads will be calculated.
+        quote: numpy.ndarray of float64
+            The bond's quotes.
+        dates: list of QuantLib.Date
+            The trade dates.
+        settlement_dates: list of QuantLib.Date
+            The settlement dates.
+        settlement_serials: numpy.ndarray of int32
+            The serial numbers of `settlement_dates`.
+        rows: numpy.ndarray of int
+            Positions of the dates for which the z-spreads are calculated.
+        day_counter: QuantLib.DayCounter
+            Day counter of the z-spreads.
+        compounding: QuantLib.Compounding
+            Compounding convention of the z-spreads.
+        frequency: QuantLib.Frequency
+            Compounding frequency of the z-spreads.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            The z-spreads for `rows` (nan where the solver did not converge).
+        """
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.float64)
+        bond = kwargs.pop('bond', self.bond)  # Useful to pass bonds other than self as arguments.
+        row_settlement_dates = [settlement_dates[i] for i in rows]
+        row_serials = settlement_serials[rows]
+        clean_quote = quote[rows]
+        if self.quote_type == YIELD:
+            for j, i in enumerate(rows):
+                clean_quote[j] = self.bond.cleanPrice(clean_quote[j], day_counter, compounding, frequency,
+                                                      settlement_dates[i])
         elif self.quote_type == DIRTY_PRICE:
-            quote = quote - self.accrued_interest(last=last, date=settlement_date, **kwargs)
-        elif self.quote_type == YIELD:
-            quote = self.clean_price_from_ytm(last=last, quote=quote, date=date, day_counter=day_counter,
-                                              calendar=calendar, business_convention=business_convention,
-                                              compounding=compounding, frequency=frequency,
-                                              bypass_set_floating_rate_index=True, settlement_days=settlement_days)
-        return ql.BondFunctions_zSpread(self.bond, quote, yield_curve, day_counter, compounding, frequency,
-                                        settlement_date)
+            clean_quote -= self._accrued_amounts(row_settlement_dates, row_serials, **kwargs)
+        targets = self._npv_targets(clean_quote, CLEAN_PRICE, row_settlement_dates, row_serials, bond, **kwargs)
+        cash_flows = self.cash_flow_schedule(bond=bond)
+        first = cash_flows.next_cash_flow_index(row_serials)
+        size = len(cash_flows)
+        alive = np.arange(size)[None, :] >= first[:, None]
+        amounts = np.where(alive, cash_flows.amounts[None, :], 0.0)
+        times = np.zeros((len(rows), size), dtype=np.float64)
+        discounts = np.ones((len(rows), size), dtype=np.float64)
+        settlement_times = np.zeros(len(rows), dtype=np.float64)
+        settlement_discounts = np.ones(len(rows), dtype=np.float64)
+        curve_calendar = yield_curve_timeseries.calendar
+        for j, i in enumerate(rows):
+            date = dates[i]
+            switch_evaluation_date(date)
+            if curve_calendar.isHoliday(date):
+                yield_curve = yield_curve_timeseries.yield_curve(date=curve_calendar.adjust(date, ql.Preceding))
+                reference_date = date
+            else:
+                yield_curve = yield_curve_timeseries.yield_curve(date=date)
+                reference_date = yield_curve.referenceDate()
+            # Times are measured from reference_date, as in an ImpliedTermStructure on holidays.
+            curve_day_counter = yield_curve.dayCounter()
+            offset = curve_day_counter.yearFraction(yield_curve.referenceDate(), reference_date)
+            offset_discount = yield_curve.discount(offset, True)
+            row_times = year_fractions(curve_day_counter, reference_date,
+                                       np.append(row_serials[j], cash_flows.dates[first[j]:]))
+            row_discounts = [yield_curve.discount(time + offset, True) / offset_discount for time in row_times.tolist()]
+            settlement_times[j] = row_times[0]
+            settlement_discounts[j] = row_discounts[0]
+            times[j, first[j]:] = row_times[1:]
+            discounts[j, first[j]:] = row_discounts[1:]
+        result = solve_zspreads(amounts, times, discounts, settlement_times, settlement_discounts, targets,
+                                compounding, frequency)
+        return result.roots
 
     @default_arguments
-    @conditional_vectorize('quote', 'date')
+    @array_vectorize('quote', 'date')
     def zspread_to_worst(self, yield_curve_timeseries, last, quote, date, day_counter, calendar, business_convention,
                          compounding, frequency, settlement_days, **kwargs):
         """
@@ -2042,20 +2695,24 @@ class _BaseBond(Instrument):
         scalar
             Bond's z-spread to worst, relative to `yield_curve_timeseries`.
         """
-        date = to_ql_date(date)
-        settlement_date = self.settlement_date(date=date, calendar=calendar, settlement_days=settlement_days,
-                                               business_convention=business_convention)
-        if self.is_expired(settlement_date):
-            return np.nan
-        worst_date = self.worst_date(last=last, quote=quote, date=date, day_counter=day_counter, calendar=calendar,
-                                     business_convention=business_convention, compounding=compounding,
-                                     frequency=frequency, settlement_days=settlement_days,
-                                     bypass_set_floating_rate_index=True, **kwargs)
-        bond = self.bond_components[worst_date]
-        return self.zspread_to_mat(yield_curve_timeseries=yield_curve_timeseries, last=last, quote=quote, date=date,
-                                   day_counter=day_counter, calendar=calendar, business_convention=business_convention,
-                                   compounding=compounding, frequency=frequency, settlement_days=settlement_days,
-                                   bond=bond, bypass_set_floating_rate_index=True, **kwargs)
+        quote = quote.astype(np.float64)
+        quote_type = kwargs.pop('quote_type', None)
+        ytw = self._solve_ytw(quote=quote, date=date, day_counter=day_counter, calendar=calendar,
+                              business_convention=business_convention, compounding=compounding, frequency=frequency,
+                              settlement_days=settlement_days, quote_type=quote_type, accuracy=1.0e-10,
+                              max_iterations=100, last=last, bypass_set_floating_rate_index=True, **kwargs)
+        dates, settlement_dates, settlement_serials = self._trade_and_settlement_dates(
+            date=date, calendar=calendar, settlement_days=settlement_days, business_convention=business_convention)
+        result = np.full(len(dates), np.nan, dtype=np.float64)
+        components = list(self.bond_components.values())
+        for component in np.unique(ytw.components[ytw.components >= 0]):
+            rows = np.flatnonzero(ytw.components == component)
+            result[rows] = self._zspreads(yield_curve_timeseries=yield_curve_timeseries, quote=quote, dates=dates,
+                                          settlement_dates=settlement_dates, settlement_serials=settlement_serials,
+                                          rows=rows, day_counter=day_counter, compounding=compounding,
+                                          frequency=frequency, last=last, bond=components[component],
+                                          bypass_set_floating_rate_index=True, **kwargs)
+        return result
 
     @default_arguments
     @conditional_vectorize('quote', 'date')
@@ -2248,7 +2905,7 @@ class _BaseBond(Instrument):
                                                   date)
         else:
             yield_curve = yield_curve_timeseries.yield_curve(date=date)
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         dirty_price = ql.CashFlows.npv(self.bond.cashflows(), yield_curve, oas_spread, day_counter, compounding,
                                        frequency, False, settlement_date)
         return dirty_price - self.accrued_interest(date=settlement_date)
@@ -2330,7 +2987,7 @@ class _BaseBond(Instrument):
                                                   date)
         else:
             yield_curve = yield_curve_timeseries.yield_curve(date=date)
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         dirty_price = ql.CashFlows.npv(self.bond.cashflows(), yield_curve, oas_spread, day_counter, compounding,
                                        frequency, False, settlement_date)
         return dirty_price
@@ -0,0 +1,559 @@
+# Copyright (C) 2016-2018 Lanx Capital Investimentos LTDA.
+#
+# This file is part of Time Series Finance (tsfin).
+#
+# Time Series Finance (tsfin) is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or (at your option)
+# any later version.
+#
+# Time Series Finance (tsfin) is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Time Series Finance (tsfin). If not, see <https://www.gnu.org/licenses/>.
+"""
+NumPy kernels for bond analytics, evaluated for many dates at once over cash flows extracted once from QuantLib.
+
+The discounting conventions follow QuantLib's CashFlows functions: cash flows paid up to the settlement date are
+ignored and the discount times are accumulated coupon by coupon, using the reference periods of each coupon.
+"""
+from collections import namedtuple
+import numpy as np
+import QuantLib as ql
+from tsfin.base import implied_rate
+
+YieldSolverResult = namedtuple('YieldSolverResult', ['yields', 'converged', 'iterations'])
+YieldToWorstResult = namedtuple('YieldToWorstResult', ['yields', 'worst_dates', 'components', 'converged'])
+RiskMeasures = namedtuple('RiskMeasures', ['macaulay', 'modified', 'simple', 'convexity'])
+RootSolverResult = namedtuple('RootSolverResult', ['roots', 'converged', 'iterations'])
+
+
+class BondCashFlows:
+    """Cash flows of a QuantLib bond, extracted once into arrays.
+
+    Parameters
+    ----------
+    bond: QuantLib.Bond
+        The bond.
+
+    Attributes
+    ----------
+    dates: numpy.ndarray of int32
+        Payment date serial numbers, sorted.
+    amounts: numpy.ndarray of float64
+        Amounts paid.
+    is_coupon: numpy.ndarray of bool
+        True for coupons, False for redemptions and other cash flows.
+    """
+    def __init__(self, bond):
+        self.cash_flows = list(bond.cashflows())
+        size = len(self.cash_flows)
+        self.dates = np.empty(size, dtype=np.int32)
+        self.amounts = np.empty(size, dtype=np.float64)
+        self.is_coupon = np.zeros(size, dtype=bool)
+        self._coupons = list()
+        for i, cash_flow in enumerate(self.cash_flows):
+            self.dates[i] = cash_flow.date().serialNumber()
+            self.amounts[i] = cash_flow.amount()
+            coupon = ql.as_coupon(cash_flow)
+            self._coupons.append(coupon)
+            self.is_coupon[i] = coupon is not None
+        self._step_times = dict()
+
+    def __len__(self):
+        return len(self.cash_flows)
+
+    def next_cash_flow_index(self, settlement_serials):
+        """
+        Parameters
+        ----------
+        settlement_serials: numpy.ndarray of int
+            Settlement date serial numbers.
+
+        Returns
+        -------
+        numpy.ndarray of int
+            Index of the first cash flow paid strictly after each settlement date (``len(self)`` if there is none).
+        """
+        return np.searchsorted(self.dates, settlement_serials, side='right')
+
+    def step_time(self, index, last_date, npv_date, day_counter):
+        """Discount time between `last_date` and the payment date of a cash flow, as in QuantLib's CashFlows.
+
+        Parameters
+        ----------
+        index: int
+            Position of the cash flow.
+        last_date: QuantLib.Date
+            Date from which the time is measured, i.e. the previous payment date or `npv_date`.
+        npv_date: QuantLib.Date
+            Date to which the cash flows are discounted.
+        day_counter: QuantLib.DayCounter
+            Day counter of the yield.
+
+        Returns
+        -------
+        scalar
+            The discount time, in years.
+        """
+        cash_flow_date = self.cash_flows[index].date()
+        coupon = self._coupons[index]
+        if coupon is not None:
+            reference_start = coupon.referencePeriodStart()
+            reference_end = coupon.referencePeriodEnd()
+            accrual_start = coupon.accrualStartDate()
+            if last_date != accrual_start:
+                coupon_period = day_counter.yearFraction(accrual_start, cash_flow_date, reference_start,
+                                                         reference_end)
+                accrued_period = day_counter.yearFraction(accrual_start, last_date, reference_start, reference_end)
+                return coupon_period - accrued_period
+            return day_counter.yearFraction(last_date, cash_flow_date, reference_start, reference_end)
+        if last_date == npv_date:
+            reference_start = cash_flow_date - ql.Period(1, ql.Years)
+        else:
+            reference_start = last_date
+        return day_counter.yearFraction(last_date, cash_flow_date, reference_start, cash_flow_date)
+
+    def step_times(self, day_counter):
+        """
+        Parameters
+        ----------
+        day_counter: QuantLib.DayCounter
+            Day counter of the yield.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Discount time between each cash flow and the previous one (nan for the first cash flow). Computed once per
+            day counter.
+        """
+        key = day_counter.name()
+        try:
+            return self._step_times[key]
+        except KeyError:
+            times = np.full(len(self), np.nan, dtype=np.float64)
+            for i in range(1, len(self)):
+                previous_date = self.cash_flows[i - 1].date()
+                times[i] = self.step_time(i, previous_date, ql.Date(), day_counter)
+            self._step_times[key] = times
+            return times
+
+    def discount_matrices(self, settlement_dates, day_counter, first=None):
+        """Amounts and step discount times of the cash flows still to be paid at each settlement date.
+
+        Parameters
+        ----------
+        settlement_dates: list of QuantLib.Date
+            The settlement dates, which are also the dates to which cash flows are discounted.
+        day_counter: QuantLib.DayCounter
+            Day counter of the yield.
+        first: numpy.ndarray of int, optional
+            The result of :py:meth:`next_cash_flow_index` for `settlement_dates`, if already known.
+
+        Returns
+        -------
+        tuple (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+            The index of the first cash flow to be paid for each date, and two (dates x cash flows) float64
+            matrices with the amounts and the step discount times. Cash flows already paid have zero amounts and
+            zero times.
+        """
+        settlement_serials = np.array([date.serialNumber() for date in settlement_dates], dtype=np.int32)
+        if first is None:
+            first = self.next_cash_flow_index(settlement_serials)
+        columns = np.arange(len(self))
+        amounts = np.where(columns[None, :] >= first[:, None], self.amounts[None, :], 0.0)
+        steps = np.where(columns[None, :] > first[:, None], self.step_times(day_counter)[None, :], 0.0)
+        first_times = dict()
+        for row in np.flatnonzero(first < len(self)):
+            settlement_date = settlement_dates[row]
+            key = (settlement_serials[row], first[row])
+            try:
+                steps[row, first[row]] = first_times[key]
+            except KeyError:
+                first_times[key] = self.step_time(first[row], settlement_date, settlement_date, day_counter)
+                steps[row, first[row]] = first_times[key]
+        return first, amounts, steps
+
+
+class BondDateTable:
+    """Settlement dates, accrued interest and next cash flow of a bond for every calendar day of its life.
+
+    Parameters
+    ----------
+    first_serial: int
+        Serial number of the first day in the table.
+    settlement_serials: numpy.ndarray of int32
+        Settlement date serial number of a trade on each day.
+    accrued: numpy.ndarray of float64
+        Accrued interest of the bond for settlement on each day (nan from maturity on).
+    next_cash_flow: numpy.ndarray of int32
+        Index of the first cash flow paid strictly after each day.
+    """
+    def __init__(self, first_serial, settlement_serials, accrued, next_cash_flow):
+        self.first_serial = int(first_serial)
+        self.settlement_serials = settlement_serials
+        self.accrued = accrued
+        self.next_cash_flow = next_cash_flow
+
+    def __len__(self):
+        return len(self.settlement_serials)
+
+    @property
+    def last_serial(self):
+        return self.first_serial + len(self) - 1
+
+    def positions(self, serials):
+        """
+        Parameters
+        ----------
+        serials: numpy.ndarray of int
+            Date serial numbers.
+
+        Returns
+        -------
+        numpy.ndarray of int or None
+            The rows of `serials` in the table, or None if any of them is outside the table.
+        """
+        serials = np.asarray(serials)
+        if len(serials) == 0 or serials.min() < self.first_serial or serials.max() > self.last_serial:
+            return None
+        return serials - self.first_serial
+
+    @property
+    def nbytes(self):
+        return self.settlement_serials.nbytes + self.accrued.nbytes + self.next_cash_flow.nbytes
+
+
+def log_compound_factor(rate, time, compounding, frequency):
+    """Natural logarithm of QuantLib's compound factors and its derivative with respect to the rate.
+
+    Parameters
+    ----------
+    rate: numpy.ndarray
+        Interest rates, broadcast against `time`.
+    time: numpy.ndarray
+        Times, in years.
+    compounding: QuantLib.Compounding
+        The compounding convention of `rate`.
+    frequency: QuantLib.Frequency
+        The compounding frequency of `rate`.
+
+    Returns
+    -------
+    tuple (numpy.ndarray, numpy.ndarray)
+        The logarithm of the compound factors and its derivative with respect to the rate.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        simple_growth = 1.0 + rate * time
+        simple = (np.log(simple_growth), time / simple_growth)
+        if compounding == ql.Simple:
+            return simple
+        if compounding == ql.Continuous:
+            return rate * time, np.broadcast_to(time, np.broadcast(rate, time).shape)
+        base = 1.0 + rate / frequency
+        compounded = (frequency * time * np.log(base), time / base)
+    if compounding == ql.Compounded:
+        return compounded
+    elif compounding == ql.SimpleThenCompounded:
+        is_simple = time <= 1.0 / frequency
+    elif compounding == ql.CompoundedThenSimple:
+        is_simple = time > 1.0 / frequency
+    else:
+        raise ValueError("Unable to compute compound factors with compounding {}".format(compounding))
+    return np.where(is_simple, simple[0], compounded[0]), np.where(is_simple, simple[1], compounded[1])
+
+
+def stepwise_npv(rate, amounts, steps, compounding, frequency):
+    """Present value of cash flows discounted at a flat yield, accumulating the discount factors step by step.
+
+    Parameters
+    ----------
+    rate: numpy.ndarray
+        One yield per row of `amounts`.
+    amounts: numpy.ndarray
+        (rows x cash flows) matrix of amounts.
+    steps: numpy.ndarray
+        (rows x cash flows) matrix of step discount times.
+    compounding: QuantLib.Compounding
+        The compounding convention of the yields.
+    frequency: QuantLib.Frequency
+        The compounding frequency of the yields.
+
+    Returns
+    -------
+    tuple (numpy.ndarray, numpy.ndarray)
+        The present values and their derivatives with respect to the yields.
+    """
+    log_factors, log_factor_derivatives = log_compound_factor(rate[:, None], steps, compounding, frequency)
+    discounts = np.exp(-np.cumsum(log_factors, axis=1))
+    weighted = amounts * discounts
+    return weighted.sum(axis=1), -(weighted * np.cumsum(log_factor_derivatives, axis=1)).sum(axis=1)
+
+
+def risk_measures(rate, amounts, steps, compounding, frequency):
+    """Durations and convexity of cash flows at flat yields, as in QuantLib's CashFlows functions.
+
+    As in QuantLib, each cash flow is discounted by the yield's discount factor for its cumulative time.
+
+    Parameters
+    ----------
+    rate: numpy.ndarray
+        One yield per row of `amounts`.
+    amounts: numpy.ndarray
+        (rows x cash flows) matrix of amounts.
+    steps: numpy.ndarray
+        (rows x cash flows) matrix of step discount times.
+    compounding: QuantLib.Compounding
+        The compounding convention of the yields.
+    frequency: QuantLib.Frequency
+        The compounding frequency of the yields.
+
+    Returns
+    -------
+    :py:class:`RiskMeasures`
+        The Macaulay (nan unless `compounding` is Compounded), modified and simple durations and the convexity of
+        each row.
+    """
+    times = np.cumsum(steps, axis=1)
+    rate = np.asarray(rate, dtype=np.float64)[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        discounts = np.exp(-log_compound_factor(rate, times, compounding, frequency)[0])
+        weighted = amounts * discounts
+        npv = weighted.sum(axis=1)
+        simple_first = -weighted * discounts * times
+        simple_second = 2.0 * weighted * discounts ** 2 * times ** 2
+        if compounding == ql.Continuous:
+            first = -weighted * times
+            second = weighted * times ** 2
+        elif compounding == ql.Simple:
+            first, second = simple_first, simple_second
+        else:
+            base = 1.0 + rate / frequency
+            compounded_first = -weighted * times / base
+            compounded_second = weighted * times * (frequency * times + 1) / (frequency * base ** 2)
+            if compounding == ql.Compounded:
+                first, second = compounded_first, compounded_second
+            else:
+                if compounding == ql.SimpleThenCompounded:
+                    is_simple = times <= 1.0 / frequency
+                else:
+                    is_simple = times > 1.0 / frequency
+                first = np.where(is_simple, simple_first, compounded_first)
+                second = np.where(is_simple, simple_second, compounded_second)
+        modified = -first.sum(axis=1) / npv
+        convexity = second.sum(axis=1) / npv
+        simple = (weighted * times).sum(axis=1) / npv
+        if compounding == ql.Compounded:
+            macaulay = (1.0 + rate[:, 0] / frequency) * modified
+        else:
+            macaulay = np.full(len(npv), np.nan)
+    return RiskMeasures(macaulay, modified, simple, convexity)
+
+
+def newton_safe(function, lower, upper, guess, accuracy=1.0e-10, max_iterations=100):
+    """Vectorized safeguarded Newton-Raphson root finder.
+
+    Every root is kept bracketed: Newton steps that fall outside the current bracket are replaced by bisection steps,
+    as in QuantLib's NewtonSafe solver.
+
+    Parameters
+    ----------
+    function: callable
+        ``function(x, index)`` must return the values and the derivatives of the functions of the rows in `index`,
+        evaluated at `x`.
+    lower: numpy.ndarray
+        Lower bounds of the roots.
+    upper: numpy.ndarray
+        Upper bounds of the roots.
+    guess: scalar or numpy.ndarray
+        Initial guesses. Guesses outside the bounds are replaced by the middle of the bracket.
+    accuracy: scalar, optional
+        Convergence tolerance on the roots.
+    max_iterations: int, optional
+        Maximum number of iterations.
+
+    Returns
+    -------
+    :py:class:`RootSolverResult`
+        The roots (nan if not converged), a boolean mask of the converged rows and the number of iterations of each
+        row.
+    """
+    lower = np.asarray(lower, dtype=np.float64)
+    upper = np.asarray(upper, dtype=np.float64)
+    size = len(lower)
+    roots = np.full(size, np.nan, dtype=np.float64)
+    converged = np.zeros(size, dtype=bool)
+    iterations = np.zeros(size, dtype=np.int32)
+    index = np.arange(size)
+    with np.errstate(all='ignore'):
+        value_lower = function(lower, index)[0]
+        value_upper = function(upper, index)[0]
+        bracketed = np.isfinite(value_lower) & np.isfinite(value_upper) & (value_lower * value_upper <= 0)
+        negative_side = np.where(value_lower < 0, lower, upper)
+        positive_side = np.where(value_lower < 0, upper, lower)
+        guess = np.broadcast_to(np.asarray(guess, dtype=np.float64), (size,))
+        x = np.where((guess > lower) & (guess < upper), guess, 0.5 * (lower + upper))
+        active = np.flatnonzero(bracketed)
+        for iteration in range(1, max_iterations + 1):
+            if len(active) == 0:
+                break
+            x_active = x[active]
+            value, derivative = function(x_active, active)
+            iterations[active] = iteration
+            is_negative = value < 0
+            negative_side[active] = np.where(is_negative, x_active, negative_side[active])
+            positive_side[active] = np.where(is_negative, positive_side[active], x_active)
+            bracket_low = np.minimum(negative_side[active], positive_side[active])
+            bracket_high = np.maximum(negative_side[active], positive_side[active])
+            x_new = x_active - value / derivative
+            bisect = ~np.isfinite(x_new) | (x_new <= bracket_low) | (x_new >= bracket_high)
+            x_new = np.where(bisect, 0.5 * (bracket_low + bracket_high), x_new)
+            done = (value == 0) | (np.abs(x_new - x_active) < accuracy)
+            x_new = np.where(value == 0, x_active, x_new)
+            x[active] = x_new
+            roots[active[done]] = x_new[done]
+            converged[active[done]] = True
+            active = active[~done]
+    return RootSolverResult(roots, converged, iterations)
+
+
+def lowest_rate(steps, compounding, frequency):
+    """
+    Parameters
+    ----------
+    steps: numpy.ndarray
+        (rows x cash flows) matrix of step discount times.
+    compounding: QuantLib.Compounding
+        The compounding convention of the yields.
+    frequency: QuantLib.Frequency
+        The compounding frequency of the yields.
+
+    Returns
+    -------
+    numpy.ndarray
+        For each row, a yield slightly above the lowest one for which all the compound factors are positive.
+    """
+    longest_step = np.maximum(steps.max(axis=1, initial=0.0), 1.0e-8)
+    if compounding == ql.Continuous:
+        return np.full(len(steps), -1.0)
+    elif compounding == ql.Simple:
+        return -0.99 / longest_step
+    elif compounding == ql.CompoundedThenSimple:
+        return -0.99 * np.minimum(frequency, 1.0 / longest_step)
+    return np.full(len(steps), -0.99 * frequency)
+
+
+def solve_yields(amounts, steps, targets, compounding, frequency, accuracy=1.0e-10, max_iterations=100, guess=0.05,
+                 upper=10.0):
+    """Solve the flat yields that discount cash flows to target present values, for all rows at once.
+
+    Parameters
+    ----------
+    amounts: numpy.ndarray
+        (rows x cash flows) matrix of amounts.
+    steps: numpy.ndarray
+        (rows x cash flows) matrix of step discount times.
+    targets: numpy.ndarray
+        Target present value of each row (e.g. the dirty price times the notional over 100).
+    compounding: QuantLib.Compounding
+        The compounding convention of the yields.
+    frequency: QuantLib.Frequency
+        The compounding frequency of the yields.
+    accuracy: scalar, optional
+        Convergence tolerance on the yields.
+    max_iterations: int, optional
+        Maximum number of iterations.
+    guess: scalar or numpy.ndarray, optional
+        Initial guess(es).
+    upper: scalar, optional
+        Upper bound of the yields.
+
+    Returns
+    -------
+    :py:class:`YieldSolverResult`
+        The yields (nan if not converged), the mask of converged rows and the number of iterations of each row.
+    """
+    targets = np.asarray(targets, dtype=np.float64)
+
+    def function(rate, index):
+        npv, npv_derivative = stepwise_npv(rate, amounts[index], steps[index], compounding, frequency)
+        return npv - targets[index], npv_derivative
+
+    lower = lowest_rate(steps, compounding, frequency)
+    result = newton_safe(function, lower, np.full(len(targets), upper), guess, accuracy=accuracy,
+                         max_iterations=max_iterations)
+    return YieldSolverResult(result.roots, result.converged, result.iterations)
+
+
+def solve_zspreads(amounts, times, discounts, settlement_times, settlement_discounts, targets, compounding,
+                   frequency, accuracy=1.0e-10, max_iterations=100, guess=0.0, upper=5.0):
+    """Solve the z-spreads over discount curves that price cash flows to target present values, for all rows at once.
+
+    The spreads are added to the zero rates of the curves, as in QuantLib's ZeroSpreadedTermStructure, and the cash
+    flows are discounted to the settlement date.
+
+    Parameters
+    ----------
+    amounts: numpy.ndarray
+        (rows x cash flows) matrix of amounts (zero for cash flows already paid).
+    times: numpy.ndarray
+        (rows x cash flows) matrix of times from the curve reference dates to the payment dates.
+    discounts: numpy.ndarray
+        (rows x cash flows) matrix of curve discount factors at `times`.
+    settlement_times: numpy.ndarray
+        Time from the curve reference date to the settlement date, for each row.
+    settlement_discounts: numpy.ndarray
+        Curve discount factor at the settlement date, for each row.
+    targets: numpy.ndarray
+        Target present value of each row.
+    compounding: QuantLib.Compounding
+        The compounding convention of the spreads.
+    frequency: QuantLib.Frequency
+        The compounding frequency of the spreads.
+    accuracy: scalar, optional
+        Convergence tolerance on the spreads.
+    max_iterations: int, optional
+        Maximum number of iterations.
+    guess: scalar or numpy.ndarray, optional
+        Initial guess(es).
+    upper: scalar, optional
+        Upper bound of the spreads.
+
+    Returns
+    -------
+    :py:class:`RootSolverResult`
+        The z-spreads (nan if not converged), the mask of converged rows and the number of iterations of each row.
+    """
+    targets = np.asarray(targets, dtype=np.float64)
+    times = np.column_stack((settlement_times, times))
+    discounts = np.column_stack((settlement_discounts, discounts))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        zero_rates = np.where(times > 0, implied_rate(1.0 / discounts, times, compounding, frequency), 0.0)
+        # The spreaded zero rates must keep every compound factor positive.
+        if compounding == ql.Continuous:
+            lowest = np.full(times.shape, -np.inf)
+        else:
+            if compounding == ql.Simple:
+                is_simple = np.ones(times.shape, dtype=bool)
+            elif compounding == ql.Compounded:
+                is_simple = np.zeros(times.shape, dtype=bool)
+            elif compounding == ql.SimpleThenCompounded:
+                is_simple = times <= 1.0 / frequency
+            else:
+                is_simple = times > 1.0 / frequency
+            lowest = 0.99 * np.where(is_simple, -1.0 / times, -float(frequency))
+            lowest[times <= 0] = -np.inf
+    lower = np.maximum((lowest - zero_rates).max(axis=1), -1.0)
+
+    def function(spread, index):
+        log_factors, log_factor_derivatives = log_compound_factor(spread[:, None] + zero_rates[index], times[index],
+                                                                  compounding, frequency)
+        weighted = amounts[index] * np.exp(log_factors[:, :1] - log_factors[:, 1:])
+        npv_derivative = -(weighted * (log_factor_derivatives[:, 1:] - log_factor_derivatives[:, :1])).sum(axis=1)
+        return weighted.sum(axis=1) - targets[index], npv_derivative
+
+    return newton_safe(function, lower, np.full(len(targets), upper), guess, accuracy=accuracy,
+                       max_iterations=max_iterations)
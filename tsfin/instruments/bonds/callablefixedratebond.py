@@ -15,9 +15,12 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with Time Series Finance (tsfin). If not, see <https://www.gnu.org/licenses/>.
 
+import os
 import QuantLib as ql
 import numpy as np
-from tsfin.base import conditional_vectorize, to_datetime,  to_ql_date, to_ql_short_rate_model
+import pandas as pd
+from tsfin.base import conditional_vectorize, to_datetime,  to_ql_date, to_ql_short_rate_model, to_object_array, \
+    fork_map, split_positions, switch_evaluation_date
 from tsfin.instruments.bonds._basebond import _BaseBond, default_arguments, create_call_component, \
     create_schedule_for_component
 from tsfin.constants import CALLED_DATE
@@ -36,8 +39,15 @@ class CallableFixedRateBond(_BaseBond):
     The `timeseries` attribute needs a component TimeSeries `call_schedule`, containing the call dates and call prices
     schedule in its `ts_values`.
 
+    The number of time steps of the trees used in the option-adjusted spread calculations is given by the `tree_size`
+    attribute.
+
     See the :py:mod:`constants` for required attributes in `timeseries` and their possible values.
     """
+    tree_size = 40
+    # Measures computed by parallel_oas, besides the option-adjusted spread itself.
+    oas_measures = ('clean_price', 'dirty_price', 'duration', 'convexity')
+
     def __init__(self, timeseries):
         super().__init__(timeseries=timeseries)
         # TODO: Add support for puttable bonds.
@@ -135,6 +145,33 @@ class CallableFixedRateBond(_BaseBond):
         bond_components[maturity].setPricingEngine(ql.DiscountingBondEngine(yield_curve))
         return bond_components[maturity]
 
+    def _tree_engine(self, yield_curve_handle, model, model_params, date):
+        """
+        Parameters
+        ----------
+        yield_curve_handle: QuantLib.YieldTermStructureHandle
+            The handle of the yield curve used by the short rate model.
+        model: str
+            A string representing one of QuantLib Short Rate models.
+        model_params: tuple, dict
+            Parameter set for the model, as in :py:meth:`oas`.
+        date: QuantLib.Date
+            Date of the calculation.
+
+        Returns
+        -------
+        QuantLib.TreeCallableFixedRateBondEngine
+            The tree engine for the short rate model, with `tree_size` time steps.
+        """
+        ql_model = to_ql_short_rate_model(model_name=model)
+        if isinstance(model_params, dict):
+            # Assumes model parameters are given for each date.
+            ql_model = ql_model(yield_curve_handle, *model_params[date])
+        else:
+            # Only one set of model parameters are given (calibrated for, say, a specific date).
+            ql_model = ql_model(yield_curve_handle, *model_params)
+        return ql.TreeCallableFixedRateBondEngine(ql_model, self.tree_size)
+
     @default_arguments
     @conditional_vectorize('quote', 'date')
     def oas(self, yield_curve_timeseries, model, model_params, last, quote, date, day_counter, calendar,
@@ -206,16 +243,8 @@ class CallableFixedRateBond(_BaseBond):
         else:
             yield_curve = yield_curve_timeseries.yield_curve(date=date)
         yield_curve_relinkable_handle = ql.RelinkableYieldTermStructureHandle(yield_curve)
-        ql.Settings.instance().evaluationDate = date
-        ql_model = to_ql_short_rate_model(model_name=model)
-        if isinstance(model_params, dict):
-            # Assumes model parameters are given for each date.
-            ql_model = ql_model(yield_curve_relinkable_handle, *model_params[date])
-        else:
-            # Only one set of model parameters are given (calibrated for, say, a specific date).
-            ql_model = ql_model(yield_curve_relinkable_handle, *model_params)
-        engine = ql.TreeCallableFixedRateBondEngine(ql_model, 40)
-        bond.setPricingEngine(engine)
+        switch_evaluation_date(date)
+        bond.setPricingEngine(self._tree_engine(yield_curve_relinkable_handle, model, model_params, date))
         return bond.OAS(quote, yield_curve_relinkable_handle, day_counter, compounding, frequency, settlement_date)
 
     @default_arguments
@@ -298,16 +327,8 @@ class CallableFixedRateBond(_BaseBond):
         else:
             yield_curve = yield_curve_timeseries.yield_curve(date=date)
         yield_curve_handle = ql.YieldTermStructureHandle(yield_curve)
-        ql.Settings.instance().evaluationDate = date
-        ql_model = to_ql_short_rate_model(model_name=model)
-        if isinstance(model_params, dict):
-            # Assumes model parameters are given for each date.
-            ql_model = ql_model(yield_curve_handle, *model_params[date])
-        else:
-            # Only one set of model parameters are given (calibrated for, say, a specific date).
-            ql_model = ql_model(yield_curve_handle, *model_params)
-        engine = ql.TreeCallableFixedRateBondEngine(ql_model, 40)
-        bond.setPricingEngine(engine)
+        switch_evaluation_date(date)
+        bond.setPricingEngine(self._tree_engine(yield_curve_handle, model, model_params, date))
         return bond.cleanPriceOAS(oas_spread, yield_curve_handle, day_counter, compounding, frequency, settlement_date)
 
     @default_arguments
@@ -390,16 +411,8 @@ class CallableFixedRateBond(_BaseBond):
         else:
             yield_curve = yield_curve_timeseries.yield_curve(date=date)
         yield_curve_handle = ql.YieldTermStructureHandle(yield_curve)
-        ql.Settings.instance().evaluationDate = date
-        ql_model = to_ql_short_rate_model(model_name=model)
-        if isinstance(model_params, dict):
-            # Assumes model parameters are given for each date.
-            ql_model = ql_model(yield_curve_handle, *model_params[date])
-        else:
-            # Only one set of model parameters are given (calibrated for, say, a specific date).
-            ql_model = ql_model(yield_curve_handle, *model_params)
-        engine = ql.TreeCallableFixedRateBondEngine(ql_model, 40)
-        bond.setPricingEngine(engine)
+        switch_evaluation_date(date)
+        bond.setPricingEngine(self._tree_engine(yield_curve_handle, model, model_params, date))
         clean_price = bond.cleanPriceOAS(oas_spread, yield_curve_handle, day_counter, compounding, frequency,
                                          settlement_date)
         return clean_price + self.accrued_interest(date=settlement_date)
@@ -407,7 +420,7 @@ class CallableFixedRateBond(_BaseBond):
     @default_arguments
     @conditional_vectorize('quote', 'date')
     def oas_duration(self, yield_curve_timeseries, model, model_params, last, quote, date, day_counter, calendar,
-                     business_convention, compounding, frequency, settlement_days, **kwargs):
+                     business_convention, compounding, frequency, settlement_days, oas_spread=None, **kwargs):
         """
         Warning
         -------
@@ -456,6 +469,8 @@ class CallableFixedRateBond(_BaseBond):
         settlement_days: int, optional
             Number of days for trade settlement.
             Default: see :py:func:`default_arguments`.
+        oas_spread: float, optional
+            The spread to be used in the calculation, will self calculate the oas_spread if none is passed.
 
         Returns
         -------
@@ -477,17 +492,22 @@ class CallableFixedRateBond(_BaseBond):
         else:
             yield_curve = yield_curve_timeseries.yield_curve(date=date)
         yield_curve_handle = ql.YieldTermStructureHandle(yield_curve)
-        oas_spread = self.oas(yield_curve_timeseries=yield_curve_timeseries, model=model, model_params=model_params,
-                              last=last, quote=quote, date=date, day_counter=day_counter, calendar=calendar,
-                              business_convention=business_convention, compounding=compounding,
-                              frequency=frequency, settlement_days=settlement_days, **kwargs)
-        ql.Settings.instance().evaluationDate = date
+        if oas_spread is None:
+            oas_spread = self.oas(yield_curve_timeseries=yield_curve_timeseries, model=model,
+                                  model_params=model_params, last=last, quote=quote, date=date,
+                                  day_counter=day_counter, calendar=calendar, business_convention=business_convention,
+                                  compounding=compounding, frequency=frequency, settlement_days=settlement_days,
+                                  **kwargs)
+        else:
+            # The tree engine is otherwise set by the oas calculation.
+            bond.setPricingEngine(self._tree_engine(yield_curve_handle, model, model_params, date))
+        switch_evaluation_date(date)
         return bond.effectiveDuration(float(oas_spread), yield_curve_handle, day_counter, compounding, frequency)
 
     @default_arguments
     @conditional_vectorize('quote', 'date')
     def oas_convexity(self, yield_curve_timeseries, model, model_params, last, quote, date, day_counter, calendar,
-                      business_convention, compounding, frequency, settlement_days, **kwargs):
+                      business_convention, compounding, frequency, settlement_days, oas_spread=None, **kwargs):
         """
         Warning
         -------
@@ -536,6 +556,8 @@ class CallableFixedRateBond(_BaseBond):
         settlement_days: int, optional
             Number of days for trade settlement.
             Default: see :py:func:`default_arguments`.
+        oas_spread: float, optional
+            The spread to be used in the calculation, will self calculate the oas_spread if none is passed.
 
         Returns
         -------
@@ -557,9 +579,135 @@ class CallableFixedRateBond(_BaseBond):
         else:
             yield_curve = yield_curve_timeseries.yield_curve(date=date)
         yield_curve_handle = ql.YieldTermStructureHandle(yield_curve)
-        oas_spread = self.oas(yield_curve_timeseries=yield_curve_timeseries, model=model, model_params=model_params,
-                              last=last, quote=quote, date=date, day_counter=day_counter, calendar=calendar,
-                              business_convention=business_convention, compounding=compounding,
-                              frequency=frequency, settlement_days=settlement_days, **kwargs)
-        ql.Settings.instance().evaluationDate = date
+        if oas_spread is None:
+            oas_spread = self.oas(yield_curve_timeseries=yield_curve_timeseries, model=model,
+                                  model_params=model_params, last=last, quote=quote, date=date,
+                                  day_counter=day_counter, calendar=calendar, business_convention=business_convention,
+                                  compounding=compounding, frequency=frequency, settlement_days=settlement_days,
+                                  **kwargs)
+        else:
+            # The tree engine is otherwise set by the oas calculation.
+            bond.setPricingEngine(self._tree_engine(yield_curve_handle, model, model_params, date))
+        switch_evaluation_date(date)
         return bond.effectiveConvexity(float(oas_spread), yield_curve_handle, day_counter, compounding, frequency)
+
+    def _oas_measures(self, measures, quote, date, **kwargs):
+        """
+        Parameters
+        ----------
+        measures: tuple of str
+            The measures to calculate, among 'oas' and :py:attr:`oas_measures`.
+        quote: numpy.ndarray
+            Bond's quotes.
+        date: numpy.ndarray
+            Dates of the calculation, aligned with `quote`.
+        kwargs:
+            The remaining arguments of :py:meth:`oas`.
+
+        Returns
+        -------
+        numpy.ndarray of float64, shape (dates, measures)
+            The measures for each date. The option-adjusted spread is calculated once per date and shared by the
+            other measures.
+        """
+        values = np.full((len(date), len(measures)), np.nan, dtype=np.float64)
+        for i, (quote_i, date_i) in enumerate(zip(quote, date)):
+            oas_spread = self.oas(quote=quote_i, date=date_i, **kwargs)
+            if np.isnan(oas_spread):
+                continue
+            for j, measure in enumerate(measures):
+                if measure == 'oas':
+                    values[i, j] = oas_spread
+                else:
+                    values[i, j] = getattr(self, 'oas_' + measure)(quote=quote_i, date=date_i,
+                                                                   oas_spread=float(oas_spread), **kwargs)
+        return values
+
+    @default_arguments
+    def parallel_oas(self, yield_curve_timeseries, model, model_params, last, quote, date, day_counter, calendar,
+                     business_convention, compounding, frequency, settlement_days, measures=None, tree_size=None,
+                     processes=None, **kwargs):
+        """Calculate the option-adjusted spread and related measures in parallel, over worker processes.
+
+        The dates are split in contiguous chunks, one per worker process. Each worker is forked with its own QuantLib
+        state (evaluation date, index fixings, etc.) and rebuilds the bond from its TimeSeries, so neither the bond
+        nor `yield_curve_timeseries` have to be pickled. Runs serially in this process where forking is not
+        available.
+
+        Warning
+        -------
+        This method has only been tested with ``model=QuantLib.HullWhite``.
+
+        Parameters
+        ----------
+        yield_curve_timeseries: :py:func:`YieldCurveTimeSeries`
+            The yield curve object against which the option-adjusted spreads will be calculated.
+        model: str
+            A string representing one of QuantLib Short Rate models, for simulating evolution of rates.
+        model_params: tuple, dict
+            Parameter set for the model, as in :py:meth:`oas`.
+        last: bool, optional
+            Whether to last data.
+            Default: see :py:func:`default_arguments`.
+        quote: scalar or array-like of scalar, optional
+            Bond's quote.
+            Default: see :py:func:`default_arguments`.
+        date: QuantLib.Date or array-like of date-like, optional
+            Date of the calculation.
+            Default: see :py:func:`default_arguments`.
+        day_counter: QuantLib.DayCounter, optional
+            Day counter for the calculation.
+            Default: see :py:func:`default_arguments`.
+        calendar: QuantLib.Calendar, optional
+            The calendar used for calculation.
+            Default: see :py:func:`default_arguments`.
+        business_convention: QuantLib.BusinessDayConvention
+            The business day convention used for calculation.
+            Default: see :py:func:`default_arguments`.
+        compounding: QuantLib.Compounding, optional
+            Compounding convention for the calculation.
+            Default: see :py:func:`default_arguments`.
+        frequency: QuantLib.Frequency, optional
+            Compounding frequency.
+            Default: see :py:func:`default_arguments`.
+        settlement_days: int, optional
+            Number of days for trade settlement.
+            Default: see :py:func:`default_arguments`.
+        measures: iterable of str, optional
+            The measures to calculate besides the option-adjusted spread, among :py:attr:`oas_measures`.
+            Default: all of them.
+        tree_size: int, optional
+            Number of time steps of the trees. Default: :py:attr:`tree_size`.
+        processes: int, optional
+            Maximum number of worker processes. Default: the number of CPUs.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A column 'oas' with the option-adjusted spreads relative to `yield_curve_timeseries` and a column for each
+            of `measures`, indexed by `date`.
+        """
+        measures = self.oas_measures if measures is None else tuple(measures)
+        for measure in measures:
+            if measure not in self.oas_measures:
+                raise ValueError("Unable to calculate the measure {} from the option-adjusted spread".format(measure))
+        measures = ('oas',) + measures
+        tree_size = self.tree_size if tree_size is None else int(tree_size)
+        quote, date = np.broadcast_arrays(to_object_array(quote), to_object_array(date))
+        bond_class = type(self)
+        timeseries = self.timeseries
+        kwargs.update(yield_curve_timeseries=yield_curve_timeseries, model=model, model_params=model_params,
+                      day_counter=day_counter, calendar=calendar, business_convention=business_convention,
+                      compounding=compounding, frequency=frequency, settlement_days=settlement_days)
+
+        def run(positions):
+            # Rebuild the bond, so that each worker has its own QuantLib objects.
+            bond = bond_class(timeseries)
+            bond.tree_size = tree_size
+            return bond._oas_measures(measures, quote=quote[positions], date=date[positions], **kwargs)
+
+        chunks = split_positions(len(date), processes or os.cpu_count() or 1)
+        values = np.empty((len(date), len(measures)), dtype=np.float64)
+        for positions, chunk_values in zip(chunks, fork_map(run, chunks, processes=processes)):
+            values[positions] = chunk_values
+        return pd.DataFrame(values, index=date, columns=list(measures))
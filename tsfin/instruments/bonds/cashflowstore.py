@@ -0,0 +1,194 @@
+# Copyright (C) 2016-2018 Lanx Capital Investimentos LTDA.
+#
+# This file is part of Time Series Finance (tsfin).
+#
+# Time Series Finance (tsfin) is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or (at your option)
+# any later version.
+#
+# Time Series Finance (tsfin) is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty
+# of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Time Series Finance (tsfin). If not, see <https://www.gnu.org/licenses/>.
+"""
+A class for the cash flows of many bonds, stored as contiguous arrays.
+"""
+import numpy as np
+import pandas as pd
+from tsfin.base import to_ql_date, to_ql_date_serial, QL_SERIAL_EPOCH
+from tsfin.instruments.bonds._basebond import _BaseBond
+
+
+class CashFlowStore:
+    """ Columnar store of the cash flows of a universe of bonds.
+
+    The cash flows are sorted by payment date, so that the cash flows paid in a date range are found with a binary
+    search. A second ordering, by bond and payment date, serves queries for a single bond.
+
+    Parameters
+    ----------
+    instruments: iterable
+        The instruments, e.g. the result of :py:func:`tsfin.tools.generate_instruments`. Only bonds are stored; other
+        instruments are ignored.
+
+    Attributes
+    ----------
+    names: list of str
+        Names of the stored bonds (`ts_name`); the position of a name is its bond id.
+    bond_ids: numpy.ndarray of int32
+        Bond id of each cash flow.
+    dates: numpy.ndarray of int32
+        Payment date serial number of each cash flow.
+    amounts: numpy.ndarray of float64
+        Amount of each cash flow.
+    is_redemption: numpy.ndarray of bool
+        True for redemptions (and any other cash flow that is not a coupon), False for coupons.
+    face_amounts: numpy.ndarray of float64
+        Face amount of each bond.
+
+    Note
+    ----
+    The amounts of floating rate coupons are the ones projected when the store is built.
+    """
+    def __init__(self, instruments):
+        bonds = [instrument for instrument in instruments if isinstance(instrument, _BaseBond)]
+        self.names = [bond.ts_name for bond in bonds]
+        self._positions = {name: i for i, name in enumerate(self.names)}
+        self.face_amounts = np.array([bond.face_amount for bond in bonds], dtype=np.float64)
+        schedules = [bond.cash_flow_schedule() for bond in bonds]
+        sizes = np.array([len(schedule) for schedule in schedules], dtype=np.int64)
+        if len(schedules) > 0:
+            bond_ids = np.repeat(np.arange(len(schedules), dtype=np.int32), sizes)
+            dates = np.concatenate([schedule.dates for schedule in schedules]).astype(np.int32)
+            amounts = np.concatenate([schedule.amounts for schedule in schedules])
+            is_redemption = ~np.concatenate([schedule.is_coupon for schedule in schedules])
+        else:
+            bond_ids = np.empty(0, dtype=np.int32)
+            dates = np.empty(0, dtype=np.int32)
+            amounts = np.empty(0, dtype=np.float64)
+            is_redemption = np.empty(0, dtype=bool)
+        order = np.lexsort((bond_ids, dates))
+        self.bond_ids = bond_ids[order]
+        self.dates = dates[order]
+        self.amounts = amounts[order]
+        self.is_redemption = is_redemption[order]
+        # Positions of the cash flows sorted by bond and then date. The schedules are already sorted by date.
+        self._by_bond = np.argsort(self.bond_ids, kind='stable')
+        self._bond_offsets = np.concatenate(([0], np.cumsum(sizes)))
+
+    def __len__(self):
+        return len(self.dates)
+
+    def bond_id(self, name):
+        """
+        Parameters
+        ----------
+        name: str
+            The name of a stored bond.
+
+        Returns
+        -------
+        int
+            The bond id of `name`.
+        """
+        try:
+            return self._positions[name]
+        except KeyError:
+            raise ValueError("Unable to find bond {} in the cash flow store".format(name))
+
+    def date_range(self, start_date, end_date):
+        """
+        Parameters
+        ----------
+        start_date: date-like
+            The start date (inclusive).
+        end_date: date-like
+            The end date (inclusive).
+
+        Returns
+        -------
+        slice
+            Positions in the arrays of the cash flows paid between `start_date` and `end_date`.
+        """
+        start = np.searchsorted(self.dates, to_ql_date(start_date).serialNumber(), side='left')
+        end = np.searchsorted(self.dates, to_ql_date(end_date).serialNumber(), side='right')
+        return slice(start, end)
+
+    def bond_range(self, name, start_date=None, end_date=None):
+        """
+        Parameters
+        ----------
+        name: str
+            The name of a stored bond.
+        start_date: date-like, optional
+            The start date (inclusive). Default: the first cash flow.
+        end_date: date-like, optional
+            The end date (inclusive). Default: the last cash flow.
+
+        Returns
+        -------
+        numpy.ndarray of int
+            Positions in the arrays of the cash flows of `name` paid between `start_date` and `end_date`, by date.
+        """
+        i = self.bond_id(name)
+        positions = self._by_bond[self._bond_offsets[i]:self._bond_offsets[i + 1]]
+        bond_dates = self.dates[positions]
+        start = 0 if start_date is None else np.searchsorted(bond_dates, to_ql_date(start_date).serialNumber(),
+                                                             side='left')
+        end = len(positions) if end_date is None else np.searchsorted(bond_dates, to_ql_date(end_date).serialNumber(),
+                                                                      side='right')
+        return positions[start:end]
+
+    def cash_to_date(self, start_date, date):
+        """
+        Parameters
+        ----------
+        start_date: date-like
+            The start date (inclusive).
+        date: date-like or array-like of date-like
+            The last date(s) of the computation (inclusive).
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Amount of cash received by each bond between `start_date` and each `date`, per unit of face amount, as in
+            :py:meth:`_BaseBond.cash_to_date`. The shape is (bonds,) for a single date, (dates, bonds) otherwise.
+        """
+        start = np.searchsorted(self.dates, to_ql_date(start_date).serialNumber(), side='left')
+        serials = to_ql_date_serial(date)
+        ends = np.searchsorted(self.dates, np.atleast_1d(serials), side='right')
+        result = np.zeros((len(ends), len(self.names)), dtype=np.float64)
+        for i, end in enumerate(ends.tolist()):
+            if end > start:
+                result[i] = np.bincount(self.bond_ids[start:end], weights=self.amounts[start:end],
+                                        minlength=len(self.names))
+        result /= self.face_amounts
+        return result if np.ndim(serials) > 0 else result[0]
+
+    def to_frame(self, start_date=None, end_date=None):
+        """
+        Parameters
+        ----------
+        start_date: date-like, optional
+            The start date (inclusive). Default: the first cash flow.
+        end_date: date-like, optional
+            The end date (inclusive). Default: the last cash flow.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The cash flows paid between `start_date` and `end_date`, with columns BOND, DATE, AMOUNT and REDEMPTION.
+        """
+        start = 0 if start_date is None else np.searchsorted(self.dates, to_ql_date(start_date).serialNumber(),
+                                                             side='left')
+        end = len(self) if end_date is None else np.searchsorted(self.dates, to_ql_date(end_date).serialNumber(),
+                                                                 side='right')
+        names = np.array(self.names, dtype=object)
+        return pd.DataFrame({'BOND': names[self.bond_ids[start:end]],
+                             'DATE': QL_SERIAL_EPOCH + pd.to_timedelta(self.dates[start:end], unit='D'),
+                             'AMOUNT': self.amounts[start:end],
+                             'REDEMPTION': self.is_redemption[start:end]})
@@ -18,7 +18,8 @@
 from functools import wraps
 import numpy as np
 import QuantLib as ql
-from tsfin.base import to_ql_date, to_ql_calendar, to_ql_currency, to_ql_ibor_index, conditional_vectorize
+from tsfin.base import to_ql_date, to_ql_calendar, to_ql_currency, to_ql_ibor_index, conditional_vectorize, \
+    to_ql_date_serial, switch_evaluation_date
 from tsfin.instruments.bonds._basebond import _BaseBond, default_arguments
 from tsfin.constants import INDEX_TENOR, FIXING_DAYS, CALENDAR, SPREAD
 
@@ -45,7 +46,7 @@ def set_floating_rate_index(f):
             date = to_ql_date(kwargs['date'][0])
         except:
             date = to_ql_date(kwargs['date'])
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         self.add_fixings(date=date)
         self.link_to_curves(date=date)
         return f(self, *args, **kwargs)
@@ -69,6 +70,9 @@ class FloatingRateBond(_BaseBond):
     ----
     See the :py:mod:`constants` for required attributes in `timeseries` and their possible values.
     """
+    # The projected coupons change with the fixings and the reference curve.
+    _fixed_cash_flows = False
+
     def __init__(self, timeseries, reference_curve=None, index_timeseries=None):
         super().__init__(timeseries)
         self.reference_curve = reference_curve
@@ -102,6 +106,11 @@ class FloatingRateBond(_BaseBond):
         self.index_bus_day_convention = self.index.businessDayConvention()
         self.reference_schedule = list(self.schedule)[:-1]
         self.fixing_dates = [self.index.fixingDate(dt) for dt in self.reference_schedule]
+        # Distinct fixing dates sorted, with their serial numbers, used to find the fixings needed for a date.
+        self._fixing_serials, fixing_positions = np.unique([dt.serialNumber() for dt in self.fixing_dates],
+                                                           return_index=True)
+        self._sorted_fixing_dates = [self.fixing_dates[i] for i in fixing_positions]
+        self._reset_fixings()
         # Coupon pricers
         self.pricer = ql.BlackIborCouponPricer()
         self.volatility = 0.0
@@ -119,6 +128,7 @@ class FloatingRateBond(_BaseBond):
         :return:
         """
         self.index_timeseries = index_timeseries
+        self._reset_fixings()
 
     def set_reference_curve(self, reference_curve):
         """
@@ -142,11 +152,35 @@ class FloatingRateBond(_BaseBond):
         if kwargs.get('bypass_set_floating_rate_index'):
             return
 
-        ql.IndexManager.instance().clearHistory(self.index.name())
-        for dt in self.fixing_dates:
-            if dt <= self.calendar.advance(date, self.fixing_days, ql.Days):
-                rate = self.index_timeseries.get_values(index=dt)
-                self.index.addFixing(dt, rate)
+        last_fixing = self.calendar.advance(date, self.fixing_days, ql.Days).serialNumber()
+        count = int(np.searchsorted(self._fixing_serials, last_fixing, side='right'))
+        self._resolve_fixings(count)
+        pushed = self._pushed_fixings
+        # Rebuild the whole history when moving backward or when the index history was changed elsewhere.
+        if count < pushed or len(self.index.timeSeries()) != pushed:
+            ql.IndexManager.instance().clearHistory(self.index.name())
+            pushed = 0
+        if count > pushed:
+            self.index.addFixings(self._sorted_fixing_dates[pushed:count], self._fixing_rates[pushed:count].tolist())
+        self._pushed_fixings = count
+
+    def _reset_fixings(self):
+        """Discard the resolved fixings, e.g. after changing the index timeseries."""
+        self._fixing_rates = np.full(len(self._fixing_serials), np.nan, dtype=np.float64)
+        self._resolved_fixings = 0
+        self._pushed_fixings = -1
+
+    def _resolve_fixings(self, count):
+        """Read the first `count` fixings from the index timeseries, if not read before.
+
+        Parameters
+        ----------
+        count: int
+            The number of fixings needed, in fixing date order.
+        """
+        for i in range(self._resolved_fixings, count):
+            self._fixing_rates[i] = self.index_timeseries.get_values(index=self._sorted_fixing_dates[i])
+        self._resolved_fixings = max(self._resolved_fixings, count)
 
     def link_to_curves(self, date, **kwargs):
 
@@ -167,6 +201,64 @@ class FloatingRateBond(_BaseBond):
         self.forecast_curve.linkTo(reference_curve)
         self.index_reference_curve.linkTo(reference_curve)
 
+    def _accrued_amount(self, settlement_date, **kwargs):
+        """
+        Parameters
+        ----------
+        settlement_date: QuantLib.Date
+            The settlement date.
+
+        Returns
+        -------
+        scalar
+            The accrued interest of the bond. The coupon fixings are set for `settlement_date`, as in
+            :py:meth:`accrued_interest`.
+        """
+        return self.accrued_interest(date=settlement_date, **kwargs)
+
+    def _solve_by_date(self, solver, quote, date, **kwargs):
+        """Call a bulk solver separately for each distinct date.
+
+        The projected coupons depend on the fixings and on the reference curve, so the cash flows must be extracted
+        and solved with the index set for each date.
+
+        Parameters
+        ----------
+        solver: method
+            A bulk solver returning a namedtuple of arrays, e.g. :py:meth:`_BaseBond._solve_ytm`.
+        quote: numpy.ndarray of float64
+            The bond's quotes.
+        date: numpy.ndarray
+            The dates of the calculation, aligned with `quote`.
+
+        Returns
+        -------
+        namedtuple
+            The results of `solver` for all the dates.
+        """
+        serials = to_ql_date_serial(date)
+        if len(serials) == 0:
+            return solver(quote=quote, date=date, **kwargs)
+        fields = None
+        for serial in np.unique(serials):
+            rows = np.flatnonzero(serials == serial)
+            ql_date = ql.Date(int(serial))
+            switch_evaluation_date(ql_date)
+            self.add_fixings(date=ql_date)
+            self.link_to_curves(date=ql_date)
+            result = solver(quote=quote[rows], date=date[rows], **kwargs)
+            if fields is None:
+                fields = [np.empty(len(serials), dtype=values.dtype) for values in result]
+            for field, values in zip(fields, result):
+                field[rows] = values
+        return type(result)(*fields)
+
+    def _solve_ytm(self, quote, date, **kwargs):
+        return self._solve_by_date(super()._solve_ytm, quote=quote, date=date, **kwargs)
+
+    def _solve_ytw(self, quote, date, **kwargs):
+        return self._solve_by_date(super()._solve_ytw, quote=quote, date=date, **kwargs)
+
     @set_floating_rate_index
     def minor_price_change(self, last, quote, date, day_counter, calendar, business_convention, compounding, frequency,
                            settlement_days, dy, to_worst=False, rolling_call=False, **kwargs):
@@ -26,7 +26,7 @@ from tsfin.constants import CALENDAR, MATURITY_DATE, DAY_COUNTER, EXERCISE_TYPE,
     HESTON, GJR_GARCH, MID_PRICE, IMPLIED_VOL, UNADJUSTED_PRICE, DIVIDEND_YIELD, FIXING_DAYS
 from tsfin.base import Instrument, to_ql_date, conditional_vectorize, to_ql_calendar, to_ql_day_counter, to_datetime, \
     to_list, to_ql_option_type, to_ql_one_asset_option, to_ql_option_payoff, to_ql_option_engine, \
-    to_ql_option_exercise_type
+    to_ql_option_exercise_type, switch_evaluation_date
 
 
 def option_default_values(f):
@@ -594,7 +594,7 @@ class EquityOption(Instrument):
         :return: float
             The option price at date.
         """
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         if self.is_expired(date=date):
             return self.intrinsic(date=self._maturity, spot_price=spot_price)
         else:
@@ -627,7 +627,7 @@ class EquityOption(Instrument):
         :return: float
             The option price based on the date and underlying spot price.
         """
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         if self.is_expired(date=date):
             return self.intrinsic(date=self._maturity, spot_price=spot_price)
         else:
@@ -662,7 +662,7 @@ class EquityOption(Instrument):
         :return: float
             The option delta at date.
         """
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         if self.is_expired(date=date):
             if self.intrinsic(date=date, spot_price=spot_price) > 0:
                 return 1
@@ -708,7 +708,7 @@ class EquityOption(Instrument):
         :return: float
             The option delta based on the date and underlying spot price.
         """
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         if self.is_expired(date=date):
             if self.intrinsic(date=date, spot_price=spot_price) > 0:
                 return 1
@@ -756,7 +756,7 @@ class EquityOption(Instrument):
         :return: float
             The option gamma at date.
         """
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         if self.is_expired(date=date):
             return 0
         else:
@@ -798,7 +798,7 @@ class EquityOption(Instrument):
         :return: float
             The option theta at date.
         """
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         if self.is_expired(date=date):
             return 0
         else:
@@ -810,7 +810,7 @@ class EquityOption(Instrument):
             except RuntimeError:
                 price = self.option.NPV()
                 new_date = date + ql.Period(1, ql.Days)
-                ql.Settings.instance().evaluationDate = new_date
+                switch_evaluation_date(new_date)
                 h = self.day_counter.yearFraction(date, new_date)
                 price_plus = self.option.NPV()
                 return (price_plus - price) / h
@@ -837,7 +837,7 @@ class EquityOption(Instrument):
         :return: float
             The option vega at date.
         """
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         if self.is_expired(date=date):
             return 0
         else:
@@ -876,7 +876,7 @@ class EquityOption(Instrument):
         :return: float
             The option rho at date.
         """
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         if self.is_expired(date=date):
             return 0
         else:
@@ -921,7 +921,7 @@ class EquityOption(Instrument):
         :return: float
             The option volatility based on the option price and date.
         """
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         self.volatility_update(date=date, base_date=base_date, spot_price=spot_price, dividend_yield=dividend_yield,
                                dividend_tax=dividend_tax, volatility=volatility,
                                base_equity_process=base_equity_process, option_price=option_price, **kwargs)
@@ -949,7 +949,7 @@ class EquityOption(Instrument):
         :return: float
             The option optionality at date.
         """
-        ql.Settings.instance().evaluationDate = date
+        switch_evaluation_date(date)
         if self.is_expired(date=date):
             return 0
         else:
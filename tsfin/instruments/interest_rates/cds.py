@@ -22,7 +22,8 @@ import QuantLib as ql
 from functools import wraps
 from tsfin.instruments.interest_rates.base_interest_rate import BaseInterestRate
 from tsfin.base import to_ql_date, to_ql_frequency, to_ql_date_generation, conditional_vectorize, \
-    to_ql_business_convention, to_ql_calendar, to_ql_day_counter, to_ql_protection_side, to_ql_cds_engine
+    to_ql_business_convention, to_ql_calendar, to_ql_day_counter, to_ql_protection_side, to_ql_cds_engine, \
+    serialize_evaluation_date, switch_evaluation_date
 from tsfin.constants import FREQUENCY, DATE_GENERATION, RECOVERY_RATE, COUPONS, BASE_SPREAD_TAG, CALENDAR, \
     TENOR_PERIOD, BUSINESS_CONVENTION, DAY_COUNTER, FIXING_DAYS, FIRST_ACCRUAL_DATE
 
@@ -203,6 +204,7 @@ class CDSRate(BaseInterestRate):
             return ql.CreditDefaultSwap(side, notional, upfront, spread_rate, schedule, business_convention,
                                         day_counter)
 
+    @serialize_evaluation_date
     @conditional_vectorize('date', 'spread_rate')
     @cds_default_values
     def net_present_value(self, date, spread_rate, cds_curve_time_series, recovery_rate, first_accrual_date, side,
@@ -242,7 +244,7 @@ class CDSRate(BaseInterestRate):
         :return float
             CDS Net Present Value.
         """
-        ql.Settings.instance().evaluationDate = to_ql_date(date)
+        switch_evaluation_date(to_ql_date(date))
         cds = self.security(date=date, spread_rate=spread_rate, cds_curve_time_series=cds_curve_time_series,
                             recovery_rate=recovery_rate, first_accrual_date=first_accrual_date, side=side,
                             notional=notional, maturity=maturity, upfront_price=upfront_price, frequency=frequency,
@@ -289,7 +291,7 @@ class CDSRate(BaseInterestRate):
         :return float
             CDS fair spread
         """
-        ql.Settings.instance().evaluationDate = to_ql_date(date)
+        switch_evaluation_date(to_ql_date(date))
         cds = self.security(date=date, spread_rate=spread_rate, cds_curve_time_series=cds_curve_time_series,
                             recovery_rate=recovery_rate, first_accrual_date=first_accrual_date, side=side,
                             notional=notional, maturity=maturity, upfront_price=upfront_price, frequency=frequency,
@@ -336,7 +338,7 @@ class CDSRate(BaseInterestRate):
         :return float
             CDS Net Present Value of the default leg
         """
-        ql.Settings.instance().evaluationDate = to_ql_date(date)
+        switch_evaluation_date(to_ql_date(date))
         cds = self.security(date=date, spread_rate=spread_rate, cds_curve_time_series=cds_curve_time_series,
                             recovery_rate=recovery_rate, first_accrual_date=first_accrual_date, side=side,
                             notional=notional, maturity=maturity, upfront_price=upfront_price, frequency=frequency,
@@ -383,7 +385,7 @@ class CDSRate(BaseInterestRate):
         :return float
             CDS Net Present Value of the coupon leg
         """
-        ql.Settings.instance().evaluationDate = to_ql_date(date)
+        switch_evaluation_date(to_ql_date(date))
         cds = self.security(date=date, spread_rate=spread_rate, cds_curve_time_series=cds_curve_time_series,
                             recovery_rate=recovery_rate, first_accrual_date=first_accrual_date, side=side,
                             notional=notional, maturity=maturity, upfront_price=upfront_price, frequency=frequency,
@@ -430,7 +432,7 @@ class CDSRate(BaseInterestRate):
         :return float
             CDS Net Present Value of the upfront price
         """
-        ql.Settings.instance().evaluationDate = to_ql_date(date)
+        switch_evaluation_date(to_ql_date(date))
         cds = self.security(date=date, spread_rate=spread_rate, cds_curve_time_series=cds_curve_time_series,
                             recovery_rate=recovery_rate, first_accrual_date=first_accrual_date, side=side,
                             notional=notional, maturity=maturity, upfront_price=upfront_price, frequency=frequency,
@@ -61,6 +61,8 @@ class FxSwapRate(BaseInterestRate):
         self.helper_rate = ql.SimpleQuote(0)
         self.helper_spread = ql.SimpleQuote(0)
         self.helper_convexity = ql.SimpleQuote(0)
+        # The rate helper, with the handles it was built with. Its quotes are updated in place by rate_helper.
+        self._helper = None
 
     def is_expired(self, date, *args, **kwargs):
         """ Returns False.
@@ -105,15 +107,20 @@ class FxSwapRate(BaseInterestRate):
         if np.isnan(rate):
             return None
         self.helper_rate.setValue(float(rate))
-        return ql.FxSwapRateHelper(ql.QuoteHandle(self.helper_rate),
-                                   self.currency_spot_handle,
-                                   self._tenor,
-                                   self.fixing_days,
-                                   self.calendar,
-                                   self.business_convention,
-                                   self.month_end,
-                                   True,
-                                   self.term_structure)
+        # The helper follows the global evaluation date, so it is only rebuilt if its handles were replaced.
+        if self._helper is None or self._helper[0] is not self.currency_spot_handle or \
+                self._helper[1] is not self.term_structure:
+            helper = ql.FxSwapRateHelper(ql.QuoteHandle(self.helper_rate),
+                                         self.currency_spot_handle,
+                                         self._tenor,
+                                         self.fixing_days,
+                                         self.calendar,
+                                         self.business_convention,
+                                         self.month_end,
+                                         True,
+                                         self.term_structure)
+            self._helper = (self.currency_spot_handle, self.term_structure, helper)
+        return self._helper[2]
 
 
 class NonDeliverableForward(Instrument):
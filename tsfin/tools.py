@@ -21,7 +21,8 @@ import numpy as np
 from pandas.tseries.offsets import BDay, Week, BMonthEnd, BYearEnd
 from tsio import TimeSeries, TimeSeriesCollection
 from tsfin.base import Instrument, to_datetime, to_ql_date, to_ql_frequency, to_ql_weekday, to_ql_option_engine, \
-    to_ql_equity_model, to_ql_swaption_engine, to_ql_short_rate_model
+    to_ql_equity_model, to_ql_swaption_engine, to_ql_short_rate_model, serialize_evaluation_date, \
+    switch_evaluation_date
 from tsfin.instruments.interest_rates import DepositRate, ZeroRate, OISRate, SwapRate, Swaption, CDSRate, \
     EurodollarFuture, DepositRateFuture, FxSwapRate, NonDeliverableForward
 from tsfin.instruments.equities import Equity, EquityOption
@@ -300,7 +301,7 @@ def calibrate_swaption_model(date, model_name, term_structure_ts, swaption_vol_t
     model_name = str(model_name).upper()
     term_structure = term_structure_ts.yield_curve_handle(date=date)
 
-    ql.Settings.instance().evaluationDate = date
+    switch_evaluation_date(date)
     if fix_mean:
         model = to_ql_short_rate_model(model_name=model_name)(term_structure, mean_reversion_value)
     else:
@@ -374,7 +375,7 @@ def get_equity_option_model_and_helpers(date, term_structure_ts, spot_price, div
     """
 
     date = to_ql_date(date)
-    ql.Settings.instance().evaluationDate = date
+    switch_evaluation_date(date)
 
     options = generate_instruments(option_collection)
     calendar = options[0].calendar
@@ -424,6 +425,7 @@ def cost_function_generator(model, helpers, norm=False):
     return cost_function
 
 
+@serialize_evaluation_date(restore=False)
 def calibrate_ql_model(date, model_name, model, helpers, initial_conditions=None, use_scipy=False, solver_name=None,
                        bounds=None, max_iteration=1000, max_stationary_state_iteration=200, ql_constraint=None,
                        ql_weights=None, fix_parameters=None, my_bound=None, show_basin_results=False):
@@ -463,7 +465,7 @@ def calibrate_ql_model(date, model_name, model, helpers, initial_conditions=None
 
     date = to_ql_date(date)
     print('Calibrating {0} model for {1}'.format(model_name, date))
-    ql.Settings.instance().evaluationDate = date
+    switch_evaluation_date(date)
     solver_name = str(solver_name).upper()
 
     if use_scipy:
@@ -643,7 +645,7 @@ def ql_irr(cash_flow, first_amount, first_date):
     :return: float
     """
 
-    ql.Settings.instance().evaluationDate = to_ql_date(first_date)
+    switch_evaluation_date(to_ql_date(first_date))
     try:
         fixed_rate = ql.CashFlows.yieldRate(cash_flow, float(first_amount), ql.Actual365Fixed(), ql.Compounded,
                                             ql.Annual, False, ql.Date(), ql.Date(), 1.0e-6, 1000, 0.05)